@@ -0,0 +1,150 @@
+"""
+Script to compare grouping the crossing intervals with the original row by row
+loop (from the application example figures) against
+`grouping.crossing_groups`. Both are timed on the same intervals, and the
+groups they find checked to be identical.
+
+$ python ./scripts/benchmark_crossing_groups.py [--intervals N] [--philpott]
+
+By default, synthetic intervals with random types are used. With --philpott,
+the Philpott crossing intervals are used instead.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from helpers import grouping, resources
+
+TYPES = ["BS_IN", "MP_IN", "MP_OUT", "BS_OUT", "DATA_GAP"]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the vectorised crossing grouping"
+    )
+    parser.add_argument(
+        "-n",
+        "--intervals",
+        type=int,
+        default=20_000,
+        help="Number of synthetic crossing intervals (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--philpott",
+        action="store_true",
+        help="Use the Philpott crossing intervals rather than synthetic ones",
+    )
+    args = parser.parse_args()
+
+    if args.philpott:
+        crossing_intervals = resources.crossing_intervals(
+            "Philpott", include_data_gaps=True
+        )
+
+    else:
+        crossing_intervals = synthetic_intervals(args.intervals)
+
+    print(f"Grouping {len(crossing_intervals):,} crossing intervals")
+
+    start_time = time.perf_counter()
+    loop_groups = loop_crossing_groups(crossing_intervals)
+    loop_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    groups = grouping.crossing_groups(crossing_intervals)
+    vectorised_time = time.perf_counter() - start_time
+
+    # Express the loop's groups of pd.Series as (first_row, second_row)
+    expected = np.array(
+        [
+            [group[0].name, group[1].name if len(group) > 1 else -1]
+            for group in loop_groups
+        ],
+        dtype=groups.dtype,
+    ).reshape(-1, 2)
+
+    if not np.array_equal(expected, groups):
+        raise AssertionError("Groups differ from the original loop")
+
+    print(f"Found {len(groups):,} groups")
+    print(f"Original loop:            {loop_time:.4f} s")
+    print(f"grouping.crossing_groups: {vectorised_time:.4f} s")
+    print(f"Speed up: {loop_time / vectorised_time:.0f}x (groups identical)")
+
+
+def synthetic_intervals(length):
+    """
+    Intervals which mostly follow the expected order of crossings, with some
+    types replaced at random to create abnormal groups.
+    """
+    rng = np.random.default_rng(0)
+
+    types = np.resize(TYPES[:4], length)
+    replaced = rng.random(length) < 0.1
+    types[replaced] = rng.choice(TYPES, size=replaced.sum())
+
+    return pd.DataFrame({"Type": types})
+
+
+def loop_crossing_groups(crossing_intervals):
+    """The original grouping loop, as it was in the figure scripts."""
+    crossing_groups = []
+    crossing_index = 0
+    while crossing_index < len(crossing_intervals) - 1:
+
+        current_crossing = crossing_intervals.loc[crossing_index]
+        next_crossing = crossing_intervals.loc[crossing_index + 1]
+
+        assert isinstance(current_crossing, pd.Series)
+
+        if current_crossing["Type"] == "BS_IN":
+            # We expect a magnetopause in crossing next
+            match next_crossing["Type"]:
+                case "MP_IN":
+                    # This is as normal, we can add to our list of pairs
+                    crossing_groups.append([current_crossing, next_crossing])
+
+                    # We don't want to consider the next crossing as we have
+                    # already saved it, so we add an extra to the crossing
+                    # index.
+                    crossing_index += 1
+
+                case label if label in ["MP_OUT", "BS_IN", "BS_OUT", "DATA_GAP"]:
+                    # This is abnormal, we just want to look around the current
+                    # crossing
+                    crossing_groups.append([current_crossing])
+
+        elif current_crossing["Type"] == "MP_OUT":
+            # We expect a bow shock in crossing next
+            match next_crossing["Type"]:
+                case "BS_OUT":
+                    # This is as normal, we can add to our list of pairs
+                    crossing_groups.append([current_crossing, next_crossing])
+
+                    # We don't want to consider the next crossing as we have
+                    # already saved it, so we add an extra to the crossing
+                    # index.
+                    crossing_index += 1
+
+                case label if label in ["MP_IN", "MP_OUT", "BS_IN", "DATA_GAP"]:
+                    # This is abnormal, we just want to look around the current
+                    # crossing
+                    crossing_groups.append([current_crossing])
+
+        else:
+            # Otherwise, for some reason the previous part of the crossing pair
+            # didn't exist. We save this crossing on its own.
+            if current_crossing["Type"] != "DATA_GAP":
+                crossing_groups.append([current_crossing])
+
+        crossing_index += 1
+
+    return crossing_groups
+
+
+if __name__ == "__main__":
+    main()
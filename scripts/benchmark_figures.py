@@ -0,0 +1,273 @@
+"""
+Script to benchmark each figure script, to tell whether a change makes the
+figures faster or slower to build.
+
+Each script is run in its own python process, recording:
+- the time spent loading resources, computing, and rendering (saving the
+  figure),
+- its peak memory (RSS),
+- the bytes it read, both in total and from storage (rather than the page
+  cache), on Linux.
+
+Results are appended to a JSON history (./resources/figure_benchmarks.json),
+along with the commit they were measured at, and compared with the previous
+run using the same resources.
+
+$ python ./scripts/benchmark_figures.py [SCRIPTS ...]
+
+By default, scripts are run against ./resources/. With --root, they are run
+from another directory holding its own ./resources/ and ./figures/, e.g. a
+set of locally generated resources, and labelled with --label:
+
+$ python ./scripts/benchmark_figures.py --root ./synthetic --label synthetic
+"""
+
+import argparse
+import datetime as dt
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HISTORY_PATH = "./resources/figure_benchmarks.json"
+
+# Stages (see helpers/instrumentation.py) counted as loading resources and
+# rendering
+PHASES = {
+    "unpickle": "load",
+    "csv": "load",
+    "read": "load",
+    "savefig": "render",
+}
+
+GIB = 1024**3
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmark the figure scripts")
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        default=sorted(glob.glob("./scripts/fig*.py")),
+        help="Scripts to benchmark (default: all figure scripts)",
+    )
+    parser.add_argument(
+        "--root",
+        default=".",
+        help="Directory holding the resources to run against (default: .)",
+    )
+    parser.add_argument(
+        "--label",
+        default="zenodo",
+        help="Name of the resources, runs are compared with the same label "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Don't add this run to the history",
+    )
+    # Used internally, to run one script in a child process
+    parser.add_argument("--worker", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(*args.worker)
+        return
+
+    history = load_history()
+    previous = next(
+        (run for run in reversed(history) if run["label"] == args.label), None
+    )
+
+    run = {
+        "commit": current_commit(),
+        "date": dt.datetime.now().isoformat(timespec="seconds"),
+        "label": args.label,
+        "root": os.path.abspath(args.root),
+        "figures": {},
+    }
+
+    for script in args.scripts:
+        name = os.path.basename(script)
+        result = benchmark_script(script, args.root)
+        run["figures"][name] = result
+
+        print(format_result(name, result, (previous or {}).get("figures", {})))
+
+    if not args.no_save:
+        history.append(run)
+        save_history(history)
+
+
+def benchmark_script(script, root):
+    """Run a script in a child process, returning its measurements."""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as file:
+        output_path = file.name
+
+    try:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--worker",
+                os.path.abspath(script),
+                output_path,
+            ],
+            cwd=root,
+        )
+
+        if hasattr(os, "wait4"):
+            # Unlike Popen.wait, wait4 also gives the resource usage of the child
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+
+            # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+            peak_rss = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+        else:
+            process.wait()
+            peak_rss = None
+
+        with open(output_path, "r") as file:
+            result = json.load(file) if os.path.getsize(output_path) > 0 else {}
+
+    finally:
+        os.remove(output_path)
+
+    result["peak_rss"] = peak_rss
+    result["succeeded"] = process.returncode == 0
+
+    return result
+
+
+def run_worker(script, output_path):
+    """Run a script in this process, writing its measurements to output_path."""
+    from helpers import instrumentation, runner
+
+    timers = {"load": 0.0, "render": 0.0}
+
+    def measure(stage, name, call):
+        if stage not in PHASES:
+            return call()
+
+        start_time = time.perf_counter()
+        try:
+            return call()
+
+        finally:
+            timers[PHASES[stage]] += time.perf_counter() - start_time
+
+    instrumentation.instrument(measure)
+
+    start_time = time.perf_counter()
+    try:
+        runner.run_figure(script)
+
+    finally:
+        total = time.perf_counter() - start_time
+
+        with open(output_path, "w") as file:
+            json.dump(
+                {
+                    "total_seconds": total,
+                    "load_seconds": timers["load"],
+                    "compute_seconds": total - timers["load"] - timers["render"],
+                    "render_seconds": timers["render"],
+                    **bytes_read(),
+                },
+                file,
+            )
+
+
+def bytes_read():
+    """
+    Bytes read by this process in total (including from the page cache), and
+    from storage. Only available on Linux.
+    """
+    try:
+        with open("/proc/self/io", "r") as file:
+            counters = dict(line.split(": ") for line in file.read().splitlines())
+
+    except OSError:
+        return {"bytes_read": None, "storage_bytes_read": None}
+
+    return {
+        "bytes_read": int(counters["rchar"]),
+        "storage_bytes_read": int(counters["read_bytes"]),
+    }
+
+
+def current_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        changed = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return commit + ("-dirty" if changed else "")
+
+
+def load_history():
+    if not os.path.exists(HISTORY_PATH):
+        return []
+
+    with open(HISTORY_PATH, "r") as file:
+        return json.load(file)
+
+
+def save_history(history):
+    os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+
+    with open(HISTORY_PATH, "w") as file:
+        json.dump(history, file, indent=4)
+
+
+def format_result(name, result, previous_figures):
+    if not result["succeeded"]:
+        return f"[failed] {name}"
+
+    previous = previous_figures.get(name)
+
+    def change(key):
+        if previous is None or not previous.get("succeeded") or not previous[key]:
+            return ""
+        return f" ({(result[key] - previous[key]) / previous[key]:+.0%})"
+
+    line = (
+        f"[done] {name}: "
+        f"{result['total_seconds']:.1f} s{change('total_seconds')} "
+        f"(load {result['load_seconds']:.1f} s, "
+        f"compute {result['compute_seconds']:.1f} s, "
+        f"render {result['render_seconds']:.1f} s)"
+    )
+
+    if result["peak_rss"] is not None:
+        line += f", peak {result['peak_rss'] / GIB:.2f} GiB{change('peak_rss')}"
+
+    if result["bytes_read"] is not None:
+        line += (
+            f", read {result['bytes_read'] / GIB:.2f} GiB{change('bytes_read')} "
+            f"({result['storage_bytes_read'] / GIB:.2f} GiB from storage)"
+        )
+
+    return line
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Script to compare binning the residence histograms with one `np.histogram2d`
+call per plane against the single pass of `histograms.multi_plane_histograms`.
+Both are timed on the same positions, and their outputs checked to be
+identical.
+
+$ python ./scripts/benchmark_histograms.py [--samples N] [--mission]
+
+By default, normally distributed synthetic positions are used. With
+--mission, the full mission positions are used instead.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from helpers import histograms, mission, resources
+
+# The bins used by the residence figures (as in fig04, fig11, and fig12)
+BIN_SIZE = 0.5
+X_BINS = np.arange(-5, 5 + BIN_SIZE, BIN_SIZE)
+Y_BINS = np.arange(-5, 5 + BIN_SIZE, BIN_SIZE)
+Z_BINS = np.arange(-8, 2 + BIN_SIZE, BIN_SIZE)
+CYL_BINS = np.arange(0, 10 + BIN_SIZE, BIN_SIZE)
+BINS = {
+    "xy": (X_BINS, Y_BINS),
+    "xz": (X_BINS, Z_BINS),
+    "cyl": (X_BINS, CYL_BINS),
+}
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark the single pass residence histograms"
+    )
+    parser.add_argument(
+        "-n",
+        "--samples",
+        type=int,
+        default=10_000_000,
+        help="Number of synthetic positions (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--mission",
+        action="store_true",
+        help="Use the full mission positions rather than synthetic ones",
+    )
+    parser.add_argument(
+        "-r",
+        "--repeats",
+        type=int,
+        default=3,
+        help="Take the best of this many runs (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    if args.mission:
+        positions = resources.full_mission()
+        x, y, z = (
+            np.ascontiguousarray(positions[c].to_numpy())
+            for c in mission.POSITION_COLUMNS
+        )
+
+    else:
+        rng = np.random.default_rng(0)
+        x, y, z = rng.normal(0, 3, size=(3, args.samples))
+
+    print(f"Binning {len(x):,} positions in {len(BINS)} planes")
+
+    reference, reference_time = best_of(args.repeats, lambda: histogram2d(x, y, z))
+    result, result_time = best_of(
+        args.repeats, lambda: histograms.multi_plane_histograms(x, y, z, BINS)
+    )
+
+    for plane in BINS:
+        if not np.array_equal(reference[plane], result[plane]):
+            raise AssertionError(f"Histograms differ in the {plane} plane")
+
+    print(f"np.histogram2d per plane: {reference_time:.3f} s")
+    print(f"multi_plane_histograms:   {result_time:.3f} s")
+    print(f"Speed up: {reference_time / result_time:.2f}x (histograms identical)")
+
+
+def histogram2d(x, y, z):
+    """The original approach, with one np.histogram2d call per plane."""
+    coordinates = {"x": x, "y": y, "z": z, "cyl": np.sqrt(y**2 + z**2)}
+
+    return {
+        plane: np.histogram2d(
+            coordinates[histograms.PLANES[plane][0]],
+            coordinates[histograms.PLANES[plane][1]],
+            bins=edges,
+        )[0]
+        for plane, edges in BINS.items()
+    }
+
+
+def best_of(repeats, function):
+    times = []
+
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start_time)
+
+    return result, min(times)
+
+
+if __name__ == "__main__":
+    main()
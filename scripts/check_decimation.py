@@ -0,0 +1,110 @@
+"""
+Script to check that decimating the 20 Hz MAG lines (see
+helpers/decimation.py) leaves figures visually unchanged.
+
+Each figure script is run as normal, except that rather than saving the
+figure, it is rendered both with and without decimation, and the two renders
+compared pixel by pixel. Saving is intercepted at `Figure.savefig`, so
+figures saved through `plt.savefig` or `rasterization.savefig` are both
+compared, and nothing is written to ./figures/.
+
+$ python ./scripts/check_decimation.py [SCRIPTS ...] [--dpi DPI]
+
+Exits with an error if any figure has more than --max-fraction of its pixels
+differing, or if a script saved no figures to compare.
+"""
+
+import argparse
+import glob
+import os
+import sys
+from unittest import mock
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.figure
+
+from helpers import decimation, runner
+
+# Figure scripts plotting 20 Hz MAG data
+DECIMATED_FIGURES = ["fig02", "fig03", "fig05", "fig08", "fig09", "fig10"]
+
+# Full window renders of the decimated figures differ in ~0.06% of their
+# pixels at the default tolerance
+MAX_DIFFERING_FRACTION = 0.001
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Compare figures rendered with and without decimation"
+    )
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        default=[
+            script
+            for figure in DECIMATED_FIGURES
+            for script in sorted(glob.glob(f"./scripts/{figure}*.py"))
+        ],
+        help="Scripts to check (default: those plotting 20 Hz MAG data)",
+    )
+    parser.add_argument(
+        "--dpi",
+        type=float,
+        default=300,
+        help="Resolution to compare renders at (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=decimation.COMPARISON_TOLERANCE,
+        help="Ignore differences in a channel up to this, of 255 (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-fraction",
+        type=float,
+        default=MAX_DIFFERING_FRACTION,
+        help="Largest allowed fraction of differing pixels (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    failures = []
+    for script in args.scripts:
+        name = os.path.basename(script)
+        comparisons = []
+
+        def compare(fig, *_, **__):
+            comparisons.append(
+                decimation.compare_renders(fig, args.dpi, args.tolerance)
+            )
+
+        with mock.patch.object(matplotlib.figure.Figure, "savefig", compare):
+            runner.run_figure(script)
+
+        if not comparisons:
+            print(f"[failed] {name}: no figure was saved to compare")
+            failures.append(name)
+
+        for comparison in comparisons:
+            passed = comparison["differing_fraction"] <= args.max_fraction
+
+            print(
+                f"[{'same' if passed else 'different'}] {name}: "
+                f"{comparison['differing_fraction']:.3%} of pixels differ, "
+                f"render {comparison['full_seconds']:.2f} s -> "
+                f"{comparison['decimated_seconds']:.2f} s"
+            )
+
+            if not passed:
+                failures.append(name)
+
+    if failures:
+        print(f"Failed: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Script to compare the PDF size and save time of figures saved with their
+heavy artists rasterized (see helpers/rasterization.py) against saving them
+fully as vectors.
+
+Each figure script is run as normal, except that rather than saving the
+figure to ./figures/, it is saved to memory both ways, and the results
+reported.
+
+$ python ./scripts/compare_rasterization.py [SCRIPTS ...] [--dpi DPI]
+"""
+
+import argparse
+import glob
+import io
+import os
+import time
+from unittest import mock
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+
+from helpers import rasterization, runner
+
+# Figure scripts saved with rasterization
+RASTERIZED_FIGURES = ["fig01", "fig04", "fig08", "fig09", "fig10", "fig11", "fig12"]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Compare figures saved with and without rasterization"
+    )
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        default=[
+            script
+            for figure in RASTERIZED_FIGURES
+            for script in sorted(glob.glob(f"./scripts/{figure}*.py"))
+        ],
+        help="Scripts to compare (default: those saved with rasterization)",
+    )
+    parser.add_argument(
+        "--dpi",
+        type=float,
+        default=rasterization.RASTER_DPI,
+        help="Resolution of rasterized artists (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    for script in args.scripts:
+        name = os.path.basename(script)
+        results = []
+
+        def compare(fname, fig=None, dpi=None, **kwargs):
+            fig = plt.gcf() if fig is None else fig
+
+            vector_size, vector_time = save(fig, **kwargs)
+            with rasterization.heavy_artists_rasterized(fig) as artists:
+                raster_size, raster_time = save(fig, dpi=args.dpi, **kwargs)
+
+            results.append(
+                (len(artists), vector_size, vector_time, raster_size, raster_time)
+            )
+
+        with mock.patch.object(rasterization, "savefig", compare):
+            runner.run_figure(script)
+
+        for artists, vector_size, vector_time, raster_size, raster_time in results:
+            print(
+                f"{name}: {artists} artists rasterized, "
+                f"{vector_size / 1e6:.2f} MB -> {raster_size / 1e6:.2f} MB, "
+                f"saved in {vector_time:.2f} s -> {raster_time:.2f} s"
+            )
+
+
+def save(fig, **kwargs):
+    """Save a figure to memory, returning its size in bytes and the time taken."""
+    buffer = io.BytesIO()
+
+    start_time = time.perf_counter()
+    fig.savefig(buffer, **kwargs)
+
+    return buffer.getbuffer().nbytes, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Script to convert the downloaded resource files into the memory-mapped formats
+used by the figure scripts.
+
+This only needs to run once (and again if the resources change). The figure
+scripts will otherwise convert each file the first time it is loaded. The
+compact ephemeris (from the full mission) and the table of Mercury's
+heliocentric distance (from SPICE) are also computed here.
+
+$ python ./scripts/convert_resources.py
+
+The 20 Hz MAG store is built from the hermpy MAG data directory, and takes
+considerably longer, so must be requested explicitly:
+
+$ python ./scripts/convert_resources.py --mag
+
+The multi-resolution aggregates of the 20 Hz store (see
+helpers/mag_pyramid.py) are built along with it, or on their own from an
+existing store with --pyramid.
+"""
+
+import argparse
+import os
+
+from helpers import (
+    column_store,
+    ephemeris,
+    heliocentric,
+    mag_pyramid,
+    mag_store,
+    mission,
+    model_output_store,
+)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Convert resource files to memory-mapped formats"
+    )
+    parser.add_argument(
+        "--mag",
+        action="store_true",
+        help="Build the chunked 20 Hz MAG store from the raw MAG files",
+    )
+    parser.add_argument(
+        "--pyramid",
+        action="store_true",
+        help="Build the multi-resolution MAG aggregates from the 20 Hz store",
+    )
+    args = parser.parse_args()
+
+    for convert, source_path, store_path in [
+        (
+            mission.convert_mission,
+            mission.DEFAULT_MISSION_PATH,
+            mission.store_path_for(mission.DEFAULT_MISSION_PATH),
+        ),
+        (
+            model_output_store.convert_model_output,
+            model_output_store.DEFAULT_MODEL_OUTPUT_PATH,
+            model_output_store.store_path_for(
+                model_output_store.DEFAULT_MODEL_OUTPUT_PATH
+            ),
+        ),
+    ]:
+        if not os.path.exists(source_path):
+            continue
+
+        if column_store.is_current(store_path, source_path):
+            print(f"{store_path} is up to date")
+
+        else:
+            print(f"Converting {source_path} -> {store_path}")
+            convert(source_path, store_path)
+
+    mission_store_path = mission.store_path_for(mission.DEFAULT_MISSION_PATH)
+    if column_store.read_manifest(mission_store_path) is not None:
+        if ephemeris.is_current():
+            print(f"{ephemeris.EPHEMERIS_PATH} is up to date")
+
+        else:
+            print(f"Building {ephemeris.EPHEMERIS_PATH}")
+            ephemeris.build_ephemeris()
+
+    if heliocentric.is_current():
+        print(f"{heliocentric.TABLE_PATH} is up to date")
+
+    else:
+        print(f"Building {heliocentric.TABLE_PATH}")
+        heliocentric.build_table()
+
+    if args.mag:
+        from hermpy import utils
+
+        print(f"Building {mag_store.DEFAULT_STORE_PATH}")
+        mag_store.build_store(
+            utils.User.DATA_DIRECTORIES["MAG"],
+            mag_store.DEFAULT_STORE_PATH,
+            verbose=True,
+        )
+
+    if args.mag or args.pyramid:
+        if not mag_store.store_exists():
+            print("No 20 Hz MAG store to aggregate, build it with --mag")
+
+        elif mag_pyramid.is_current():
+            print(f"{mag_pyramid.PYRAMID_PATH} is up to date")
+
+        else:
+            print(f"Building {mag_pyramid.PYRAMID_PATH}")
+            mag_pyramid.build_pyramid(verbose=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,14 @@ import matplotlib.patheffects
 import matplotlib.pyplot as plt
 import numpy as np
 import spiceypy as spice
-from hermpy import mag, plotting, utils
+from helpers import histograms, rasterization, resources
+from hermpy import plotting, utils
 from hermpy.plotting import wong_colours
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
 wong_colours_list = list(wong_colours.values())
 
-data = mag.Load_Mission(utils.User.DATA_DIRECTORIES["FULL MISSION"])
-x_positions = data["X MSM' (radii)"]
-y_positions = data["Y MSM' (radii)"]
-z_positions = data["Z MSM' (radii)"]
+data = resources.full_mission(utils.User.DATA_DIRECTORIES["FULL MISSION"])
 
 orbits = [
     {
@@ -30,12 +28,12 @@ orbits = [
 
 x_bins = np.linspace(-5, 5, 50).tolist()
 z_bins = np.linspace(-8, 2, 50).tolist()
-xy_histogram, x_edges, y_edges = np.histogram2d(
-    x_positions, y_positions, bins=[x_bins, x_bins]
-)
-xz_histogram, x_edges, z_edges = np.histogram2d(
-    x_positions, z_positions, bins=[x_bins, z_bins]
+residence = histograms.residence_histograms(
+    {"xy": (x_bins, x_bins), "xz": (x_bins, z_bins)},
+    utils.User.DATA_DIRECTORIES["FULL MISSION"],
 )
+xy_histogram, x_edges, y_edges = residence["xy"], x_bins, x_bins
+xz_histogram, x_edges, z_edges = residence["xz"], x_bins, z_bins
 
 # These positions can then be plotted
 fig, axes = plt.subplots(1, 2, figsize=(8, 4))
@@ -109,4 +107,4 @@ for i, orbit in enumerate(orbits):
 
 plt.tight_layout()
 
-plt.savefig("./figures/fig01_trajectories_example.pdf", format="pdf")
+rasterization.savefig("./figures/fig01_trajectories_example.pdf", format="pdf")
@@ -9,7 +9,8 @@ import matplotlib.dates
 import matplotlib.pyplot as plt
 import matplotlib.ticker
 import numpy as np
-from hermpy import boundaries, mag, plotting, utils
+from helpers import decimation, mag_store, resources
+from hermpy import boundaries, plotting, utils
 
 wong_colours = {
     "black": "black",
@@ -23,7 +24,7 @@ wong_colours = {
 }
 
 # Load crossing intervals
-philpott_2020 = boundaries.Load_Crossings(utils.User.CROSSING_LISTS["Philpott"])
+philpott_2020_index = resources.crossing_interval_index("Philpott")
 
 # Start with quasi-perpendicular case.
 # Magnetic field is perpendicular to shock normal,
@@ -31,24 +32,37 @@ philpott_2020 = boundaries.Load_Crossings(utils.User.CROSSING_LISTS["Philpott"])
 start_time = dt.datetime(2012, 7, 2, hour=17, minute=25)
 end_time = dt.datetime(2012, 7, 2, hour=17, minute=40)
 
-data = mag.Load_Between_Dates(utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time)
+data = mag_store.load_between_dates(
+    utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time
+)
 
 fig, axes = plt.subplots(2, 1, figsize=(8, 7))
 
 # Plot MAG data
-axes[0].plot(
-    data["date"], data["|B|"], color=wong_colours["black"], label="$|B|$", zorder=5
+decimation.plot(
+    axes[0],
+    data["date"],
+    data["|B|"],
+    color=wong_colours["black"],
+    label="$|B|$",
+    zorder=5,
+)
+decimation.plot(
+    axes[0], data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$"
+)
+decimation.plot(
+    axes[0], data["date"], data["By"], color=wong_colours["green"], label="$B_y$"
+)
+decimation.plot(
+    axes[0], data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$"
 )
-axes[0].plot(data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$")
-axes[0].plot(data["date"], data["By"], color=wong_colours["green"], label="$B_y$")
-axes[0].plot(data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$")
 
 # Add boundary crossing interval
 boundaries.Plot_Crossing_Intervals(
     axes[0],
     start_time,
     end_time,
-    philpott_2020,
+    philpott_2020_index.overlapping(start_time, end_time),
     color=wong_colours["black"],
     lw=3,
     height=1.1,
@@ -59,22 +73,35 @@ boundaries.Plot_Crossing_Intervals(
 start_time = dt.datetime(2013, 4, 28, hour=16, minute=50)
 end_time = dt.datetime(2013, 4, 28, hour=17, minute=6)
 
-data = mag.Load_Between_Dates(utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time)
+data = mag_store.load_between_dates(
+    utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time
+)
 
 # Plot MAG data
-axes[1].plot(
-    data["date"], data["|B|"], color=wong_colours["black"], label="$|B|$", zorder=5
+decimation.plot(
+    axes[1],
+    data["date"],
+    data["|B|"],
+    color=wong_colours["black"],
+    label="$|B|$",
+    zorder=5,
+)
+decimation.plot(
+    axes[1], data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$"
+)
+decimation.plot(
+    axes[1], data["date"], data["By"], color=wong_colours["green"], label="$B_y$"
+)
+decimation.plot(
+    axes[1], data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$"
 )
-axes[1].plot(data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$")
-axes[1].plot(data["date"], data["By"], color=wong_colours["green"], label="$B_y$")
-axes[1].plot(data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$")
 
 # Add boundary crossing interval
 boundaries.Plot_Crossing_Intervals(
     axes[1],
     start_time,
     end_time,
-    philpott_2020,
+    philpott_2020_index.overlapping(start_time, end_time),
     color=wong_colours["black"],
     lw=3,
     height=1.1,
@@ -11,7 +11,8 @@ import matplotlib.dates
 import matplotlib.pyplot as plt
 import matplotlib.ticker
 import numpy as np
-from hermpy import boundaries, mag, plotting, utils
+from helpers import decimation, intervals, mag_store, resources
+from hermpy import boundaries, plotting, utils
 
 wong_colours = {
     "black": "black",
@@ -25,8 +26,9 @@ wong_colours = {
 }
 
 # Load crossing intervals
-philpott_2020 = boundaries.Load_Crossings(utils.User.CROSSING_LISTS["Philpott"])
+philpott_2020 = resources.crossing_intervals("Philpott")
 philpott_2020 = philpott_2020.loc[philpott_2020["Type"].str.contains("MP")]
+philpott_index = intervals.IntervalIndex(philpott_2020)
 
 # Clear example (single crossing, but interval not marked that way): 10,461
 # Unclear sample: 7875
@@ -35,39 +37,75 @@ philpott_2020 = philpott_2020.loc[philpott_2020["Type"].str.contains("MP")]
 start_time = philpott_2020.loc[10461]["Start Time"] - dt.timedelta(minutes=5)
 end_time = philpott_2020.loc[10461]["End Time"] + dt.timedelta(minutes=5)
 
-data = mag.Load_Between_Dates(utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time)
+data = mag_store.load_between_dates(
+    utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time
+)
 
 fig, axes = plt.subplots(2, 1, figsize=(8, 7))
 
 # Plot MAG data
-axes[0].plot(
-    data["date"], data["|B|"], color=wong_colours["black"], label="$|B|$", zorder=5
+decimation.plot(
+    axes[0],
+    data["date"],
+    data["|B|"],
+    color=wong_colours["black"],
+    label="$|B|$",
+    zorder=5,
+)
+decimation.plot(
+    axes[0], data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$"
+)
+decimation.plot(
+    axes[0], data["date"], data["By"], color=wong_colours["green"], label="$B_y$"
+)
+decimation.plot(
+    axes[0], data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$"
 )
-axes[0].plot(data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$")
-axes[0].plot(data["date"], data["By"], color=wong_colours["green"], label="$B_y$")
-axes[0].plot(data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$")
 
 # Add boundary crossing interval
 boundaries.Plot_Crossing_Intervals(
-    axes[0], start_time, end_time, philpott_2020, color=wong_colours["black"], lw=3
+    axes[0],
+    start_time,
+    end_time,
+    philpott_index.overlapping(start_time, end_time),
+    color=wong_colours["black"],
+    lw=3,
 )
 
 start_time = philpott_2020.loc[7875]["Start Time"] - dt.timedelta(minutes=5)
 end_time = philpott_2020.loc[7875]["End Time"] + dt.timedelta(minutes=5)
 
-data = mag.Load_Between_Dates(utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time)
+data = mag_store.load_between_dates(
+    utils.User.DATA_DIRECTORIES["MAG"], start_time, end_time
+)
 
 # Plot MAG data
-axes[1].plot(
-    data["date"], data["|B|"], color=wong_colours["black"], label="$|B|$", zorder=5
+decimation.plot(
+    axes[1],
+    data["date"],
+    data["|B|"],
+    color=wong_colours["black"],
+    label="$|B|$",
+    zorder=5,
+)
+decimation.plot(
+    axes[1], data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$"
+)
+decimation.plot(
+    axes[1], data["date"], data["By"], color=wong_colours["green"], label="$B_y$"
+)
+decimation.plot(
+    axes[1], data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$"
 )
-axes[1].plot(data["date"], data["Bx"], color=wong_colours["red"], label="$B_x$")
-axes[1].plot(data["date"], data["By"], color=wong_colours["green"], label="$B_y$")
-axes[1].plot(data["date"], data["Bz"], color=wong_colours["blue"], label="$B_z$")
 
 # Add boundary crossing interval
 boundaries.Plot_Crossing_Intervals(
-    axes[1], start_time, end_time, philpott_2020, color=wong_colours["black"], lw=3
+    axes[1],
+    start_time,
+    end_time,
+    philpott_index.overlapping(start_time, end_time),
+    color=wong_colours["black"],
+    lw=3,
 )
 
 # Make legend lines larger
@@ -1,7 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-from hermpy import boundaries, mag, plotting, trajectory, utils
+from helpers import ephemeris, histograms, rasterization, resources
+from hermpy import plotting, trajectory, utils
 
 wong_colours = {
     "black": "black",
@@ -16,7 +16,7 @@ wong_colours = {
 
 
 # Load crossing intervals
-crossing_intervals = boundaries.Load_Crossings(utils.User.CROSSING_LISTS["Philpott"])
+crossing_intervals = resources.crossing_intervals("Philpott")
 
 # We need to consider one point for each crossing in this plot
 # We generate a new column with the position of MESSENGER at the
@@ -26,13 +26,8 @@ crossing_intervals["Mid Time"] = (
     + (crossing_intervals["End Time"] - crossing_intervals["Start Time"]) / 2
 )
 
-full_mission = mag.Load_Mission("./resources/messenger_mag")
-crossing_intervals = pd.merge_asof(
-    crossing_intervals,
-    full_mission,
-    left_on="Mid Time",
-    right_on="date",
-    direction="nearest",
+crossing_intervals = ephemeris.merge_positions(
+    crossing_intervals, "Mid Time", "./resources/messenger_mag"
 )
 
 bow_shock_intervals = crossing_intervals.loc[
@@ -50,13 +45,6 @@ magnetopause_locations = magnetopause_intervals[
 ].to_numpy()
 
 # To normalise these distributions by residence, we need the ammount of time spent in each bin.
-# Load full mission to get trajectory
-positions = [
-    full_mission["X MSM' (radii)"],
-    full_mission["Y MSM' (radii)"],
-    full_mission["Z MSM' (radii)"],
-]
-
 bin_size = 0.5
 x_bins = np.arange(-5, 5 + bin_size, bin_size)
 y_bins = np.arange(-5, 5 + bin_size, bin_size)
@@ -64,14 +52,14 @@ z_bins = np.arange(-8, 2 + bin_size, bin_size)
 cyl_bins = np.arange(0, 10 + bin_size, bin_size)
 
 # Get residence histograms. These are the frequency of data points. We have
-# loaded 1 second average data.
-residence_xy, _, _ = np.histogram2d(positions[0], positions[1], bins=[x_bins, y_bins])
-residence_xz, _, _ = np.histogram2d(positions[0], positions[2], bins=[x_bins, z_bins])
-residence_cyl, _, _ = np.histogram2d(
-    positions[0],
-    np.sqrt(positions[1] ** 2 + positions[2] ** 2),
-    bins=[x_bins, cyl_bins],
+# loaded 1 second average data. These are cached, as the bins rarely change.
+residence = histograms.residence_histograms(
+    {"xy": (x_bins, y_bins), "xz": (x_bins, z_bins), "cyl": (x_bins, cyl_bins)},
+    "./resources/messenger_mag",
 )
+residence_xy = residence["xy"]
+residence_xz = residence["xz"]
+residence_cyl = residence["cyl"]
 
 fig, axes = plt.subplots(2, 3, figsize=(10, 7))
 
@@ -232,7 +220,7 @@ for i, (axes, positions) in enumerate(
 
 
 fig.subplots_adjust(left=0.07, top=0.9, bottom=0.1, wspace=0.3, hspace=0.05)
-plt.savefig(
+rasterization.savefig(
     "./figures/fig04_crossing_intervals_spatial_spread.pdf",
     format="pdf",
 )
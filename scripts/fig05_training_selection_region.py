@@ -7,13 +7,14 @@ import datetime as dt
 import matplotlib.patheffects
 import matplotlib.pyplot as plt
 import numpy as np
-from hermpy import boundaries, mag, plotting, utils
+from helpers import decimation, mag_store, resources
+from hermpy import boundaries, plotting, utils
 from hermpy.plotting import wong_colours
 
 colours = ["black", wong_colours["red"], wong_colours["green"], wong_colours["blue"]]
 
 # import crossings
-crossings = boundaries.Load_Crossings(utils.User.CROSSING_LISTS["Philpott"])
+crossings = resources.crossing_intervals("Philpott")
 
 # Limit to bow shock crossings only
 crossings = crossings.loc[crossings["Type"].str.contains("BS")]
@@ -41,7 +42,7 @@ time_buffer = dt.timedelta(minutes=1)
 all_times = [sw_sample_start, sw_sample_end, msh_sample_start, msh_sample_end]
 
 # Load the data
-data = mag.Load_Between_Dates(
+data = mag_store.load_between_dates(
     utils.User.DATA_DIRECTORIES["MAG"],
     min(all_times) - time_buffer,
     max(all_times) + time_buffer,
@@ -63,14 +64,16 @@ right_sample_axis = plt.subplot2grid(
 axes = (mag_axis, left_sample_axis, right_sample_axis)
 
 # Plot time series
-mag_axis.plot(
+decimation.plot(
+    mag_axis,
     data["date"],
     data["|B|"],
     color=wong_colours["black"],
     lw=1,
     label="|B|",
 )
-mag_axis.plot(
+decimation.plot(
+    mag_axis,
     data["date"],
     data["Bx"],
     color=wong_colours["red"],
@@ -81,7 +84,8 @@ mag_axis.plot(
         matplotlib.patheffects.Normal(),
     ],
 )
-mag_axis.plot(
+decimation.plot(
+    mag_axis,
     data["date"],
     data["By"],
     color=wong_colours["green"],
@@ -92,7 +96,8 @@ mag_axis.plot(
         matplotlib.patheffects.Normal(),
     ],
 )
-mag_axis.plot(
+decimation.plot(
+    mag_axis,
     data["date"],
     data["Bz"],
     color=wong_colours["blue"],
@@ -104,11 +109,17 @@ mag_axis.plot(
     ],
 )
 
+# Bow shock crossings within the window, from the cached index of the full list
+window_crossings = resources.crossing_interval_index("Philpott").overlapping(
+    data["date"].iloc[0], data["date"].iloc[-1]
+)
+window_crossings = window_crossings.loc[window_crossings["Type"].str.contains("BS")]
+
 boundaries.Plot_Crossing_Intervals(
     mag_axis,
     data["date"].iloc[0],
     data["date"].iloc[-1],
-    crossings,
+    window_crossings,
     color="black",
     lw=3,
     height=0.95,
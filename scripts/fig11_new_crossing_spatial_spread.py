@@ -3,7 +3,8 @@ import matplotlib.colors
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from hermpy import mag, plotting, trajectory, utils
+from helpers import ephemeris, histograms, rasterization
+from hermpy import plotting, trajectory, utils
 
 wong_colours = {
     "black": "black",
@@ -23,15 +24,10 @@ crossings["Time"] = pd.to_datetime(crossings["Times"])
 crossings["Transition"] = crossings["Label"]
 
 # Find the position of each crossing
-# Load full mission data
-full_mission = mag.Load_Mission("./resources/messenger_mag")
-
-# Add on the columns of full_mission for the rows in crossings
-# Does this using the nearest element
-# Its so fast omg
-crossings = pd.merge_asof(
-    crossings, full_mission, left_on="Time", right_on="date", direction="nearest"
-)
+# Add on the position columns of the full mission for the rows in crossings
+# These are interpolated from the compact ephemeris, so the full mission isn't
+# loaded
+crossings = ephemeris.merge_positions(crossings, "Time", "./resources/messenger_mag")
 
 bow_shock_crossings = crossings.loc[crossings["Transition"].str.contains("BS")].copy()
 magnetopause_crossings = crossings.loc[
@@ -39,13 +35,6 @@ magnetopause_crossings = crossings.loc[
 ].copy()
 
 # To normalise these distributions by residence, we need the ammount of time spent in each bin.
-# Load full mission to get trajectory
-positions = [
-    full_mission["X MSM' (radii)"],
-    full_mission["Y MSM' (radii)"],
-    full_mission["Z MSM' (radii)"],
-]
-
 bin_size = 0.5
 x_bins = np.arange(-5, 5 + bin_size, bin_size)
 y_bins = np.arange(-5, 5 + bin_size, bin_size)
@@ -53,14 +42,14 @@ z_bins = np.arange(-8, 2 + bin_size, bin_size)
 cyl_bins = np.arange(0, 10 + bin_size, bin_size)
 
 # Get residence histograms. These are the frequency of data points. We have
-# loaded 1 second average data.
-residence_xy, _, _ = np.histogram2d(positions[0], positions[1], bins=[x_bins, y_bins])
-residence_xz, _, _ = np.histogram2d(positions[0], positions[2], bins=[x_bins, z_bins])
-residence_cyl, _, _ = np.histogram2d(
-    positions[0],
-    np.sqrt(positions[1] ** 2 + positions[2] ** 2),
-    bins=[x_bins, cyl_bins],
+# loaded 1 second average data. These are cached, as the bins rarely change.
+residence = histograms.residence_histograms(
+    {"xy": (x_bins, y_bins), "xz": (x_bins, z_bins), "cyl": (x_bins, cyl_bins)},
+    "./resources/messenger_mag",
 )
+residence_xy = residence["xy"]
+residence_xz = residence["xz"]
+residence_cyl = residence["cyl"]
 
 fig, axes = plt.subplots(2, 3, figsize=(10.5, 7))
 
@@ -221,7 +210,7 @@ for i, (axes, positions) in enumerate(
 
 
 fig.subplots_adjust(left=0.07, top=0.9, bottom=0.1, wspace=0.3, hspace=0.05)
-plt.savefig(
+rasterization.savefig(
     "./figures/fig11_new_crossing_spatial_spread.pdf",
     format="pdf",
 )
@@ -2,7 +2,8 @@ import matplotlib.colors
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from hermpy import boundaries, mag, plotting, utils
+from helpers import ephemeris, histograms, rasterization, resources
+from hermpy import plotting, utils
 from mpl_toolkits.axes_grid1 import make_axes_locatable
 
 wong_colours = {
@@ -19,14 +20,11 @@ wong_colours = {
 
 def main():
 
-    # Load full mission data
-    full_mission = mag.Load_Mission("./resources/messenger_mag")
-
-    bow_shock_intervals_spread, magnetopause_intervals_spread = get_intervals_spread(
-        full_mission
-    )
+    # Positions are interpolated from the compact ephemeris, rather than
+    # joined from the full mission
+    bow_shock_intervals_spread, magnetopause_intervals_spread = get_intervals_spread()
     bow_shock_individual_spread, magnetopause_individual_spread = (
-        get_individual_crossing_spread(full_mission)
+        get_individual_crossing_spread()
     )
 
     fig, axes = plt.subplots(2, 3, figsize=(10, 5), sharex=True, sharey=True)
@@ -84,7 +82,7 @@ def main():
 
     # plt.show()
     plt.tight_layout()
-    plt.savefig(
+    rasterization.savefig(
         "./figures/fig12_spatial_difference.pdf",
         format="pdf",
     )
@@ -177,7 +175,7 @@ def plot_difference(hist_a, hist_b, ax, label_x=False, label_y=False):
     return mesh
 
 
-def get_individual_crossing_spread(full_mission):
+def get_individual_crossing_spread():
 
     # Load crossings
     crossings = pd.read_csv("./resources/hollman_2025_crossing_list.csv")
@@ -185,35 +183,24 @@ def get_individual_crossing_spread(full_mission):
 
     # Find the position of each crossing
 
-    # Add on the columns of full_mission for the rows in crossings
-    # Does this using the nearest element
-    # Its so fast omg
-    crossings = pd.merge_asof(
-        crossings, full_mission, left_on="Time", right_on="date", direction="nearest"
+    # Add on the position columns of the full mission for the rows in crossings
+    crossings = ephemeris.merge_positions(
+        crossings, "Time", "./resources/messenger_mag"
     )
 
     bow_shock_crossings = crossings.loc[crossings["Label"].str.contains("BS")].copy()
     magnetopause_crossings = crossings.loc[crossings["Label"].str.contains("MP")].copy()
 
     # To normalise these distributions by residence, we need the ammount of time spent in each bin.
-    # Load full mission to get trajectory
-    positions = [
-        full_mission["X MSM' (radii)"],
-        full_mission["Y MSM' (radii)"],
-        full_mission["Z MSM' (radii)"],
-    ]
-
     bin_size = 0.5
     x_bins = np.arange(-5, 5 + bin_size, bin_size)
     cyl_bins = np.arange(0, 10 + bin_size, bin_size)
 
     # Get residence histograms. These are the frequency of data points. We have
-    # loaded 1 second average data.
-    residence_cyl, _, _ = np.histogram2d(
-        positions[0],
-        np.sqrt(positions[1] ** 2 + positions[2] ** 2),
-        bins=[x_bins, cyl_bins],
-    )
+    # loaded 1 second average data. These are cached, as the bins rarely change.
+    residence_cyl = histograms.residence_histograms(
+        {"cyl": (x_bins, cyl_bins)}, "./resources/messenger_mag"
+    )["cyl"]
 
     hist_data = []
     for i, positions in enumerate(
@@ -245,12 +232,10 @@ def get_individual_crossing_spread(full_mission):
     return hist_data
 
 
-def get_intervals_spread(full_mission):
+def get_intervals_spread():
 
     # Load crossing intervals
-    crossing_intervals = boundaries.Load_Crossings(
-        utils.User.CROSSING_LISTS["Philpott"]
-    )
+    crossing_intervals = resources.crossing_intervals("Philpott")
 
     # We need to consider one point for each crossing in this plot
     # We generate a new column with the position of MESSENGER at the
@@ -260,12 +245,8 @@ def get_intervals_spread(full_mission):
         + (crossing_intervals["End Time"] - crossing_intervals["Start Time"]) / 2
     )
 
-    crossing_intervals = pd.merge_asof(
-        crossing_intervals,
-        full_mission,
-        left_on="Mid Time",
-        right_on="date",
-        direction="nearest",
+    crossing_intervals = ephemeris.merge_positions(
+        crossing_intervals, "Mid Time", "./resources/messenger_mag"
     )
 
     bow_shock_intervals = crossing_intervals.loc[
@@ -283,24 +264,15 @@ def get_intervals_spread(full_mission):
     ].to_numpy()
 
     # To normalise these distributions by residence, we need the ammount of time spent in each bin.
-    # Load full mission to get trajectory
-    positions = [
-        full_mission["X MSM' (radii)"],
-        full_mission["Y MSM' (radii)"],
-        full_mission["Z MSM' (radii)"],
-    ]
-
     bin_size = 0.5
     x_bins = np.arange(-5, 5 + bin_size, bin_size)
     cyl_bins = np.arange(0, 10 + bin_size, bin_size)
 
     # Get residence histograms. These are the frequency of data points. We have
-    # loaded 1 second average data.
-    residence_cyl, _, _ = np.histogram2d(
-        positions[0],
-        np.sqrt(positions[1] ** 2 + positions[2] ** 2),
-        bins=[x_bins, cyl_bins],
-    )
+    # loaded 1 second average data. These are cached, as the bins rarely change.
+    residence_cyl = histograms.residence_histograms(
+        {"cyl": (x_bins, cyl_bins)}, "./resources/messenger_mag"
+    )["cyl"]
 
     hist_data = []
     for positions in [bow_shock_locations, magnetopause_locations]:
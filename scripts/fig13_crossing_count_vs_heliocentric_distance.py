@@ -6,7 +6,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import scipy.stats
-from hermpy import boundaries, trajectory, utils
+from helpers import heliocentric, resources
+from hermpy import utils
 
 wong_colours = {
     "black": "black",
@@ -25,9 +26,7 @@ crossings = pd.read_csv("./resources/hollman_2025_crossing_list.csv")
 crossings["Time"] = pd.to_datetime(crossings["Times"])
 crossings["Transition"] = crossings["Label"]
 
-philpott_intervals = boundaries.Load_Crossings(
-    utils.User.CROSSING_LISTS["Philpott"], include_data_gaps=False
-)
+philpott_intervals = resources.crossing_intervals("Philpott", include_data_gaps=False)
 
 bow_shock_crossings = crossings.loc[crossings["Transition"].str.contains("BS")].copy()
 magnetopause_crossings = crossings.loc[
@@ -36,10 +35,10 @@ magnetopause_crossings = crossings.loc[
 
 # Get heliocentric distances
 bow_shock_crossings["Heliocentric Distance"] = utils.Constants.KM_TO_AU(
-    trajectory.Get_Heliocentric_Distance(bow_shock_crossings["Time"])
+    heliocentric.get_heliocentric_distance(bow_shock_crossings["Time"])
 )
 magnetopause_crossings["Heliocentric Distance"] = utils.Constants.KM_TO_AU(
-    trajectory.Get_Heliocentric_Distance(magnetopause_crossings["Time"])
+    heliocentric.get_heliocentric_distance(magnetopause_crossings["Time"])
 )
 
 philpott_intervals["Mid Time"] = (
@@ -47,7 +46,7 @@ philpott_intervals["Mid Time"] = (
     + (philpott_intervals["End Time"] - philpott_intervals["Start Time"]) / 2
 )
 philpott_intervals["Heliocentric Distance"] = utils.Constants.KM_TO_AU(
-    trajectory.Get_Heliocentric_Distance(philpott_intervals["Mid Time"])
+    heliocentric.get_heliocentric_distance(philpott_intervals["Mid Time"])
 )
 
 bin_size = 0.01
@@ -5,18 +5,19 @@ Script to see how the duration of crossing intervals changes with heliocentric d
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from hermpy import boundaries, trajectory, utils
+from helpers import heliocentric, resources
+from hermpy import utils
 
 only_of_type = "BS"  # "", "BS", "MP"
 
 # Load Philpott intervals
-philpott_intervals = boundaries.Load_Crossings(
-    utils.User.CROSSING_LISTS["Philpott"], include_data_gaps=False, backend="Philpott"
+philpott_intervals = resources.crossing_intervals(
+    "Philpott", include_data_gaps=False, backend="Philpott"
 )
 
 # Load Sun intervals
-sun_intervals = boundaries.Load_Crossings(
-    utils.User.CROSSING_LISTS["Sun"], include_data_gaps=False, backend="Sun"
+sun_intervals = resources.crossing_intervals(
+    "Sun", include_data_gaps=False, backend="Sun"
 )
 
 if only_of_type != "":
@@ -53,7 +54,7 @@ for intervals in [philpott_intervals, sun_intervals]:
         intervals["Start Time"] + (intervals["End Time"] - intervals["Start Time"]) / 2
     )
     intervals["Heliocentric Distance (AU)"] = utils.Constants.KM_TO_AU(
-        trajectory.Get_Heliocentric_Distance(intervals["Mid Time"])
+        heliocentric.get_heliocentric_distance(intervals["Mid Time"])
     )
 
 philpott_intervals = philpott_intervals.dropna()
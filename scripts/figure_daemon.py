@@ -0,0 +1,282 @@
+"""
+Script to keep a warm python process for re-rendering figures while editing
+them.
+
+Starting a figure script imports matplotlib, scipy, hermpy, etc., and loads
+its resources, before anything is drawn. The daemon does this once, and then
+re-runs figure scripts on request (see helpers/runner.py), so each re-render
+only pays for the drawing itself. Edits to a figure script, and to any
+modules in ./scripts/helpers/, are picked up on the next render.
+
+Start the daemon (in its own terminal):
+
+$ python ./scripts/figure_daemon.py serve
+
+Then, re-render figures by name:
+
+$ python ./scripts/figure_daemon.py render fig08 fig11
+
+and stop it with:
+
+$ python ./scripts/figure_daemon.py stop
+
+The client only connects to the daemon over a local socket, so starts
+quickly. This is a unix socket (./resources/figure_daemon.sock) which only
+its owner can connect to, and only scripts matching ./scripts/fig*.py are
+run.
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+
+DEFAULT_SOCKET_PATH = "./resources/figure_daemon.sock"
+
+# Modules imported when the daemon starts, rather than by the first script to
+# use them
+WARM_MODULES = [
+    "matplotlib.pyplot",
+    "numpy",
+    "pandas",
+    "scipy.stats",
+    "seaborn",
+    "hermpy.boundaries",
+    "hermpy.mag",
+    "hermpy.plotting",
+    "hermpy.trajectory",
+    "hermpy.utils",
+]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Keep a warm process for re-rendering figures"
+    )
+    parser.add_argument(
+        "-s",
+        "--socket",
+        default=DEFAULT_SOCKET_PATH,
+        help="Path of the daemon's unix socket (default: %(default)s)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Start the daemon")
+    serve_parser.add_argument(
+        "--preload",
+        action="store_true",
+        help="Load the full mission and crossing lists on start",
+    )
+
+    render_parser = subparsers.add_parser("render", help="Re-render figures")
+    render_parser.add_argument(
+        "figures", nargs="+", help="Figure names (e.g. fig08) or script paths"
+    )
+
+    subparsers.add_parser("stop", help="Stop the daemon")
+
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket, args.preload)
+
+    elif args.command == "render":
+        failed = False
+
+        for figure in args.figures:
+            response = request(args.socket, {"command": "render", "figure": figure})
+
+            if response["error"] is None:
+                print(f"[done] {response['name']} ({response['elapsed']:.1f} s)")
+
+            else:
+                print(response["error"])
+                print(f"[failed] {response['name']}")
+                failed = True
+
+        if failed:
+            sys.exit(1)
+
+    else:
+        request(args.socket, {"command": "stop"})
+
+
+def request(socket_path, message):
+    """Send a message to the daemon, and return its response."""
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        connection.connect(socket_path)
+
+    except (ConnectionRefusedError, FileNotFoundError):
+        connection.close()
+        sys.exit(
+            f"No daemon is listening at {socket_path}. Start one with:\n"
+            "python ./scripts/figure_daemon.py serve"
+        )
+
+    with connection, connection.makefile("rw") as stream:
+        stream.write(json.dumps(message) + "\n")
+        stream.flush()
+
+        return json.loads(stream.readline())
+
+
+def serve(socket_path, preload=False):
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+
+    from helpers import resources
+    from hermpy import utils
+
+    if preload:
+        # With the path the figures load it by, as it is cached by path
+        resources.full_mission(utils.User.DATA_DIRECTORIES["FULL MISSION"])
+        resources.crossing_intervals("Philpott")
+        resources.crossing_intervals("Philpott", include_data_gaps=True)
+
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    remove_stale_socket(socket_path)
+
+    # Only the owner may connect. The socket is created with these
+    # permissions, so there is no moment another user could connect first.
+    umask = os.umask(0o177)
+    try:
+        # Figures are rendered one at a time, as matplotlib isn't thread safe
+        server = socketserver.UnixStreamServer(socket_path, RequestHandler)
+    finally:
+        os.umask(umask)
+
+    try:
+        os.chmod(socket_path, 0o600)
+        server.module_times = module_times()
+        server.stopping = False
+
+        print(f"Listening at {socket_path}")
+        while not server.stopping:
+            server.handle_request()
+
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+
+
+def remove_stale_socket(socket_path):
+    """Remove the socket left by a daemon which didn't stop cleanly."""
+    if not os.path.exists(socket_path):
+        return
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+
+    except ConnectionRefusedError:
+        os.remove(socket_path)
+        return
+
+    finally:
+        probe.close()
+
+    sys.exit(f"A daemon is already listening at {socket_path}")
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        message = json.loads(self.rfile.readline())
+
+        if message["command"] == "stop":
+            self.server.stopping = True
+            self.respond({})
+            return
+
+        script = find_script(message["figure"])
+        if script is None:
+            self.respond(
+                {
+                    "name": message["figure"],
+                    "elapsed": 0,
+                    "error": f"No single figure script matches {message['figure']}",
+                }
+            )
+            return
+
+        try:
+            reload_changed_modules(self.server.module_times)
+
+            from render_all import run_script
+
+            name, elapsed, error = run_script(script)
+
+        except Exception:
+            # e.g. a syntax error in an edited helper
+            name, elapsed, error = os.path.basename(script), 0, traceback.format_exc()
+
+        # Record modules first imported by the script
+        self.server.module_times = {
+            **module_times(),
+            **self.server.module_times,
+        }
+        print(f"[{'done' if error is None else 'failed'}] {name} ({elapsed:.1f} s)")
+
+        self.respond({"name": name, "elapsed": elapsed, "error": error})
+
+    def respond(self, response):
+        self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+def find_script(figure):
+    """
+    The figure script given by name (e.g. fig08) or path, or None unless it is
+    exactly one of ./scripts/fig*.py.
+    """
+    scripts = {os.path.realpath(path): path for path in glob.glob("./scripts/fig*.py")}
+
+    if os.path.realpath(figure) in scripts:
+        return scripts[os.path.realpath(figure)]
+
+    matches = [
+        path for path in scripts.values() if os.path.basename(path).startswith(figure)
+    ]
+    return matches[0] if len(matches) == 1 else None
+
+
+def module_times():
+    """The modification time of each module imported from ./scripts/."""
+    scripts_directory = os.path.abspath(os.path.dirname(__file__))
+    times = {}
+
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+
+        if path is not None and os.path.abspath(path).startswith(scripts_directory):
+            times[name] = os.stat(path).st_mtime_ns
+
+    return times
+
+
+def reload_changed_modules(times):
+    """
+    Reload modules from ./scripts/ which have been edited since they were
+    imported. helpers.resources is never reloaded, to keep its cached
+    resources.
+    """
+    for name, modified_time in module_times().items():
+        if name == "helpers.resources":
+            continue
+
+        if times.get(name, modified_time) != modified_time:
+            print(f"Reloading {name}")
+            importlib.reload(sys.modules[name])
+
+    times.update(module_times())
+
+
+if __name__ == "__main__":
+    main()
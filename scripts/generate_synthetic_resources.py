@@ -0,0 +1,72 @@
+"""
+Script to generate a synthetic set of resources (see helpers/synthetic.py), to
+build and benchmark the figures without the Zenodo archive, or at larger
+scales than the real mission.
+
+$ python ./scripts/generate_synthetic_resources.py --scale 1 --output ./synthetic
+
+The figures can then be built against them from that directory, e.g. with:
+
+$ python ./scripts/benchmark_figures.py --root ./synthetic --label synthetic-1x
+
+SPICE kernels are still needed for the figures which add ephemeris tick
+labels, and for heliocentric distances beyond the real mission (scales above
+1).
+"""
+
+import argparse
+import time
+
+from helpers import synthetic
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Generate synthetic resources")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Length of the mission relative to the real one, e.g. 0.1, 1, or 10 "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        default="./synthetic",
+        help="Directory to create ./resources/ and ./figures/ in "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--mag-windows",
+        type=int,
+        default=100,
+        help="Crossing groups to write 20 Hz MAG data around, as well as those "
+        "shown in the figures (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--pickle",
+        action="store_true",
+        help="Write the full mission as a pickle, rather than directly as the "
+        "column store. Needs the whole mission in memory.",
+    )
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+
+    synthetic.generate_resources(
+        args.output,
+        scale=args.scale,
+        seed=args.seed,
+        mag_windows=args.mag_windows,
+        write_pickle=args.pickle,
+        verbose=True,
+    )
+
+    print(f"Generated in {time.perf_counter() - start_time:.0f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Shared helpers used by the figure scripts in ./scripts/
+
+The figure scripts are run from the repository base directory (e.g.
+`python ./scripts/fig01_trajectories_example.py`), which places ./scripts/ on
+the python path and lets them `import helpers`.
+"""
@@ -0,0 +1,424 @@
+"""
+The application example figure: 20 Hz MAG data and the model's region
+probabilities around one crossing group, with the Philpott crossing intervals
+and the new crossings found from the model output.
+
+Used by the application example figures (./scripts/fig08*.py, fig09*.py, and
+fig10*.py), and to render many groups at once with
+./scripts/render_application_examples.py.
+"""
+
+import collections
+import datetime as dt
+
+import matplotlib.dates
+import matplotlib.patheffects
+import matplotlib.pyplot as plt
+import matplotlib.ticker
+import matplotlib.transforms
+import numpy as np
+import pandas as pd
+from hermpy import plotting, utils
+from hermpy.plotting import wong_colours
+
+from . import decimation, mag_store, model_output_store, resources
+
+
+def load_new_crossings():
+    new_crossings = pd.read_csv("./resources/new_crossings.csv")
+    new_crossings["Time"] = pd.to_datetime(new_crossings["Time"])
+
+    return new_crossings
+
+
+def plot_crossing_group(
+    crossing_group, new_crossings: pd.DataFrame, major_tick_minutes=20, xlim=None
+):
+    """
+    Plot the application example figure around a crossing group.
+
+    Parameters
+    ----------
+    crossing_group : list[pandas.Series]
+        The Philpott crossing intervals in the group, e.g. from
+        `grouping.group_rows`.
+    new_crossings : pandas.DataFrame
+        The new crossing list, from `load_new_crossings`.
+    major_tick_minutes : int, optional
+        Minutes between the major time ticks.
+    xlim : tuple | None, optional
+        (left, right) time limits to zoom in to, either of which may be None
+        to keep that edge of the data. By default, the whole window around the
+        group is shown.
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+    """
+
+    # Load data around the interval
+    interval_buffer = dt.timedelta(minutes=10)
+
+    # Groups contain one or two intervals
+    start = crossing_group[0]["Start Time"] - interval_buffer
+    end = crossing_group[-1]["End Time"] + interval_buffer
+
+    # print("Loading data")
+    # print(f"Start: {start}")
+    # print(f"End: {end}")
+    messenger_data = mag_store.load_between_dates(
+        utils.User.DATA_DIRECTORIES["MAG"], start, end
+    )
+
+    # Get model_ouput between these times
+    probabilities = model_output_store.load_model_output_between(
+        start, end, "./resources/model_raw_output.csv"
+    )
+
+    # Search the model output for new crossings in this interval
+    crossings_in_data = new_crossings.loc[
+        new_crossings["Time"].between(start, end)
+    ].reset_index(drop=True)
+
+    # Create a figure and plot the mag data
+    # print("Creating plot")
+    fig, axes = plt.subplots(3, 1, sharex=True, figsize=(9, 11))
+    magnitude_axis, components_axis, probability_axis = axes
+
+    # Plot the magnetic field components
+    for component, component_label, colour in zip(
+        ["Bx", "By", "Bz"], ["$B_x$", "$B_y$", "$B_z$"], ["red", "green", "blue"]
+    ):
+        decimation.plot(
+            components_axis,
+            messenger_data["date"],
+            messenger_data[component],
+            color=wong_colours[colour],
+            label=component_label,
+            path_effects=[  # Add a black outline to the line
+                matplotlib.patheffects.Stroke(linewidth=2, foreground="k"),
+                matplotlib.patheffects.Normal(),
+            ],
+            zorder=1.5,
+        )
+
+    decimation.plot(
+        magnitude_axis,
+        messenger_data["date"],
+        messenger_data["|B|"],
+        color=wong_colours["black"],
+        zorder=1.5,
+    )
+
+    magnitude_axis.set_ylabel("|B| [nT]")
+
+    components_axis.set_ylabel("Magnetic Field Strength [nT]")
+    components_axis.axhline(0, color="black", ls="dotted", lw=2)
+    leg = components_axis.legend(loc="lower right")
+    for legobj in leg.legend_handles:
+        legobj.set_linewidth(5)
+
+    for ax in axes:
+        ax.margins(0)
+
+    probability_axis.plot(
+        probabilities["Time"],
+        probabilities["P(SW)"],
+        color=wong_colours["yellow"],
+        path_effects=[  # Add a black outline to the line
+            matplotlib.patheffects.Stroke(linewidth=2, foreground="k"),
+            matplotlib.patheffects.Normal(),
+        ],
+        label="P(SW)",
+    )
+    probability_axis.plot(
+        probabilities["Time"],
+        probabilities["P(MSh)"],
+        color=wong_colours["orange"],
+        path_effects=[  # Add a black outline to the line
+            matplotlib.patheffects.Stroke(linewidth=2, foreground="k"),
+            matplotlib.patheffects.Normal(),
+        ],
+        label="P(MSh)",
+    )
+    probability_axis.plot(
+        probabilities["Time"],
+        probabilities["P(MSp)"],
+        color=wong_colours["light blue"],
+        path_effects=[  # Add a black outline to the line
+            matplotlib.patheffects.Stroke(linewidth=2, foreground="k"),
+            matplotlib.patheffects.Normal(),
+        ],
+        label="P(MSp)",
+    )
+    leg = probability_axis.legend(loc="center right")
+    for legobj in leg.legend_handles:
+        legobj.set_linewidth(5)
+
+    probability_axis.set_ylim(0, 1)
+    probability_axis.set_ylabel("Class Probability")
+
+    # Add boundary crossing intervals
+    # We only need start time within the data as crossing groups never spans
+    # part of an interval only
+    intervals_within_data = resources.crossing_interval_index(
+        "Philpott", include_data_gaps=True
+    ).starting_between(start, end)
+
+    # Text-box formatting
+    text_box_formatting = dict(
+        boxstyle="square", facecolor="white", edgecolor="black", pad=0.2, alpha=1
+    )
+
+    # LINES BEHIND AXES
+    for _, crossing_interval in intervals_within_data.iterrows():
+
+        span = magnitude_axis.axvspan(
+            crossing_interval["Start Time"],
+            crossing_interval["End Time"],
+            ymin=-2,
+            ymax=0,
+            fill=False,
+            lw=2,
+            ls="dashed",
+            color=wong_colours["pink"],
+            hatch="/",
+            zorder=-1,
+        )
+
+        mid_point = (
+            crossing_interval["Start Time"]
+            + (crossing_interval["End Time"] - crossing_interval["Start Time"]) / 2
+        )
+
+        ax_1_transform = matplotlib.transforms.blended_transform_factory(
+            axes[0].transData, axes[0].transAxes
+        )
+        axes[0].text(
+            mid_point,
+            -fig.subplotpars.hspace / 2,
+            crossing_interval["Type"].replace("_", " "),
+            ha="center",
+            va="center",
+            transform=ax_1_transform,
+            bbox=text_box_formatting,
+        )
+
+        ax_2_transform = matplotlib.transforms.blended_transform_factory(
+            axes[1].transData, axes[1].transAxes
+        )
+        axes[1].text(
+            mid_point,
+            -fig.subplotpars.hspace / 2,
+            crossing_interval["Type"].replace("_", " "),
+            ha="center",
+            va="center",
+            transform=ax_2_transform,
+            bbox=text_box_formatting,
+        )
+
+        # start_line.set_clip_on(False)
+        # end_line.set_clip_on(False)
+        span.set_clip_on(False)
+
+        # HATCHING
+        for ax in axes:
+            ax.axvspan(
+                crossing_interval["Start Time"],
+                crossing_interval["End Time"],
+                fill=False,
+                ls="dashed",
+                lw=2,
+                color=wong_colours["pink"],
+                hatch="/",
+                zorder=2,
+                label="Philpott+ (2020) Crossing Intervals" if ax != axes[-1] else "",
+            )
+
+    # Plot new crossings
+
+    crossing_labels = []
+    for index, c in crossings_in_data.iterrows():
+
+        for ax in axes:
+            ax.axvline(
+                c["Time"],
+                color="black",
+                ls="dashed",
+                zorder=5,
+                label="Boundary Crossings (this work)",
+            )
+
+        assert isinstance(index, int)
+
+        label_y = np.linspace(1.05, 1.3, 4)[index % 4]
+        crossing_label = magnitude_axis.text(
+            c["Time"],
+            label_y,
+            (
+                c["Transition"].replace("_", " ")
+                if "UKN" not in c["Transition"]
+                else "UKN"
+            ),
+            va="bottom",
+            ha="center",
+            fontweight="bold",
+            fontsize="small",
+            transform=magnitude_axis.get_xaxis_transform(),
+            bbox=text_box_formatting,
+        )
+        crossing_labels.append(crossing_label)
+
+        # Add a line between label and axis
+        line = magnitude_axis.axvline(
+            c["Time"],
+            1,
+            label_y,
+            color="black",
+            ls="dashed",
+        )
+        line.set_clip_on(False)
+
+        shading_alpha = 0.7
+
+        if index == 0:
+            # Shade the region before the first crossing
+            match c["Transition"]:
+
+                case "BS_OUT" | "UKN (MSh -> UKN)" | "MP_IN":
+                    # Region was magnetosheath
+                    shade = wong_colours["orange"]
+
+                case "BS_IN" | "UKN (SW -> UKN)":
+                    # Region was solar wind
+                    shade = wong_colours["yellow"]
+
+                case "MP_OUT" | "UKN (MSp -> UKN)":
+                    # Region was magnetosphere
+                    shade = wong_colours["light blue"]
+
+                case _:
+                    shade = "white"
+
+            for ax in axes[:-1]:
+                ax.axvspan(start, c["Time"], color=shade, alpha=shading_alpha)
+
+            if len(crossings_in_data) == 1:
+                # This is the only crossing
+                # So we need to shade the next region too
+                # Shade between the current crossing and the next
+                match c["Transition"]:
+
+                    case "BS_OUT" | "UKN (UKN -> SW)":
+                        # Region is solar wind
+                        shade = wong_colours["yellow"]
+
+                    case "BS_IN" | "MP_OUT" | "UKN (UKN -> MSh)":
+                        # Region is magnetosheath
+                        shade = wong_colours["orange"]
+
+                    case "MP_IN" | "UKN (UKN -> MSp)":
+                        # Region is magnetosphere
+                        shade = wong_colours["light blue"]
+
+                    case _:
+                        shade = "white"
+
+                for ax in axes[:-1]:
+                    ax.axvspan(c["Time"], end, color=shade, alpha=shading_alpha)
+
+        if index < len(crossings_in_data) - 1:
+
+            # Shade between the current crossing and the next
+            match c["Transition"]:
+
+                case "BS_OUT" | "UKN (UKN -> SW)":
+                    # Region is solar wind
+                    shade = wong_colours["yellow"]
+
+                case "BS_IN" | "MP_OUT" | "UKN (UKN -> MSh)":
+                    # Region is magnetosheath
+                    shade = wong_colours["orange"]
+
+                case "MP_IN" | "UKN (UKN -> MSp)":
+                    # Region is magnetosphere
+                    shade = wong_colours["light blue"]
+
+                case _:
+                    shade = "lightgrey"
+
+            for ax in axes[:-1]:
+                ax.axvspan(
+                    c["Time"],
+                    crossings_in_data.loc[index + 1]["Time"],
+                    color=shade,
+                    alpha=shading_alpha,
+                )
+
+        elif index == len(crossings_in_data) - 1:
+
+            # Shade between the current crossing and the next
+            match c["Transition"]:
+
+                case "BS_OUT" | "UKN (UKN -> SW)":
+                    # Region is solar wind
+                    shade = wong_colours["yellow"]
+
+                case "BS_IN" | "MP_OUT" | "UKN (UKN -> MSh)":
+                    # Region is magnetosheath
+                    shade = wong_colours["orange"]
+
+                case "MP_IN" | "UKN (UKN -> MSp)":
+                    # Region is magnetosphere
+                    shade = wong_colours["light blue"]
+
+                case _:
+                    shade = "lightgrey"
+
+            for ax in axes[:-1]:
+                ax.axvspan(c["Time"], end, color=shade, alpha=shading_alpha)
+
+    # Add crossing information to legend
+    # Some fance code from: https://stackoverflow.com/questions/13588920/stop-matplotlib-repeating-labels-in-legend
+    # to avoid duplicate legend labels
+    handles, labels = axes[0].get_legend_handles_labels()
+    by_label = collections.OrderedDict(zip(labels, handles))
+    axes[0].legend(by_label.values(), by_label.keys())
+
+    # Ensure components axis is symmetric around 0
+    max_y_lim_extent = np.max(np.abs(components_axis.get_ylim()))
+    components_axis.set_ylim(-max_y_lim_extent, max_y_lim_extent)
+
+    for ax in axes:
+
+        ax.xaxis.set_major_locator(
+            matplotlib.dates.MinuteLocator(
+                byminute=np.arange(0, 60, major_tick_minutes)
+            )
+        )
+        if xlim is not None:
+            ax.set_xlim(*xlim)
+
+        # Ensure ticks are above everything
+        ax.set_axisbelow(False)  # Sets tick zorder to 2.5
+
+        # Format ticks
+        ax.yaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
+        ax.xaxis.set_minor_locator(matplotlib.ticker.AutoMinorLocator())
+
+        ax.tick_params("x", which="major", direction="inout", length=20, width=1.5)
+        ax.tick_params("x", which="minor", direction="inout", length=10, width=1.5)
+
+        ax.tick_params("y", which="major", direction="out", length=10)
+        ax.tick_params("y", which="minor", direction="out", length=5)
+
+    plotting.Add_Tick_Ephemeris(probability_axis)
+
+    # Add panel labels
+    for ax, label in zip(axes, ["(a)", "(b)", "(c)"]):
+        panel_label = ax.text(
+            -0.05, 1.05, label, fontsize="x-large", transform=ax.transAxes
+        )
+        panel_label.set_clip_on(False)
+
+    return fig
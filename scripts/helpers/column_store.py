@@ -0,0 +1,266 @@
+"""
+Save and load pandas DataFrames as a directory of numpy arrays, one file per
+column, which can be memory-mapped and read selectively.
+
+A store directory looks like:
+
+    store/
+        manifest.json   <- column names, dtypes, length, and source metadata
+        000.npy         <- one array per column
+        001.npy
+        ...
+
+The manifest is written last, so an interrupted conversion is never mistaken
+for a complete store.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_hash(path, chunk_size=2**24):
+    """Return a hex digest of the contents of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+
+    with open(path, "rb") as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def file_fingerprint(path):
+    """A cheap summary of a file used to skip re-hashing unchanged files."""
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def describe_source(path):
+    return {
+        "path": str(path),
+        "hash": file_hash(path),
+        **file_fingerprint(path),
+    }
+
+
+def read_manifest(directory):
+    """Returns the manifest of a store, or None if no complete store exists."""
+    manifest_path = pathlib.Path(directory) / MANIFEST_NAME
+
+    if not manifest_path.exists():
+        return None
+
+    with open(manifest_path, "r") as file:
+        return json.load(file)
+
+
+def write_manifest(directory, manifest):
+    manifest_path = pathlib.Path(directory) / MANIFEST_NAME
+    temporary_path = manifest_path.with_suffix(".tmp")
+
+    with open(temporary_path, "w") as file:
+        json.dump(manifest, file, indent=4)
+
+    os.replace(temporary_path, manifest_path)
+
+
+def is_current(directory, source_path):
+    """
+    Check if the store in `directory` was built from the current contents of
+    `source_path`.
+
+    The file size and modification time are compared first. Only if these
+    differ is the source re-hashed, in which case the manifest is updated so
+    the next check is cheap again.
+    """
+    manifest = read_manifest(directory)
+
+    if manifest is None:
+        return False
+
+    source = manifest["metadata"].get("source")
+    if source is None:
+        return False
+
+    # The source may have been removed to save space once converted
+    if not os.path.exists(source_path):
+        return True
+
+    fingerprint = file_fingerprint(source_path)
+    if fingerprint == {"size": source["size"], "mtime_ns": source["mtime_ns"]}:
+        return True
+
+    if file_hash(source_path) != source["hash"]:
+        return False
+
+    source.update(fingerprint)
+    write_manifest(directory, manifest)
+
+    return True
+
+
+def write_columns(data: pd.DataFrame, directory, metadata=None):
+    """
+    Write each column of `data` to its own .npy file within `directory`.
+
+    Only numeric and datetime columns are supported, as object columns cannot
+    be memory-mapped.
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    # Remove any old manifest first so a partially overwritten store is
+    # treated as missing
+    (directory / MANIFEST_NAME).unlink(missing_ok=True)
+
+    columns = []
+    for i, column in enumerate(data.columns):
+        values = data[column].to_numpy()
+
+        if values.dtype == object:
+            raise ValueError(
+                f"Column '{column}' has dtype object and can't be memory-mapped"
+            )
+
+        file_name = f"{i:03d}.npy"
+        np.save(directory / file_name, values)
+
+        columns.append({"name": column, "file": file_name, "dtype": str(values.dtype)})
+
+    write_manifest(
+        directory,
+        {
+            "columns": columns,
+            "length": len(data),
+            "metadata": metadata if metadata is not None else {},
+        },
+    )
+
+
+class ColumnWriter:
+    """
+    Write a column store in pieces, for data too large to hold in memory at
+    once. Each call to `append` adds rows to the end of every column, and
+    `close` writes the .npy headers and the manifest.
+    """
+
+    def __init__(self, directory):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / MANIFEST_NAME).unlink(missing_ok=True)
+
+        self.columns = None
+        self.length = 0
+
+    def append(self, data: pd.DataFrame):
+
+        if self.columns is None:
+            self.columns = [
+                {
+                    "name": column,
+                    "file": f"{i:03d}.npy",
+                    "dtype": np.dtype(data[column].to_numpy().dtype),
+                }
+                for i, column in enumerate(data.columns)
+            ]
+            for entry in self.columns:
+                if entry["dtype"] == object:
+                    raise ValueError(
+                        f"Column '{entry['name']}' has dtype object and can't be memory-mapped"
+                    )
+                # Start each part file empty
+                open(self._part_path(entry), "wb").close()
+
+        for entry in self.columns:
+            values = np.ascontiguousarray(
+                data[entry["name"]].to_numpy(), dtype=entry["dtype"]
+            )
+            with open(self._part_path(entry), "ab") as file:
+                file.write(values.tobytes())
+
+        self.length += len(data)
+
+    def close(self, metadata=None):
+
+        for entry in self.columns or []:
+            part_path = self._part_path(entry)
+
+            with open(self.directory / entry["file"], "wb") as file:
+                np.lib.format.write_array_header_1_0(
+                    file,
+                    {
+                        "descr": np.lib.format.dtype_to_descr(entry["dtype"]),
+                        "fortran_order": False,
+                        "shape": (self.length,),
+                    },
+                )
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, file, length=2**24)
+
+            part_path.unlink()
+
+        write_manifest(
+            self.directory,
+            {
+                "columns": [
+                    {**entry, "dtype": str(entry["dtype"])}
+                    for entry in self.columns or []
+                ],
+                "length": self.length,
+                "metadata": metadata if metadata is not None else {},
+            },
+        )
+
+    def _part_path(self, entry):
+        return self.directory / (entry["file"] + ".part")
+
+
+def read_column(directory, column, mmap=True):
+    """Returns a single column of a store as a (memory-mapped) numpy array."""
+    manifest = read_manifest(directory)
+
+    if manifest is None:
+        raise FileNotFoundError(f"No column store found at {directory}")
+
+    return _load_column(directory, manifest, column, mmap)
+
+
+def read_columns(directory, columns=None, mmap=True) -> pd.DataFrame:
+    """
+    Load columns from a store as a DataFrame.
+
+    Only the requested columns are opened. With `mmap=True` the arrays are
+    memory-mapped read-only, so pages are only read from disk when used.
+    """
+    manifest = read_manifest(directory)
+
+    if manifest is None:
+        raise FileNotFoundError(f"No column store found at {directory}")
+
+    if columns is None:
+        columns = [c["name"] for c in manifest["columns"]]
+
+    return pd.DataFrame(
+        {c: _load_column(directory, manifest, c, mmap) for c in columns},
+        copy=False,
+    )
+
+
+def _load_column(directory, manifest, column, mmap):
+
+    for entry in manifest["columns"]:
+        if entry["name"] == column:
+            return np.load(
+                pathlib.Path(directory) / entry["file"],
+                mmap_mode="r" if mmap else None,
+            )
+
+    raise KeyError(f"Column '{column}' not found in store at {directory}")
@@ -0,0 +1,212 @@
+"""
+Pixel-aware decimation of dense time series (e.g. 20 Hz MAG data) for
+plotting.
+
+A line with many more points than the axes has pixel columns is drawn with
+only the first, last, minimum, and maximum point within each column (the
+"M4" algorithm). These are all that determine which pixels a line covers, so
+the rendered figure is unchanged while far fewer points are drawn, and
+written to the PDF.
+
+Decimation happens at draw time, from the current x limits and the size of
+the axes, so lines stay exact after zooming (`ax.set_xlim`) or resizing.
+Columns are counted at RESOLUTION_DPI, rather than the figure's dpi, so that
+vector output remains exact when zoomed in to that resolution.
+
+The rendered figure can be checked against the undecimated render with
+`compare_renders` (see ./scripts/check_decimation.py).
+"""
+
+import contextlib
+import time
+
+import matplotlib.artist
+import matplotlib.lines
+import numpy as np
+
+# Pixel columns per inch of axes width
+RESOLUTION_DPI = 600
+
+# Set to False to draw every point (see `disabled`)
+ENABLED = True
+
+# Channel differences up to this (of 255) are anti-aliasing, not a change to
+# the figure (see `compare_renders`)
+COMPARISON_TOLERANCE = 16
+
+
+def min_max_indices(x, y, start, end, columns):
+    """
+    Indices of the points needed to draw the line through (x, y) between
+    `start` and `end` at a width of `columns` pixels.
+
+    Parameters
+    ----------
+    x : numpy.ndarray
+        Sorted x values.
+    y : numpy.ndarray
+        y values.
+    start, end : float
+        The visible x range.
+    columns : int
+        The number of pixel columns across the visible range.
+
+    Returns
+    -------
+    numpy.ndarray
+        Sorted indices into x and y. Includes the nearest point outside of the
+        visible range on each side, so the line continues off the axes.
+    """
+    first = max(np.searchsorted(x, start, side="left") - 1, 0)
+    last = min(np.searchsorted(x, end, side="right") + 1, len(x))
+
+    visible_x = x[first:last]
+    visible_y = y[first:last]
+
+    if len(visible_x) <= 4 * columns:
+        return np.arange(first, last)
+
+    columns_of_points = np.floor((visible_x - start) / (end - start) * columns)
+    np.clip(columns_of_points, -1, columns, out=columns_of_points)
+
+    # x is sorted, so the points in each column are contiguous
+    column_starts = np.flatnonzero(
+        np.concatenate(([True], np.diff(columns_of_points) != 0))
+    )
+    column_lengths = np.diff(np.append(column_starts, len(visible_x)))
+    column_numbers = np.repeat(np.arange(len(column_starts)), column_lengths)
+
+    selected = [column_starts, column_starts + column_lengths - 1]
+
+    # Columns of only NaN have no minimum or maximum, but keep their first and
+    # last points, so gaps in the line remain
+    for reduce in (np.fmin, np.fmax):
+        extremes = reduce.reduceat(visible_y, column_starts)
+
+        candidates = np.flatnonzero(visible_y == extremes[column_numbers])
+        candidate_columns = column_numbers[candidates]
+
+        # The first candidate in each column
+        selected.append(
+            candidates[np.concatenate(([True], np.diff(candidate_columns) != 0))]
+        )
+
+    return first + np.unique(np.concatenate(selected))
+
+
+class DecimatedLine(matplotlib.lines.Line2D):
+    """
+    A Line2D which only draws the points distinguishable at the size it is
+    drawn. Lines with unsorted x values are drawn in full.
+    """
+
+    @matplotlib.artist.allow_rasterization
+    def draw(self, renderer):
+        if not ENABLED or self.axes is None or not self.get_visible():
+            return super().draw(renderer)
+
+        x = np.asarray(self.get_xdata(orig=False), dtype=float)
+        y = np.asarray(self.get_ydata(orig=False), dtype=float)
+
+        if len(x) < 2 or np.any(np.diff(x) < 0):
+            return super().draw(renderer)
+
+        start, end = self.axes.viewLim.intervalx
+        columns = int(np.ceil(self.axes.bbox.width / self.figure.dpi * RESOLUTION_DPI))
+
+        indices = min_max_indices(x, y, start, end, max(columns, 1))
+        if len(indices) == len(x):
+            return super().draw(renderer)
+
+        # Draw a copy holding only the selected points. Its data is already in
+        # the units of the axes, so it is not given the axes to convert them.
+        proxy = matplotlib.lines.Line2D(x[indices], y[indices])
+        proxy.update_from(self)
+        proxy.set_figure(self.figure)
+        proxy.draw(renderer)
+
+        self.stale = False
+
+
+def plot(ax, x, y, **kwargs):
+    """
+    As `ax.plot(x, y, **kwargs)` for a single line, with the line decimated
+    when drawn.
+
+    Returns
+    -------
+    DecimatedLine
+    """
+    # Register the units of the data (e.g. dates) with the axes, as ax.plot
+    ax.xaxis.update_units(x)
+    ax.yaxis.update_units(y)
+
+    line = DecimatedLine(x, y, **kwargs)
+    ax.add_line(line)
+    ax.autoscale_view()
+
+    return line
+
+
+@contextlib.contextmanager
+def disabled():
+    """Draw decimated lines in full within this context."""
+    global ENABLED
+
+    previous, ENABLED = ENABLED, False
+    try:
+        yield
+
+    finally:
+        ENABLED = previous
+
+
+def render(fig, dpi):
+    """Render a figure with the Agg backend, returning the RGBA pixels."""
+    original_dpi = fig.dpi
+    fig.set_dpi(dpi)
+
+    try:
+        fig.canvas.draw()
+        return np.array(fig.canvas.buffer_rgba())
+
+    finally:
+        fig.set_dpi(original_dpi)
+
+
+def compare_renders(fig, dpi=RESOLUTION_DPI, tolerance=COMPARISON_TOLERANCE):
+    """
+    Render a figure with and without decimation, and compare the results.
+
+    Parameters
+    ----------
+    fig : matplotlib.figure.Figure
+    dpi : float, optional
+        Resolution to compare the renders at.
+    tolerance : int, optional
+        Pixels are counted as different if any channel differs by more than
+        this (out of 255), to ignore small changes in anti-aliasing.
+
+    Returns
+    -------
+    dict
+        The fraction of pixels which differ, the largest difference in any
+        channel, and the time taken by each render.
+    """
+    render_start = time.perf_counter()
+    decimated = render(fig, dpi).astype(np.int16)
+    decimated_time = time.perf_counter() - render_start
+
+    with disabled():
+        render_start = time.perf_counter()
+        full = render(fig, dpi).astype(np.int16)
+        full_time = time.perf_counter() - render_start
+
+    differences = np.abs(decimated - full).max(axis=-1)
+
+    return {
+        "differing_fraction": float(np.mean(differences > tolerance)),
+        "maximum_difference": int(differences.max()),
+        "decimated_seconds": decimated_time,
+        "full_seconds": full_time,
+    }
@@ -0,0 +1,309 @@
+"""
+Tracking the inputs of each figure script, so unchanged figures can be
+skipped when rebuilding (see ./scripts/schedule_figures.py).
+
+While a script runs, an audit hook records every file it opens. Afterwards:
+- files it read (resources, caches, crossing lists, ...), the files the
+  column stores it read were converted from, the figure script and helper
+  modules it ran, and the SPICE kernels it loaded are its inputs,
+- files it wrote in ./figures/ are its outputs.
+
+SPICE kernels are opened by the SPICE library rather than by Python, so
+aren't seen by the audit hook. Instead, `spiceypy.furnsh` is wrapped to list
+the kernels loaded (including those of meta-kernels) after each call.
+
+Files of the Python installation and installed packages are not tracked,
+beyond the version of hermpy, unless they are within the working directory.
+
+The inputs are recorded with their hash (and size and modification time) in
+./resources/figure_dependencies.json. A script is up to date if its inputs
+are unchanged, hermpy is the same version, and its figures still exist. As
+with the column stores, files are only re-hashed if their size or
+modification time has changed.
+"""
+
+import functools
+import importlib.metadata
+import json
+import os
+import sys
+import sysconfig
+import tempfile
+
+from . import column_store, instrumentation
+
+DEPENDENCIES_PATH = "./resources/figure_dependencies.json"
+FIGURES_DIRECTORY = "./figures"
+
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT | os.O_APPEND | os.O_TRUNC
+
+_opened = None
+_kernels = None
+
+
+def hermpy_version():
+    try:
+        return importlib.metadata.version("hermpy")
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _audit(event, args):
+    if event != "open" or _opened is None:
+        return
+
+    path, mode, flags = args
+    if isinstance(path, int):
+        # Opening an existing file descriptor
+        return
+
+    if mode is not None:
+        writing = any(character in mode for character in "wax+")
+    else:
+        writing = bool((flags or 0) & WRITE_FLAGS)
+
+    _opened.append((os.fsdecode(path), writing))
+
+
+def _tracking_furnsh(furnsh):
+    @functools.wraps(furnsh)
+    def tracked(*args, **kwargs):
+        try:
+            return furnsh(*args, **kwargs)
+
+        finally:
+            _kernels.update(loaded_kernels())
+
+    return tracked
+
+
+def loaded_kernels():
+    """Paths of the SPICE kernels currently loaded."""
+    try:
+        import spiceypy
+        from spiceypy.utils.exceptions import SpiceyError
+    except ImportError:
+        return []
+
+    kernels = []
+    for index in range(spiceypy.ktotal("ALL")):
+        try:
+            kernels.append(spiceypy.kdata(index, "ALL")[0])
+        except SpiceyError:
+            continue
+
+    return kernels
+
+
+def track_opens():
+    """
+    Start recording the files opened, and SPICE kernels loaded, by this
+    process. Audit hooks can't be removed, so this is for processes which run
+    a single script.
+    """
+    global _opened, _kernels
+
+    _opened = []
+    _kernels = set()
+    sys.addaudithook(_audit)
+
+    # Kernels may be loaded through either name
+    for module_name in ["spiceypy", "spiceypy.spiceypy"]:
+        instrumentation.wrap(module_name, "furnsh", _tracking_furnsh)
+
+
+def ignored_directories():
+    """
+    Directories of the Python installation, packages, and system files,
+    other than those holding the working directory (e.g. a checkout within
+    the temporary directory).
+    """
+    directories = {sys.prefix, sys.base_prefix, sys.exec_prefix}
+    directories |= {
+        sysconfig.get_path(name)
+        for name in ["stdlib", "platstdlib", "purelib", "platlib"]
+    }
+    directories |= {tempfile.gettempdir(), "/proc", "/sys", "/dev"}
+
+    try:
+        import matplotlib
+
+        directories |= {matplotlib.get_cachedir(), matplotlib.get_configdir()}
+    except ImportError:
+        pass
+
+    working_directory = os.path.abspath(os.getcwd()) + os.sep
+    directories = [os.path.abspath(d) + os.sep for d in directories if d]
+
+    return [d for d in directories if not working_directory.startswith(d)]
+
+
+def opened_files(script):
+    """
+    The inputs and outputs of the script run in this process, from the files
+    recorded since `track_opens`.
+
+    Returns
+    -------
+    dict
+        "inputs": paths of files read (or run), "outputs": paths of figures
+        written. Paths within the current directory are relative to it.
+    """
+    ignored = ignored_directories()
+    figures = os.path.abspath(FIGURES_DIRECTORY) + os.sep
+
+    def relevant(path):
+        return (
+            os.path.isfile(path)
+            and "__pycache__" not in path
+            and not any(path.startswith(directory) for directory in ignored)
+        )
+
+    # Modules may be imported from their cached bytecode without opening the
+    # source, so add the source of each imported module. The process running
+    # the script (__main__) isn't part of it.
+    sources = [
+        module.__file__
+        for name, module in list(sys.modules.items())
+        if getattr(module, "__file__", None) and name != "__main__"
+    ]
+
+    read = {os.path.abspath(path) for path in sources}
+    written = set()
+    for path, writing in _opened:
+        (written if writing else read).add(os.path.abspath(path))
+
+    # A current store is read without opening the file it was converted
+    # from (only its size and modification time are checked), but the
+    # figures still depend on it
+    read |= store_sources(read)
+
+    # Files written by the script itself (e.g. caches) are derived, not
+    # inputs
+    inputs = {p for p in read - written if relevant(p)}
+
+    # Wherever they are
+    inputs.add(os.path.abspath(script))
+    inputs |= {
+        os.path.abspath(kernel)
+        for kernel in _kernels | set(loaded_kernels())
+        if os.path.isfile(kernel)
+    }
+
+    return {
+        "inputs": sorted(display_path(p) for p in inputs),
+        "outputs": sorted(display_path(p) for p in written if p.startswith(figures)),
+    }
+
+
+def store_sources(paths):
+    """
+    The files the column stores among `paths` were converted from, as
+    recorded in each store's manifest.
+    """
+    sources = set()
+
+    for path in paths:
+        if os.path.basename(path) != column_store.MANIFEST_NAME:
+            continue
+
+        try:
+            manifest = column_store.read_manifest(os.path.dirname(path))
+        except (OSError, ValueError):
+            continue
+
+        source = (manifest or {}).get("metadata", {}).get("source")
+        if isinstance(source, dict) and "path" in source:
+            sources.add(os.path.abspath(source["path"]))
+
+    return sources
+
+
+def display_path(path):
+    relative = os.path.relpath(path)
+    return path if relative.startswith("..") else relative
+
+
+class Hasher:
+    """
+    File hashes, computed once per file contents. As with the column stores,
+    a hash already recorded (in `dependencies`) is reused while the file's
+    size and modification time are unchanged.
+    """
+
+    def __init__(self, dependencies=None):
+        self.hashes = {}
+        for entry in (dependencies or {}).values():
+            for path, recorded in entry["inputs"].items():
+                key = (path, recorded["size"], recorded["mtime_ns"])
+                self.hashes[key] = recorded["hash"]
+
+        # Whether the fingerprint of any recorded input was updated
+        self.refreshed = False
+
+    def describe(self, path):
+        fingerprint = column_store.file_fingerprint(path)
+        key = (path, fingerprint["size"], fingerprint["mtime_ns"])
+
+        if key not in self.hashes:
+            self.hashes[key] = column_store.file_hash(path)
+
+        return {"hash": self.hashes[key], **fingerprint}
+
+    def unchanged(self, path, recorded):
+        """Whether a file still has the recorded contents."""
+        if not os.path.isfile(path):
+            return False
+
+        fingerprint = column_store.file_fingerprint(path)
+        if fingerprint == {"size": recorded["size"], "mtime_ns": recorded["mtime_ns"]}:
+            return True
+
+        if self.describe(path)["hash"] != recorded["hash"]:
+            return False
+
+        # Only touched, so the next check can use the fingerprint again
+        recorded.update(fingerprint)
+        self.refreshed = True
+        return True
+
+
+def record(files, hasher):
+    """The dependency entry of a script, from its `opened_files`."""
+    return {
+        "hermpy": hermpy_version(),
+        "inputs": {path: hasher.describe(path) for path in files["inputs"]},
+        "outputs": files["outputs"],
+    }
+
+
+def is_up_to_date(entry, hasher):
+    """Whether a script with this dependency entry needs to run again."""
+    if entry is None or entry["hermpy"] != hermpy_version():
+        return False
+
+    # Nothing recorded can't be trusted to be unchanged
+    if not entry["inputs"]:
+        return False
+
+    if not all(os.path.exists(path) for path in entry["outputs"]):
+        return False
+
+    return all(
+        hasher.unchanged(path, recorded) for path, recorded in entry["inputs"].items()
+    )
+
+
+def load_dependencies():
+    if not os.path.exists(DEPENDENCIES_PATH):
+        return {}
+
+    with open(DEPENDENCIES_PATH, "r") as file:
+        return json.load(file)
+
+
+def save_dependencies(dependencies):
+    os.makedirs(os.path.dirname(DEPENDENCIES_PATH), exist_ok=True)
+
+    with open(DEPENDENCIES_PATH, "w") as file:
+        json.dump(dependencies, file, indent=4, sort_keys=True)
@@ -0,0 +1,291 @@
+"""
+A compact representation of MESSENGER's trajectory, for finding MSM'
+positions at arbitrary times without the full mission data.
+
+The 1 second positions of the full mission are sampled once every minute,
+and stored as float32 (./resources/cache/ephemeris/, ~25 MB rather than the
+GBs of the full mission). Positions between samples are found by cubic
+Hermite interpolation, with tangents from finite differences of neighbouring
+samples (a Catmull-Rom spline).
+
+Samples are only made where the mission has data, so the spline doesn't cover
+data gaps or the edges of the mission. At these times, the nearest 1 second
+position is read from the memory-mapped mission store instead, as the figures
+did with `pd.merge_asof(direction="nearest")`. The largest error against the 1 second positions is measured when
+the ephemeris is built, and recorded in its manifest. This is largest at
+periapsis, where the trajectory curves most sharply, and is expected to be of
+order 1e-4 radii: less than the distance MESSENGER travels there in half a
+second, i.e. the error of taking the nearest 1 second position.
+
+The positions found for each table (e.g. the mid-times of every crossing
+interval) are cached in ./resources/cache/positions/, keyed by the hash of the
+times, of the mission data, and the ephemeris version. While these are
+unchanged, neither the ephemeris nor the mission store is read.
+"""
+
+import functools
+import hashlib
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from . import column_store, mission
+
+EPHEMERIS_PATH = "./resources/cache/ephemeris"
+POSITIONS_CACHE_DIRECTORY = "./resources/cache/positions"
+
+SAMPLE_CADENCE = np.timedelta64(60, "s")
+
+# Samples are interpolated from the two nearest 1 second positions, which must
+# be no further apart than this
+MAXIMUM_SAMPLE_GAP = np.timedelta64(5, "s")
+
+# Bump if the way the ephemeris is made changes
+EPHEMERIS_VERSION = 1
+
+# Positions evaluated at once when measuring the error of the ephemeris
+CHUNK_SIZE = 2**22
+
+
+def build_ephemeris(mission_path=mission.DEFAULT_MISSION_PATH, path=EPHEMERIS_PATH):
+    """Sample the full mission positions, and measure the interpolation error."""
+    data = mission.load_mission(mission_path)
+    dates = np.asarray(data["date"].to_numpy(), dtype="datetime64[ns]").view(np.int64)
+    positions = [data[column].to_numpy() for column in mission.POSITION_COLUMNS]
+
+    cadence = SAMPLE_CADENCE.astype("timedelta64[ns]").astype(np.int64)
+    maximum_gap = MAXIMUM_SAMPLE_GAP.astype("timedelta64[ns]").astype(np.int64)
+
+    start = -(-dates[0] // cadence) * cadence
+    sample_times = np.arange(start, dates[-1] + 1, cadence)
+
+    # The 1 second positions either side of each sample time
+    after = np.searchsorted(dates, sample_times, side="left")
+    np.clip(after, 0, len(dates) - 1, out=after)
+    before = np.where(dates[after] == sample_times, after, np.maximum(after - 1, 0))
+
+    gap = dates[after] - dates[before]
+    valid = (dates[before] <= sample_times) & (gap <= maximum_gap)
+    weights = np.divide(
+        sample_times - dates[before],
+        gap,
+        out=np.zeros(len(sample_times)),
+        where=gap > 0,
+    )
+
+    samples = {}
+    for column, values in zip(mission.POSITION_COLUMNS, positions):
+        sampled = values[before] + weights * (values[after] - values[before])
+        samples[column] = np.where(valid, sampled, np.nan).astype(np.float32)
+
+    # Measure the error against every 1 second position
+    evaluate = interpolator(
+        start, cadence, np.column_stack(list(samples.values())).astype(np.float64)
+    )
+    maximum_error = 0.0
+    for chunk_start in range(0, len(dates), CHUNK_SIZE):
+        chunk = slice(chunk_start, chunk_start + CHUNK_SIZE)
+
+        errors = np.linalg.norm(
+            evaluate(dates[chunk]) - np.column_stack([p[chunk] for p in positions]),
+            axis=1,
+        )
+        if np.isfinite(errors).any():
+            maximum_error = max(maximum_error, float(np.nanmax(errors)))
+
+    column_store.write_columns(
+        pd.DataFrame(samples),
+        path,
+        metadata={
+            **ephemeris_metadata(mission_path),
+            "start": int(start),
+            "maximum_error_radii": maximum_error,
+        },
+    )
+
+
+def ephemeris_metadata(mission_path=mission.DEFAULT_MISSION_PATH):
+    return {
+        "mission_hash": mission.data_hash(mission_path),
+        "cadence_ns": int(SAMPLE_CADENCE.astype("timedelta64[ns]").astype(np.int64)),
+        "version": EPHEMERIS_VERSION,
+    }
+
+
+def is_current(mission_path=mission.DEFAULT_MISSION_PATH, path=EPHEMERIS_PATH):
+    manifest = column_store.read_manifest(path)
+
+    if manifest is None:
+        return False
+
+    expected = ephemeris_metadata(mission_path)
+    return {key: manifest["metadata"].get(key) for key in expected} == expected
+
+
+def ensure_ephemeris(mission_path=mission.DEFAULT_MISSION_PATH, path=EPHEMERIS_PATH):
+    if not is_current(mission_path, path):
+        build_ephemeris(mission_path, path)
+
+    return path
+
+
+@functools.cache
+def _load_interpolator(path, mission_hash):
+    manifest = column_store.read_manifest(path)
+    samples = column_store.read_columns(path, mission.POSITION_COLUMNS, mmap=False)
+
+    return interpolator(
+        manifest["metadata"]["start"],
+        manifest["metadata"]["cadence_ns"],
+        samples.to_numpy(dtype=np.float64),
+    )
+
+
+def interpolator(start, cadence, samples):
+    """
+    Returns a function evaluating the cubic Hermite spline through `samples`
+    (shape (n, 3)), taken every `cadence` ns from `start`, at int64 ns times.
+    """
+    # Tangents (per sample) from central differences, or one sided differences
+    # at the edges of data gaps
+    forward = np.full_like(samples, np.nan)
+    forward[:-1] = samples[1:] - samples[:-1]
+    backward = np.full_like(samples, np.nan)
+    backward[1:] = samples[1:] - samples[:-1]
+
+    tangents = (forward + backward) / 2
+    tangents = np.where(np.isnan(tangents), forward, tangents)
+    tangents = np.where(np.isnan(tangents), backward, tangents)
+
+    def evaluate(nanoseconds):
+        offsets = nanoseconds - start
+
+        indices = offsets // cadence
+        inside = (indices >= 0) & (indices < len(samples) - 1)
+        indices = np.where(inside, indices, 0)
+
+        s = ((offsets - indices * cadence) / cadence)[:, np.newaxis]
+        s2, s3 = s**2, s**3
+
+        result = (
+            (2 * s3 - 3 * s2 + 1) * samples[indices]
+            + (s3 - 2 * s2 + s) * tangents[indices]
+            + (-2 * s3 + 3 * s2) * samples[indices + 1]
+            + (s3 - s2) * tangents[indices + 1]
+        )
+        result[~inside] = np.nan
+
+        return result
+
+    return evaluate
+
+
+def positions_at(times, mission_path=mission.DEFAULT_MISSION_PATH):
+    """
+    MESSENGER's MSM' position at each time.
+
+    Parameters
+    ----------
+    times : array_like of datetime
+        Times to find the position at.
+    mission_path : str, optional
+        Path to the full mission data, from which the ephemeris is built the
+        first time.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (len(times), 3), of the X, Y, and Z MSM' positions in
+        Mercury radii. Times not covered by the ephemeris (within data gaps,
+        or beyond the samples at either end of the mission) take the nearest 1
+        second position. NaN for missing times (NaT).
+    """
+    path = ensure_ephemeris(mission_path)
+    evaluate = _load_interpolator(path, mission.data_hash(mission_path))
+
+    times = pd.DatetimeIndex(times).as_unit("ns").to_numpy()
+    positions = evaluate(times.view(np.int64))
+
+    uncovered = np.isnan(positions).any(axis=1) & ~np.isnat(times)
+    if uncovered.any():
+        positions[uncovered] = nearest_positions(times[uncovered], mission_path)
+
+    positions[np.isnat(times)] = np.nan
+
+    return positions
+
+
+def nearest_positions(times, mission_path=mission.DEFAULT_MISSION_PATH):
+    """
+    The 1 second position nearest each time, as `pd.merge_asof` with
+    direction="nearest" (taking the earlier on a tie). Only the pages of the
+    mission store around each time are read.
+    """
+    store_path = mission.ensure_store(mission_path)
+    dates = column_store.read_column(store_path, "date")
+    times = np.asarray(times).astype(dates.dtype)
+
+    after = np.clip(np.searchsorted(dates, times, side="left"), 0, len(dates) - 1)
+    before = np.maximum(after - 1, 0)
+
+    nearest = np.where(
+        np.abs(dates[after] - times) < np.abs(times - dates[before]), after, before
+    )
+
+    return np.column_stack(
+        [
+            np.asarray(column_store.read_column(store_path, column)[nearest])
+            for column in mission.POSITION_COLUMNS
+        ]
+    ).astype(np.float64)
+
+
+def merge_positions(
+    table: pd.DataFrame, time_column, mission_path=mission.DEFAULT_MISSION_PATH
+):
+    """
+    A copy of `table` with the MSM' position columns of the full mission added,
+    as at the times in `time_column`. The positions are cached, keyed by the
+    times and the mission data.
+    """
+    table = table.copy()
+    times = pd.DatetimeIndex(table[time_column]).as_unit("ns").to_numpy()
+
+    path = (
+        pathlib.Path(POSITIONS_CACHE_DIRECTORY)
+        / f"{positions_key(times, mission.data_hash(mission_path))}.npy"
+    )
+
+    if path.exists():
+        positions = np.load(path)
+
+    else:
+        positions = positions_at(times, mission_path)
+        save(path, positions)
+
+    for i, column in enumerate(mission.POSITION_COLUMNS):
+        table[column] = positions[:, i]
+
+    return table
+
+
+def positions_key(times, mission_hash):
+    digest = hashlib.blake2b(digest_size=16)
+
+    digest.update(f"{mission_hash}:{EPHEMERIS_VERSION}:".encode())
+    digest.update(np.asarray(times, dtype="datetime64[ns]").view(np.int64).tobytes())
+
+    return digest.hexdigest()
+
+
+def save(path, array):
+    """Save atomically, so concurrent scripts never read a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.save(file, array)
+
+    os.replace(temporary_path, path)
@@ -0,0 +1,213 @@
+"""
+Group the Philpott crossing intervals into crossings of the whole
+magnetosphere: a bow shock followed by a magnetopause when inbound (BS_IN ->
+MP_IN), and a magnetopause followed by a bow shock when outbound (MP_OUT ->
+BS_OUT). Intervals without their expected partner are grouped on their own.
+
+Groups are found by comparing each interval's type with the next, rather than
+by stepping through the list one row at a time. The groups of a crossing list
+are also saved in ./resources/cache/crossing_groups/ (see `group_index`), with
+a reverse map from row to group, so that an example group can be found
+without regrouping the list.
+"""
+
+import hashlib
+import os
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from . import column_store, resources
+
+INDEX_DIRECTORY = "./resources/cache/crossing_groups"
+
+# Bump if the grouping changes, invalidating saved indices
+INDEX_VERSION = 1
+
+# The second row of a group containing a single interval
+NO_SECOND_ROW = -1
+
+# For each type starting a pair, the type which completes it, and the next
+# types which leave it on its own. Any other next type leaves it ungrouped.
+PAIRS = {
+    "BS_IN": ("MP_IN", ["MP_OUT", "BS_IN", "BS_OUT", "DATA_GAP"]),
+    "MP_OUT": ("BS_OUT", ["MP_IN", "MP_OUT", "BS_IN", "DATA_GAP"]),
+}
+
+
+def crossing_groups(crossing_intervals: pd.DataFrame):
+    """
+    Find groups of crossing intervals.
+
+    Parameters
+    ----------
+    crossing_intervals : pandas.DataFrame
+        Crossing intervals with a "Type" column, in time order, as loaded with
+        `boundaries.Load_Crossings(..., include_data_gaps=True)`.
+
+    Returns
+    -------
+    numpy.ndarray
+        Integer array of shape (n, 2) with the (first_row, second_row) of each
+        group in order, where rows are positions in `crossing_intervals`. For
+        groups of one interval, second_row is `NO_SECOND_ROW`.
+    """
+    types = crossing_intervals["Type"].to_numpy()
+
+    # The last interval is only ever included as the second of a pair
+    current_types = types[:-1]
+    next_types = types[1:]
+
+    is_pair = np.zeros(len(current_types), dtype=bool)
+    is_single = ~np.isin(current_types, [*PAIRS, "DATA_GAP"])
+
+    for first_type, (second_type, single_next_types) in PAIRS.items():
+        is_first_type = current_types == first_type
+
+        is_pair |= is_first_type & (next_types == second_type)
+        is_single |= is_first_type & np.isin(next_types, single_next_types)
+
+    # The second interval of a pair can't start a group. Neither possible
+    # second type starts a pair, so pairs never chain.
+    is_second = np.zeros(len(current_types), dtype=bool)
+    is_second[1:] = is_pair[:-1]
+
+    is_pair &= ~is_second
+    is_single &= ~is_second
+
+    first_rows = np.flatnonzero(is_pair | is_single)
+    second_rows = np.where(is_pair[first_rows], first_rows + 1, NO_SECOND_ROW)
+
+    return np.column_stack((first_rows, second_rows))
+
+
+def group_rows(crossing_intervals: pd.DataFrame, group):
+    """The crossing intervals (as pd.Series) in a (first_row, second_row) group."""
+    return [crossing_intervals.iloc[row] for row in group if row != NO_SECOND_ROW]
+
+
+class GroupIndex:
+    """
+    Crossing groups, as found by `crossing_groups`, with a reverse map from
+    each row of the crossing intervals to the group containing it.
+    """
+
+    def __init__(self, groups, group_of_row):
+        self.groups = groups
+        self.group_of_row = group_of_row
+
+    def __len__(self):
+        return len(self.groups)
+
+    def __getitem__(self, group_number):
+        """The (first_row, second_row) of a group."""
+        return self.groups[group_number]
+
+    def group_number(self, row):
+        """The number of the group containing a row, or -1 if in no group."""
+        return int(self.group_of_row[row])
+
+    def group_containing(self, row):
+        """The (first_row, second_row) of the group containing a row."""
+        group_number = self.group_number(row)
+
+        if group_number == -1:
+            raise KeyError(f"Row {row} is not in any crossing group")
+
+        return self.groups[group_number]
+
+    def group_starting_at(self, row):
+        """The (first_row, second_row) of the group whose first row is `row`."""
+        group_number = self.group_number(row)
+
+        if group_number == -1 or self.groups[group_number][0] != row:
+            raise KeyError(f"No crossing group starts at row {row}")
+
+        return self.groups[group_number]
+
+
+def build_group_index(crossing_intervals: pd.DataFrame):
+    groups = crossing_groups(crossing_intervals)
+
+    group_of_row = np.full(len(crossing_intervals), -1, dtype=np.int64)
+    group_numbers = np.arange(len(groups))
+
+    group_of_row[groups[:, 0]] = group_numbers
+    is_pair = groups[:, 1] != NO_SECOND_ROW
+    group_of_row[groups[is_pair, 1]] = group_numbers[is_pair]
+
+    return GroupIndex(groups, group_of_row)
+
+
+def group_index(name="Philpott", **kwargs):
+    """
+    The crossing group index of a crossing list, loaded from disk.
+
+    The index is built the first time, from
+    `resources.crossing_intervals(name, **kwargs)`, and saved in
+    ./resources/cache/crossing_groups/. It is rebuilt only if the crossing
+    list file changes, so looking up a group needs neither the grouping nor
+    a search through the groups.
+
+    Parameters
+    ----------
+    name : str, optional
+        Name of the crossing list in `utils.User.CROSSING_LISTS`.
+    **kwargs
+        Passed to `boundaries.Load_Crossings`, e.g. include_data_gaps=True.
+
+    Returns
+    -------
+    GroupIndex
+        Groups of rows, numbered in time order, and the group of each row.
+    """
+    from hermpy import utils
+
+    source_path = utils.User.CROSSING_LISTS[name]
+    directory = pathlib.Path(INDEX_DIRECTORY) / index_name(name, kwargs)
+
+    if column_store.is_current(directory, source_path):
+        return GroupIndex(
+            np.load(directory / "groups.npy", mmap_mode="r"),
+            np.load(directory / "group_of_row.npy", mmap_mode="r"),
+        )
+
+    index = build_group_index(resources.crossing_intervals(name, **kwargs))
+
+    # Remove any old manifest first, so a partially overwritten index is never
+    # mistaken for a complete one
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / column_store.MANIFEST_NAME).unlink(missing_ok=True)
+
+    save(directory / "groups.npy", index.groups)
+    save(directory / "group_of_row.npy", index.group_of_row)
+
+    column_store.write_manifest(
+        directory,
+        {
+            "metadata": {
+                "source": column_store.describe_source(source_path),
+                "kwargs": kwargs,
+                "version": INDEX_VERSION,
+            }
+        },
+    )
+
+    return index
+
+
+def index_name(name, kwargs):
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(repr((INDEX_VERSION, sorted(kwargs.items()))).encode())
+
+    return f"{name}_{digest.hexdigest()}"
+
+
+def save(path, array):
+    """Save atomically, so concurrent scripts never read a partial file."""
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.save(file, array)
+
+    os.replace(temporary_path, path)
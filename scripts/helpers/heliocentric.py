@@ -0,0 +1,144 @@
+"""
+Mercury's heliocentric distance, interpolated from a precomputed table.
+
+`trajectory.Get_Heliocentric_Distance` queries SPICE once per time, every run.
+Instead, the distance is computed once at a fixed cadence over the mission
+(./resources/cache/heliocentric_distance/), and linearly interpolated.
+
+Interpolation error
+-------------------
+The error of linear interpolation between samples a time h apart is at most
+h^2 / 8 * max|r''|. Mercury's radial acceleration is r'' = mu e cos(v) / r^2,
+which is largest at perihelion: mu e / r_p^2 ~ 1.3e-5 km / s^2 (mu = 1.327e11
+km^3 / s^2, e = 0.206, r_p = 4.6e7 km). At the default cadence of 1 hour, the
+error is then at most ~21 km, or ~1.4e-7 AU, far below the ~1e-2 AU bins used
+in the figures. The largest error at the midpoints between samples, where the
+error is greatest, is also measured against SPICE when the table is built,
+and recorded in its manifest.
+"""
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from . import column_store
+
+TABLE_PATH = "./resources/cache/heliocentric_distance"
+
+# Cover the orbital phase of the mission, with a margin either side
+TABLE_START = dt.datetime(2011, 3, 1)
+TABLE_END = dt.datetime(2015, 6, 1)
+TABLE_CADENCE = "1h"
+
+# Bump if the way the table is made changes
+TABLE_VERSION = 1
+
+
+def table_metadata():
+    return {
+        "start": TABLE_START.isoformat(),
+        "end": TABLE_END.isoformat(),
+        "cadence": TABLE_CADENCE,
+        "version": TABLE_VERSION,
+    }
+
+
+def build_table(path=TABLE_PATH):
+    """
+    Compute the heliocentric distance (km) at each time in the table with
+    SPICE, and measure the largest interpolation error.
+    """
+    from hermpy import trajectory
+
+    times = pd.Series(pd.date_range(TABLE_START, TABLE_END, freq=TABLE_CADENCE))
+    distances = np.asarray(trajectory.Get_Heliocentric_Distance(times), dtype=float)
+
+    midpoints = times.iloc[:-1] + pd.Timedelta(TABLE_CADENCE) / 2
+    midpoint_distances = np.asarray(
+        trajectory.Get_Heliocentric_Distance(midpoints), dtype=float
+    )
+    maximum_error = np.max(
+        np.abs((distances[:-1] + distances[1:]) / 2 - midpoint_distances)
+    )
+
+    column_store.write_columns(
+        pd.DataFrame({"date": times, "distance": distances}),
+        path,
+        metadata={**table_metadata(), "maximum_error_km": float(maximum_error)},
+    )
+
+
+def is_current(path=TABLE_PATH):
+    manifest = column_store.read_manifest(path)
+
+    if manifest is None:
+        return False
+
+    return {
+        key: manifest["metadata"].get(key) for key in table_metadata()
+    } == table_metadata()
+
+
+def load_table(path=TABLE_PATH):
+    """The table's times (as int64 nanoseconds) and distances (km)."""
+    if not is_current(path):
+        build_table(path)
+
+    table = column_store.read_columns(path, mmap=False)
+
+    return (
+        table["date"].to_numpy().astype("datetime64[ns]").astype(np.int64),
+        table["distance"].to_numpy(),
+    )
+
+
+def get_heliocentric_distance(times, path=TABLE_PATH):
+    """
+    Mercury's heliocentric distance (km) at each time, as
+    `trajectory.Get_Heliocentric_Distance`.
+
+    Times within the table are linearly interpolated. Any outside of it are
+    computed with SPICE, and missing times (NaT) give NaN.
+
+    Parameters
+    ----------
+    times : array_like of datetime
+        Times to find the distance at.
+
+    Returns
+    -------
+    numpy.ndarray
+        Distances in km.
+    """
+    table_times, table_distances = load_table(path)
+
+    times = pd.DatetimeIndex(times).as_unit("ns").to_numpy()
+    nanoseconds = times.view(np.int64)
+
+    # The table has a fixed cadence, so the sample before each time is found
+    # arithmetically rather than by binary search
+    cadence = table_times[1] - table_times[0]
+    offsets = nanoseconds - table_times[0]
+
+    indices = offsets // cadence
+    np.clip(indices, 0, len(table_times) - 2, out=indices)
+
+    fractions = (offsets - indices * cadence) / cadence
+    before = table_distances.take(indices)
+    distances = before + fractions * (table_distances.take(indices + 1) - before)
+
+    missing = np.isnat(times)
+    distances[missing] = np.nan
+
+    outside = ~missing & (
+        (nanoseconds < table_times[0]) | (nanoseconds > table_times[-1])
+    )
+    if outside.any():
+        from hermpy import trajectory
+
+        distances[outside] = trajectory.Get_Heliocentric_Distance(
+            pd.Series(times[outside])
+        )
+
+    return distances
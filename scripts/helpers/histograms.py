@@ -0,0 +1,217 @@
+"""
+Residence histograms: the number of (1 second average) mission samples within
+each spatial bin, used to show MESSENGER's residence and to normalise crossing
+distributions.
+
+Binning tens of millions of samples is slow, and the bins rarely change, so
+the histograms are cached on disk in ./resources/cache/residence/, keyed by
+the hash of the mission data, the plane, and the bin edges. Changing anything
+else about a figure then doesn't require re-binning the mission.
+
+On a cache miss, all requested planes are binned together in one pass over
+the data (see `multi_plane_histograms`), rather than with a separate
+`np.histogram2d` call per plane.
+"""
+
+import hashlib
+import os
+import pathlib
+
+import numpy as np
+
+from . import mission, resources
+
+CACHE_DIRECTORY = "./resources/cache/residence"
+
+# Coordinates which can be binned, as functions of the MSM' position, and the
+# pair of coordinates binned in each plane. Bump the version if a definition
+# changes.
+COORDINATES = {
+    "x": lambda x, y, z: x,
+    "y": lambda x, y, z: y,
+    "z": lambda x, y, z: z,
+    "cyl": lambda x, y, z: np.sqrt(y**2 + z**2),
+}
+PLANES = {
+    "xy": ("x", "y"),
+    "xz": ("x", "z"),
+    "cyl": ("x", "cyl"),
+}
+PLANES_VERSION = 1
+
+# Samples binned at once, limiting the size of temporary arrays
+CHUNK_SIZE = 2**22
+
+
+def cache_key(data_hash, plane, edges):
+    digest = hashlib.blake2b(digest_size=16)
+
+    digest.update(f"{data_hash}:{plane}:{PLANES_VERSION}".encode())
+    for axis_edges in edges:
+        digest.update(np.asarray(axis_edges, dtype=np.float64).tobytes())
+        digest.update(b"|")
+
+    return digest.hexdigest()
+
+
+def residence_histograms(bins, mission_path=mission.DEFAULT_MISSION_PATH):
+    """
+    Residence histograms of the full mission in one or more planes.
+
+    Parameters
+    ----------
+    bins : dict[str, tuple[array_like, array_like]]
+        Bin edges for each plane (a key of `PLANES`), as would be passed to
+        `np.histogram2d`, e.g. {"xy": (x_bins, y_bins), "cyl": (x_bins,
+        cyl_bins)}
+    mission_path : str, optional
+        Path to the full mission data.
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        The histogram for each plane, as the first output of `np.histogram2d`.
+    """
+    data_hash = mission.data_hash(mission_path)
+
+    histograms = {}
+    missing = {}
+    for plane, edges in bins.items():
+        path = (
+            pathlib.Path(CACHE_DIRECTORY)
+            / f"{plane}_{cache_key(data_hash, plane, edges)}.npy"
+        )
+
+        if path.exists():
+            histograms[plane] = np.load(path)
+        else:
+            missing[plane] = (edges, path)
+
+    if missing:
+        positions = resources.full_mission(mission_path)
+        x, y, z = (positions[c].to_numpy() for c in mission.POSITION_COLUMNS)
+
+        new_histograms = multi_plane_histograms(
+            x, y, z, {plane: edges for plane, (edges, _) in missing.items()}
+        )
+
+        for plane, (_, path) in missing.items():
+            save(path, new_histograms[plane])
+            histograms[plane] = new_histograms[plane]
+
+    return histograms
+
+
+def multi_plane_histograms(x, y, z, bins, chunk_size=CHUNK_SIZE):
+    """
+    Histogram positions in several planes in a single pass over the data.
+
+    Equivalent to calling `np.histogram2d` once per plane, but each coordinate
+    (including sqrt(y^2 + z^2)) is computed, and each coordinate's bin indices
+    found, only once per chunk of samples. For uniform bins the indices are
+    found arithmetically rather than by binary search. The counts for each
+    plane are then accumulated with `np.bincount`.
+
+    Parameters
+    ----------
+    x, y, z : array_like
+        MSM' positions.
+    bins : dict[str, tuple[array_like, array_like]]
+        Bin edges for each plane, as in `residence_histograms`.
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        The (float) histogram of each plane, identical to the first output of
+        `np.histogram2d`.
+    """
+    bins = {
+        plane: tuple(np.asarray(e, dtype=np.float64) for e in edges)
+        for plane, edges in bins.items()
+    }
+    histograms = {
+        plane: np.zeros(len(edges[0]) * len(edges[1]), dtype=np.int64)
+        for plane, edges in bins.items()
+    }
+
+    for start in range(0, len(x), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        position = (np.asarray(x[chunk]), np.asarray(y[chunk]), np.asarray(z[chunk]))
+
+        coordinates = {}
+        indices = {}
+        for plane, edges in bins.items():
+            plane_indices = []
+
+            for coordinate, axis_edges in zip(PLANES[plane], edges):
+                key = (coordinate, axis_edges.tobytes())
+
+                if key not in indices:
+                    if coordinate not in coordinates:
+                        coordinates[coordinate] = COORDINATES[coordinate](*position)
+                    indices[key] = bin_indices(coordinates[coordinate], axis_edges)
+
+                plane_indices.append(indices[key])
+
+            # Samples outside either axis fall in the extra final row or
+            # column, which is dropped at the end
+            x_indices, y_indices = plane_indices
+            histograms[plane] += np.bincount(
+                x_indices * len(edges[1]) + y_indices,
+                minlength=len(histograms[plane]),
+            )
+
+    return {
+        plane: histograms[plane]
+        .reshape(len(edges[0]), len(edges[1]))[:-1, :-1]
+        .astype(np.float64)
+        for plane, edges in bins.items()
+    }
+
+
+def bin_indices(values, edges):
+    """
+    The bin index of each value, or the number of bins if outside the edges
+    (or NaN). As in `np.histogram`, bins are half open except the last, which
+    includes its right edge.
+    """
+    number_of_bins = len(edges) - 1
+    first_edge, last_edge = edges[0], edges[-1]
+
+    outside = ~((values >= first_edge) & (values <= last_edge))
+
+    widths = np.diff(edges)
+    if not np.allclose(widths, widths[0], rtol=1e-9, atol=0):
+        indices = np.searchsorted(edges, values, side="right") - 1
+        indices[values == last_edge] = number_of_bins - 1
+        np.putmask(indices, outside, number_of_bins)
+
+        return indices
+
+    # Uniform bins. Estimate the index arithmetically, then correct any
+    # floating point error by comparing with the edges themselves (the same
+    # approach as np.histogram). fmax and fmin also replace NaN, so every
+    # estimate is a valid index before the outside values are masked.
+    scaled = values - first_edge
+    scaled *= number_of_bins / (last_edge - first_edge)
+    np.fmax(scaled, 0, out=scaled)
+    np.fmin(scaled, number_of_bins - 1, out=scaled)
+
+    indices = scaled.astype(np.intp)
+    indices -= values < edges.take(indices)
+    indices += (values >= edges.take(indices + 1)) & (indices < number_of_bins - 1)
+
+    np.putmask(indices, outside, number_of_bins)
+
+    return indices
+
+
+def save(path, array):
+    """Save atomically, so concurrent scripts never read a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as file:
+        np.save(file, array)
+
+    os.replace(temporary_path, path)
@@ -0,0 +1,149 @@
+"""
+Wrapping the functions which make up each stage of a figure script (loading,
+SPICE, histogramming, drawing, saving, ...), to observe the calls made to
+them. Used to time the stages (timing.py, benchmark_figures.py) and to
+profile their memory (memory_profile.py).
+"""
+
+import functools
+import importlib
+
+# Functions making up each stage, as (module, function name)
+STAGES = {
+    "unpickle": [
+        ("pickle", "load"),
+        ("pickle", "loads"),
+        ("pandas", "read_pickle"),
+        ("hermpy.mag", "Load_Mission"),
+    ],
+    "csv": [
+        ("pandas", "read_csv"),
+        ("hermpy.boundaries", "Load_Crossings"),
+    ],
+    "read": [
+        ("helpers.column_store", "read_columns"),
+        ("helpers.mag_store", "load_between_dates"),
+        ("helpers.model_output_store", "load_model_output"),
+        ("helpers.model_output_store", "load_model_output_between"),
+        ("hermpy.mag", "Load_Between_Dates"),
+    ],
+    "spice": [
+        ("spiceypy", "furnsh"),
+        ("spiceypy", "str2et"),
+        ("spiceypy", "datetime2et"),
+        ("spiceypy", "spkpos"),
+        ("spiceypy", "spkezr"),
+        ("spiceypy", "pxform"),
+        ("hermpy.trajectory", "Get_Heliocentric_Distance"),
+        ("hermpy.plotting", "Add_Tick_Ephemeris"),
+    ],
+    "histogram": [
+        ("numpy", "histogram"),
+        ("numpy", "histogram2d"),
+        ("numpy", "histogramdd"),
+        ("helpers.histograms", "residence_histograms"),
+        ("helpers.histograms", "multi_plane_histograms"),
+    ],
+    "merge": [
+        ("pandas", "merge_asof"),
+        ("helpers.ephemeris", "merge_positions"),
+        ("helpers.ephemeris", "positions_at"),
+    ],
+    "artists": [
+        ("matplotlib.figure", "Figure.subplots"),
+        ("matplotlib.figure", "Figure.add_subplot"),
+        ("matplotlib.figure", "Figure.colorbar"),
+        ("matplotlib.axes", "Axes.plot"),
+        ("matplotlib.axes", "Axes.scatter"),
+        ("matplotlib.axes", "Axes.pcolormesh"),
+        ("matplotlib.axes", "Axes.hist"),
+        ("matplotlib.axes", "Axes.hist2d"),
+        ("matplotlib.axes", "Axes.bar"),
+        ("matplotlib.axes", "Axes.errorbar"),
+        ("matplotlib.axes", "Axes.fill_between"),
+        ("matplotlib.axes", "Axes.axvspan"),
+        ("matplotlib.axes", "Axes.axvline"),
+        ("matplotlib.axes", "Axes.axhline"),
+        ("matplotlib.axes", "Axes.text"),
+        ("matplotlib.axes", "Axes.annotate"),
+        ("matplotlib.axes", "Axes.legend"),
+        ("matplotlib.axes", "Axes.imshow"),
+        ("matplotlib.axes", "Axes.contour"),
+        ("matplotlib.axes", "Axes.contourf"),
+        ("helpers.decimation", "plot"),
+        ("hermpy.plotting", "Plot_Mercury"),
+        ("hermpy.plotting", "Plot_Circle"),
+        ("hermpy.plotting", "Plot_Magnetospheric_Boundaries"),
+        ("hermpy.plotting", "Add_Labels"),
+    ],
+    "savefig": [("matplotlib.figure", "Figure.savefig")],
+}
+
+
+def wrap(module_name, function_name, wrapper):
+    """
+    Replace a function (or a method, as "Class.method") with
+    `wrapper(function)`. Modules which aren't installed are skipped.
+
+    Returns
+    -------
+    bool
+        Whether the function was found and replaced.
+    """
+    try:
+        owner = importlib.import_module(module_name)
+    except ImportError:
+        return False
+
+    *owner_names, attribute = function_name.split(".")
+    for owner_name in owner_names:
+        owner = getattr(owner, owner_name)
+
+    function = getattr(owner, attribute, None)
+    if function is None:
+        return False
+
+    setattr(owner, attribute, wrapper(function))
+    return True
+
+
+def instrument(callback, stages=STAGES):
+    """
+    Wrap the functions of each stage, such that each call is passed to
+    `callback(stage, name, call)`, which must return `call()`.
+
+    Calls made within another wrapped call (e.g. `pickle.load` within
+    `pd.read_pickle`) are passed through to the function directly, so only
+    the outermost is seen and stages never overlap.
+
+    Parameters
+    ----------
+    callback : callable
+        Called with the stage, the "module.function" name, and a function of
+        no arguments making the call.
+    stages : dict, optional
+        Functions to wrap, as STAGES.
+    """
+    # The stages of the calls in progress
+    active = []
+
+    for stage, functions in stages.items():
+        for module_name, function_name in functions:
+
+            def wrapper(function, stage=stage, name=f"{module_name}.{function_name}"):
+
+                @functools.wraps(function)
+                def instrumented(*args, **kwargs):
+                    if active:
+                        return function(*args, **kwargs)
+
+                    active.append(stage)
+                    try:
+                        return callback(stage, name, lambda: function(*args, **kwargs))
+
+                    finally:
+                        active.pop()
+
+                return instrumented
+
+            wrap(module_name, function_name, wrapper)
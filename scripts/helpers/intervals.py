@@ -0,0 +1,77 @@
+"""
+Find the crossing intervals within a time window without scanning the whole
+list.
+
+Intervals are sorted by start time, alongside a running maximum of their end
+times. The intervals overlapping a window then lie between two binary
+searches: every interval starting after the window ends is excluded by the
+sorted starts, and every interval before the first running maximum end
+within the window is known to end before it. This includes intervals which
+start before the window, but extend into it.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class IntervalIndex:
+    """
+    Sorted index over a table of intervals.
+
+    Parameters
+    ----------
+    intervals : pandas.DataFrame
+        Table of intervals, e.g. from `resources.crossing_intervals`.
+    start_column, end_column : str, optional
+        Columns of `intervals` containing the start and end of each interval.
+    """
+
+    def __init__(
+        self, intervals: pd.DataFrame, start_column="Start Time", end_column="End Time"
+    ):
+        self.intervals = intervals
+
+        starts = intervals[start_column].to_numpy(dtype="datetime64[ns]")
+        ends = intervals[end_column].to_numpy(dtype="datetime64[ns]")
+
+        # Positions of the intervals in start order. A stable sort keeps
+        # intervals with equal starts in their original order.
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        # fmax, as missing (NaT) ends must not hide the ends after them
+        self.max_ends = np.fmax.accumulate(self.ends)
+
+    def overlapping(self, start, end):
+        """
+        Intervals overlapping [start, end], including those which start
+        before or end after it, in start order.
+        """
+        start, end = to_datetime64(start), to_datetime64(end)
+
+        # Every interval before first has ended before the window starts
+        first = np.searchsorted(self.max_ends, start, side="left")
+        # Every interval from last starts after the window ends
+        last = np.searchsorted(self.starts, end, side="right")
+
+        candidates = np.arange(first, max(first, last))
+        positions = self.order[candidates[self.ends[candidates] >= start]]
+
+        return self.intervals.iloc[positions]
+
+    def starting_between(self, start, end):
+        """
+        Intervals starting within [start, end], in start order. The same
+        intervals as `intervals.loc[intervals[start_column].between(start,
+        end)]`.
+        """
+        start, end = to_datetime64(start), to_datetime64(end)
+
+        first = np.searchsorted(self.starts, start, side="left")
+        last = np.searchsorted(self.starts, end, side="right")
+
+        return self.intervals.iloc[self.order[first:last]]
+
+
+def to_datetime64(time):
+    return pd.Timestamp(time).as_unit("ns").to_datetime64()
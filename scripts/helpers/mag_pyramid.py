@@ -0,0 +1,338 @@
+"""
+Multi-resolution aggregates of the 20 Hz MAG store (see mag_store.py), for
+quick-look plots and coarse statistics over long windows.
+
+Each level holds, for every bin of its width, the number of samples and the
+mean, minimum, maximum, and standard deviation of each field component and
+position:
+
+    ./resources/cache/mag_pyramid/1s/
+    ./resources/cache/mag_pyramid/10s/
+    ./resources/cache/mag_pyramid/1min/
+    ./resources/cache/mag_pyramid/10min/
+
+A plot only needs as many bins as it has columns of pixels, so `load_between`
+reads the coarsest level which still resolves the window at the output
+resolution, falling back to the 20 Hz data for short windows. An hour- or
+day-long view then reads kilobytes rather than the full 20 Hz data.
+
+The pyramid is built from the 20 Hz store once with:
+
+$ python ./scripts/convert_resources.py --pyramid
+"""
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from . import column_store, decimation, mag_store, mission
+
+PYRAMID_PATH = "./resources/cache/mag_pyramid"
+
+# Bin width of each level, finest first. Each divides the next, and the
+# store's chunks, so bins never straddle a batch while building.
+LEVELS = {
+    "1s": np.timedelta64(1, "s"),
+    "10s": np.timedelta64(10, "s"),
+    "1min": np.timedelta64(1, "m"),
+    "10min": np.timedelta64(10, "m"),
+}
+
+COLUMNS = ["|B|", "Bx", "By", "Bz"] + mission.POSITION_COLUMNS
+
+# Bump if the aggregates change
+PYRAMID_VERSION = 1
+
+# Hours of the 20 Hz store aggregated at once while building
+BATCH_HOURS = 24
+
+
+def level_path(level, path=PYRAMID_PATH):
+    return pathlib.Path(path) / level
+
+
+def source_description(store_path):
+    """What the pyramid is built from, to tell if it is out of date."""
+    manifest = column_store.read_manifest(store_path)
+    return {"length": manifest["length"], **manifest["metadata"]}
+
+
+def is_current(store_path=mag_store.DEFAULT_STORE_PATH, path=PYRAMID_PATH):
+    if not mag_store.store_exists(store_path):
+        return False
+
+    source = source_description(store_path)
+
+    for level in LEVELS:
+        manifest = column_store.read_manifest(level_path(level, path))
+
+        if manifest is None:
+            return False
+
+        if manifest["metadata"] != {
+            "source": source,
+            "level": level,
+            "version": PYRAMID_VERSION,
+        }:
+            return False
+
+    return True
+
+
+def build_pyramid(
+    store_path=mag_store.DEFAULT_STORE_PATH, path=PYRAMID_PATH, verbose=False
+):
+    """
+    Aggregate the 20 Hz store into each level, a batch of chunks at a time.
+    Coarser levels are aggregated from the sums of the finer ones, so the
+    20 Hz data is only read once.
+    """
+    store_path = pathlib.Path(store_path)
+    chunk_offsets = np.load(store_path / "chunk_offsets.npy")
+
+    dates = column_store.read_column(store_path, "date")
+    values = {
+        column: column_store.read_column(store_path, column) for column in COLUMNS
+    }
+
+    writers = {
+        level: column_store.ColumnWriter(level_path(level, path)) for level in LEVELS
+    }
+
+    batch_starts = chunk_offsets[:-1:BATCH_HOURS]
+    batch_ends = np.append(batch_starts[1:], chunk_offsets[-1])
+
+    for batch_start, batch_end in zip(batch_starts, batch_ends):
+        rows = slice(batch_start, batch_end)
+
+        if verbose:
+            print(f"Aggregating from {pd.Timestamp(dates[batch_start])}")
+
+        times = np.asarray(dates[rows]).astype("datetime64[ns]").view(np.int64)
+        sums = {
+            "date": times,
+            "count": np.ones(len(times), dtype=np.int64),
+            **{
+                statistic: {
+                    column: np.asarray(values[column][rows], dtype=np.float64)
+                    ** (2 if statistic == "squares" else 1)
+                    for column in COLUMNS
+                }
+                for statistic in ["sum", "squares", "min", "max"]
+            },
+        }
+
+        for level, width in LEVELS.items():
+            sums = combine(sums, width)
+            writers[level].append(summary_table(sums))
+
+    source = source_description(store_path)
+    for level, writer in writers.items():
+        writer.close(
+            metadata={"source": source, "level": level, "version": PYRAMID_VERSION}
+        )
+
+
+def combine(sums, width):
+    """
+    Combine sample sums into bins of `width`. The times must be sorted, and
+    give the start of each sample (or finer bin).
+    """
+    width = width.astype("timedelta64[ns]").astype(np.int64)
+    bins = sums["date"] // width
+
+    first_rows = np.flatnonzero(np.diff(bins, prepend=bins[0] - 1))
+
+    return {
+        "date": bins[first_rows] * width,
+        "count": np.add.reduceat(sums["count"], first_rows),
+        "sum": {c: np.add.reduceat(v, first_rows) for c, v in sums["sum"].items()},
+        "squares": {
+            c: np.add.reduceat(v, first_rows) for c, v in sums["squares"].items()
+        },
+        "min": {c: np.fmin.reduceat(v, first_rows) for c, v in sums["min"].items()},
+        "max": {c: np.fmax.reduceat(v, first_rows) for c, v in sums["max"].items()},
+    }
+
+
+def summary_table(sums):
+    """The mean, min, max, and std of each column from their sums."""
+    table = {
+        "date": sums["date"].astype("datetime64[ns]"),
+        "count": sums["count"],
+    }
+
+    for column in COLUMNS:
+        mean = sums["sum"][column] / sums["count"]
+        variance = sums["squares"][column] / sums["count"] - mean**2
+
+        table[f"{column} mean"] = mean
+        table[f"{column} min"] = sums["min"][column]
+        table[f"{column} max"] = sums["max"][column]
+        table[f"{column} std"] = np.sqrt(np.maximum(variance, 0))
+
+    return pd.DataFrame(table)
+
+
+def choose_level(start, end, pixels):
+    """
+    The coarsest level with at least one bin per pixel across the window, or
+    None if the window needs finer than the finest level.
+    """
+    pixel_width = (pd.Timestamp(end) - pd.Timestamp(start)) / pixels
+
+    chosen = None
+    for level, width in LEVELS.items():
+        if pd.Timedelta(width) <= pixel_width:
+            chosen = level
+
+    return chosen
+
+
+def read_level(level, start, end, path=PYRAMID_PATH):
+    """The bins of a level overlapping start <= date <= end."""
+    directory = level_path(level, path)
+    width = LEVELS[level]
+
+    dates = column_store.read_column(directory, "date")
+    start = np.datetime64(pd.Timestamp(start)).astype(dates.dtype)
+    end = np.datetime64(pd.Timestamp(end)).astype(dates.dtype)
+
+    rows = slice(
+        np.searchsorted(dates, start - width, side="right"),
+        np.searchsorted(dates, end, side="right"),
+    )
+
+    manifest = column_store.read_manifest(directory)
+    return pd.DataFrame(
+        {
+            c["name"]: np.array(column_store.read_column(directory, c["name"])[rows])
+            for c in manifest["columns"]
+        }
+    )
+
+
+def load_between(
+    start,
+    end,
+    pixels,
+    store_path=mag_store.DEFAULT_STORE_PATH,
+    path=PYRAMID_PATH,
+):
+    """
+    MAG data between two times at the coarsest resolution which still
+    resolves `pixels` columns across the window.
+
+    Parameters
+    ----------
+    start, end : datetime-like
+        Window to load.
+    pixels : int
+        Number of pixels (or other output bins) across the window.
+
+    Returns
+    -------
+    level : str
+        The level read, or "20Hz" if the 20 Hz store was read (when the
+        window is too short for any level, or the pyramid is out of date).
+    data : pandas.DataFrame
+        For a level, the "date" (start), "count", and "COLUMN STATISTIC" of
+        each bin. For 20 Hz data, the columns of the store.
+    """
+    level = choose_level(start, end, pixels)
+
+    if level is None or not is_current(store_path, path):
+        return "20Hz", mag_store.read_between(store_path, start, end)
+
+    return level, read_level(level, start, end, path)
+
+
+def plot(ax, start, end, column, pixels=None, **kwargs):
+    """
+    Plot a MAG column between two times from the coarsest level which
+    resolves the axis, as the envelope of each bin's minimum and maximum.
+    This draws the same as the 20 Hz data once each bin is narrower than a
+    pixel. Short windows are plotted from the 20 Hz data, decimated (see
+    decimation.py).
+
+    Parameters
+    ----------
+    ax : matplotlib.axes.Axes
+        Axis to plot on.
+    start, end : datetime-like
+        Window to plot.
+    column : str
+        e.g. "|B|" or "Bx".
+    pixels : int, optional
+        Pixels across the window. By default, the width of the axis at
+        `decimation.RESOLUTION_DPI`.
+    **kwargs
+        Passed to `Line2D`.
+    """
+    if pixels is None:
+        width_inches = ax.get_position().width * ax.figure.get_figwidth()
+        pixels = int(np.ceil(width_inches * decimation.RESOLUTION_DPI))
+
+    level, data = load_between(start, end, pixels)
+
+    if level == "20Hz":
+        return decimation.plot(ax, data["date"], data[column], **kwargs)
+
+    # Each bin as a vertical stroke from its minimum to its maximum, at its
+    # centre
+    centres = data["date"].to_numpy() + LEVELS[level] // 2
+    x = np.repeat(centres, 2)
+    y = np.column_stack(
+        (data[f"{column} min"].to_numpy(), data[f"{column} max"].to_numpy())
+    ).ravel()
+
+    return ax.plot(x, y, **kwargs)[0]
+
+
+def statistics_between(start, end, columns=COLUMNS, path=PYRAMID_PATH):
+    """
+    The count, mean, min, max, and std of columns across a window, combined
+    from the coarsest level whose bins the window's edges fall between. Edges
+    are rounded out to whole seconds.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per column, with "count", "mean", "min", "max", and "std".
+    """
+    start = pd.Timestamp(start).floor("s")
+    end = pd.Timestamp(end).ceil("s")
+
+    level = next(
+        level
+        for level, width in reversed(LEVELS.items())
+        if start == start.floor(pd.Timedelta(width))
+        and end == end.floor(pd.Timedelta(width))
+    )
+
+    # Bins starting within [start, end)
+    data = read_level(level, start, end, path)
+    data = data.loc[(data["date"] >= start) & (data["date"] < end)]
+
+    count = data["count"].to_numpy()
+    rows = []
+    for column in columns:
+        mean = data[f"{column} mean"].to_numpy()
+        std = data[f"{column} std"].to_numpy()
+
+        total = count.sum()
+        overall_mean = np.sum(mean * count) / total
+        squares = np.sum((std**2 + mean**2) * count) / total
+
+        rows.append(
+            {
+                "count": total,
+                "mean": overall_mean,
+                "min": data[f"{column} min"].min(),
+                "max": data[f"{column} max"].max(),
+                "std": np.sqrt(max(squares - overall_mean**2, 0)),
+            }
+        )
+
+    return pd.DataFrame(rows, index=columns)
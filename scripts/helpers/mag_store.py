@@ -0,0 +1,191 @@
+"""
+A packed, time-chunked copy of the MESSENGER MAG (20 Hz) dataset.
+
+`hermpy.mag.Load_Between_Dates` reads and parses the raw daily files on every
+call. This store holds the same DataFrame columns as memory-mapped arrays,
+along with a small index of fixed-duration chunks:
+
+    chunk_times.npy    <- start time of each (non-empty) chunk
+    chunk_offsets.npy  <- row offset of each chunk, plus the total length
+
+A window read binary searches the chunk index, and only touches the rows of
+the chunks which overlap the window.
+
+The store is built once with:
+
+$ python ./scripts/convert_resources.py --mag
+"""
+
+import datetime as dt
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from . import column_store
+
+DEFAULT_STORE_PATH = "./resources/messenger_mag_20hz"
+
+# MESSENGER was in orbit around Mercury between these dates
+MISSION_START = dt.datetime(2011, 3, 23)
+MISSION_END = dt.datetime(2015, 5, 1)
+
+CHUNK_UNIT = "h"
+CHUNK_DURATION = np.timedelta64(1, CHUNK_UNIT)
+
+# The arguments the store is built with. Calls to load_between_dates with
+# different arguments fall back to hermpy.
+BUILD_KWARGS = {"aberrate": True}
+
+
+def build_store(
+    root_dir,
+    store_path=DEFAULT_STORE_PATH,
+    start=MISSION_START,
+    end=MISSION_END,
+    verbose=False,
+):
+    """
+    Build the store by loading the raw MAG files one day at a time. Raises a
+    ValueError, without writing a store, if there is no data between start and
+    end.
+
+    Parameters
+    ----------
+    root_dir : str
+        The hermpy MAG data directory, i.e.
+        `utils.User.DATA_DIRECTORIES["MAG"]`
+    store_path : str, optional
+        Directory in which to create the store.
+    start, end : datetime.datetime, optional
+        Span of data to include.
+    """
+    from hermpy import mag
+
+    writer = column_store.ColumnWriter(store_path)
+
+    day = start
+    while day < end:
+        next_day = day + dt.timedelta(days=1)
+
+        if verbose:
+            print(f"Adding {day:%Y-%m-%d}")
+
+        try:
+            data = mag.Load_Between_Dates(root_dir, day, next_day, **BUILD_KWARGS)
+        except FileNotFoundError:
+            # No data for this day
+            data = None
+
+        if data is not None and len(data) > 0:
+            # Windows are inclusive, don't duplicate the sample at midnight
+            data = data.loc[(data["date"] >= day) & (data["date"] < next_day)]
+            writer.append(data.sort_values("date"))
+
+        day = next_day
+
+    # Otherwise the store would have no columns to index, and every window
+    # would read as empty
+    if writer.length == 0:
+        raise ValueError(
+            f"No MAG data found in {root_dir} between {start:%Y-%m-%d} and "
+            f"{end:%Y-%m-%d}, so no store was built"
+        )
+
+    writer.close(
+        metadata={
+            "build_kwargs": BUILD_KWARGS,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+        }
+    )
+
+    write_chunk_index(store_path)
+
+
+def write_chunk_index(store_path):
+    """Determine the row offsets of each chunk from the (sorted) date column."""
+    manifest = column_store.read_manifest(store_path)
+    if manifest is None or manifest["length"] == 0:
+        raise ValueError(f"The MAG store at {store_path} holds no data to index")
+
+    dates = column_store.read_column(store_path, "date")
+
+    # Round each time down to the start of its chunk
+    chunk_starts = dates.astype(f"datetime64[{CHUNK_UNIT}]")
+    chunk_times, offsets = np.unique(chunk_starts, return_index=True)
+
+    np.save(
+        pathlib.Path(store_path) / "chunk_times.npy", chunk_times.astype(dates.dtype)
+    )
+    np.save(
+        pathlib.Path(store_path) / "chunk_offsets.npy",
+        np.append(offsets, len(dates)).astype(np.int64),
+    )
+
+
+def store_exists(store_path=DEFAULT_STORE_PATH):
+    return (
+        column_store.read_manifest(store_path) is not None
+        and (pathlib.Path(store_path) / "chunk_offsets.npy").exists()
+    )
+
+
+def read_between(store_path, start, end) -> pd.DataFrame:
+    """
+    Read all rows with start <= date <= end from the store.
+    """
+    store_path = pathlib.Path(store_path)
+
+    chunk_times = np.load(store_path / "chunk_times.npy")
+    chunk_offsets = np.load(store_path / "chunk_offsets.npy")
+
+    start = np.datetime64(pd.Timestamp(start)).astype(chunk_times.dtype)
+    end = np.datetime64(pd.Timestamp(end)).astype(chunk_times.dtype)
+
+    # Chunks overlapping [start, end] begin after start - CHUNK_DURATION, and
+    # no later than end
+    first_chunk = np.searchsorted(chunk_times, start - CHUNK_DURATION, side="right")
+    last_chunk = np.searchsorted(chunk_times, end, side="right")
+
+    rows = slice(chunk_offsets[first_chunk], chunk_offsets[last_chunk])
+
+    manifest = column_store.read_manifest(store_path)
+    columns = [c["name"] for c in manifest["columns"]]
+
+    # Trim to the exact window within the overlapping chunks
+    dates = column_store.read_column(store_path, "date")[rows]
+    rows = slice(
+        rows.start + np.searchsorted(dates, start, side="left"),
+        rows.start + np.searchsorted(dates, end, side="right"),
+    )
+
+    return pd.DataFrame(
+        {
+            column: np.array(column_store.read_column(store_path, column)[rows])
+            for column in columns
+        }
+    )
+
+
+def load_between_dates(root_dir, start, end, store_path=DEFAULT_STORE_PATH, **kwargs):
+    """
+    Drop-in replacement for `hermpy.mag.Load_Between_Dates`.
+
+    Reads from the chunked store if it has been built, covers the requested
+    window, and was built with the same arguments. Otherwise the raw files in
+    `root_dir` are loaded with hermpy.
+    """
+    if store_exists(store_path):
+        metadata = column_store.read_manifest(store_path)["metadata"]
+        build_kwargs = metadata["build_kwargs"]
+
+        covered = pd.Timestamp(metadata["start"]) <= pd.Timestamp(start)
+        covered &= pd.Timestamp(end) <= pd.Timestamp(metadata["end"])
+
+        if covered and {**build_kwargs, **kwargs} == build_kwargs:
+            return read_between(store_path, start, end)
+
+    from hermpy import mag
+
+    return mag.Load_Between_Dates(root_dir, start, end, **kwargs)
@@ -0,0 +1,299 @@
+"""
+Attributing the peak memory of a figure script to the steps which allocate it
+(see ./scripts/profile_memory.py).
+
+While a script runs:
+- The RSS is sampled by a background thread, along with the line of the
+  figure script (or helper) running at the time, and the stage (see
+  instrumentation.py) it is within.
+- Allocations are traced with tracemalloc, which includes the data of numpy
+  arrays and so of DataFrames.
+- Each call to a stage's functions records the RSS before and after, and the
+  traced memory it allocated, at its peak and retained afterwards.
+
+Whenever the RSS reaches a new high, a tracemalloc snapshot is taken, so at
+the end the snapshot from closest to the peak names the lines which allocated
+the memory held then. If the high was reached within a stage, the largest
+live arrays and DataFrames are also found as the stage returns, by the main
+thread, so the sampler itself stays cheap.
+"""
+
+import gc
+import linecache
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentation
+
+# Files allocations and lines are attributed to: the figure scripts and
+# helpers
+SCRIPTS_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Except for the profiler and the wrappers around each stage
+PROFILER_FILES = [os.path.abspath(__file__), os.path.abspath(instrumentation.__file__)]
+
+# A new snapshot is taken when the RSS grows past the last by this factor
+SNAPSHOT_GROWTH = 1.05
+
+# Allocating lines holding less than this at the peak aren't reported
+MINIMUM_REPORTED_SIZE = 1024**2
+
+# Ignore growth below this, so small scripts aren't snapshotted constantly
+MINIMUM_SNAPSHOT_RSS = 256 * 1024**2
+
+
+def current_rss():
+    """The resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryProfiler:
+    """
+    Profile the memory of the code run between `start` and `stop`.
+
+    Parameters
+    ----------
+    interval : float, optional
+        Seconds between RSS samples.
+    frames : int, optional
+        Frames of traceback stored by tracemalloc for each allocation. Enough
+        are needed to reach from within numpy and pandas back to the script.
+    top : int, optional
+        Number of allocation sites and objects to report.
+    """
+
+    def __init__(self, interval=0.05, frames=25, top=10):
+        self.interval = interval
+        self.frames = frames
+        self.top = top
+
+        self.main_thread = threading.main_thread().ident
+        self.stage = None
+        self.stages = {}
+        self.samples = []
+        self.peak = None
+        self.snapshot_rss = MINIMUM_SNAPSHOT_RSS
+        self.at_peak = None
+
+        # tracemalloc's peak, which is reset within each stage
+        self.traced_peak = 0
+
+        self._scanning = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def start(self):
+        instrumentation.instrument(self._profile)
+
+        tracemalloc.start(self.frames)
+        self.start_time = time.perf_counter()
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+        self.traced_peak = max(self.traced_peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    def _profile(self, stage, name, call):
+        """Measure the memory of a call to a stage's function."""
+        if not tracemalloc.is_tracing():
+            return call()
+
+        self.stage = stage
+        rss_before = current_rss()
+        traced_before, traced_peak_before = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        result = None
+        try:
+            result = call()
+            return result
+
+        finally:
+            traced_after, traced_peak = tracemalloc.get_traced_memory()
+            rss_after = current_rss()
+            self.stage = None
+
+            with self._lock:
+                at_peak = self.at_peak
+
+            # Left for this call by the sampler if the RSS reached a new high
+            # during it
+            if (
+                at_peak is not None
+                and at_peak["stage"] == stage
+                and at_peak["objects"] is None
+            ):
+                # The scan allocates, so isn't sampled
+                self._scanning = True
+                at_peak["objects"] = self._largest_objects(result)
+                self._scanning = False
+
+            # Keep the overall peak, which reset_peak lost
+            self.traced_peak = max(self.traced_peak, traced_peak_before, traced_peak)
+
+            totals = self.stages.setdefault(
+                stage,
+                {
+                    "calls": 0,
+                    "rss_increase": 0,
+                    "traced_peak": 0,
+                    "traced_retained": 0,
+                },
+            )
+            totals["calls"] += 1
+            if rss_before is not None and rss_after is not None:
+                totals["rss_increase"] += rss_after - rss_before
+            totals["traced_peak"] = max(
+                totals["traced_peak"], traced_peak - traced_before
+            )
+            totals["traced_retained"] += traced_after - traced_before
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            if self._scanning:
+                continue
+
+            rss = current_rss()
+            if rss is None:
+                return
+
+            sample = {
+                "time": time.perf_counter() - self.start_time,
+                "rss": rss,
+                "stage": self.stage,
+                "line": self._current_line(),
+            }
+            self.samples.append(sample)
+
+            if self.peak is None or rss > self.peak["rss"]:
+                self.peak = sample
+
+            if rss > self.snapshot_rss * SNAPSHOT_GROWTH:
+                self.snapshot_rss = rss
+                at_peak = {
+                    "rss": rss,
+                    "stage": sample["stage"],
+                    "allocations": [],
+                    # Filled in by the main thread as the stage returns
+                    "objects": None,
+                }
+
+                # Before the (slow) snapshot, so the stage can't return first
+                with self._lock:
+                    self.at_peak = at_peak
+
+                at_peak["allocations"] = self._allocation_sites()
+
+    def _current_line(self):
+        """The innermost line of the scripts the main thread is running."""
+        frame = sys._current_frames().get(self.main_thread)
+
+        while frame is not None:
+            if is_script_file(frame.f_code.co_filename):
+                return describe_line(frame.f_code.co_filename, frame.f_lineno)
+            frame = frame.f_back
+
+        return None
+
+    def _allocation_sites(self):
+        """
+        Traced memory currently held, by the innermost line of the scripts in
+        each allocation's traceback.
+        """
+        if not tracemalloc.is_tracing():
+            return []
+
+        sizes = {}
+        for statistic in tracemalloc.take_snapshot().statistics("traceback"):
+            line = next(
+                (
+                    describe_line(frame.filename, frame.lineno)
+                    for frame in reversed(statistic.traceback)
+                    if is_script_file(frame.filename)
+                ),
+                "(outside the scripts)",
+            )
+            sizes[line] = sizes.get(line, 0) + statistic.size
+
+        largest = sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+        return [
+            {"line": line, "size": size}
+            for line, size in largest[: self.top]
+            if size >= MINIMUM_REPORTED_SIZE
+        ]
+
+    def _largest_objects(self, result=None):
+        """
+        The largest live DataFrames, and arrays which own their data, from
+        the main thread. Arrays aren't tracked by the garbage collector, so
+        are found as variables of the calling frames, or as the result of the
+        stage just returned.
+        """
+        candidates = {id(obj): obj for obj in gc.get_objects()}
+        candidates[id(result)] = result
+
+        frame = sys._getframe(1)
+        while frame is not None:
+            for namespace in [frame.f_locals, frame.f_globals]:
+                for value in list(namespace.values()):
+                    candidates[id(value)] = value
+            frame = frame.f_back
+
+        objects = []
+        for obj in candidates.values():
+            try:
+                if isinstance(obj, pd.DataFrame):
+                    size = int(obj.memory_usage(index=False, deep=False).sum())
+                    objects.append((size, "DataFrame", list(obj.shape)))
+
+                elif isinstance(obj, np.ndarray) and obj.base is None:
+                    objects.append(
+                        (obj.nbytes, f"ndarray[{obj.dtype}]", list(obj.shape))
+                    )
+
+            except Exception:
+                # e.g. objects part way through construction
+                continue
+
+        objects.sort(key=lambda item: item[0], reverse=True)
+
+        return [
+            {"size": size, "type": kind, "shape": shape}
+            for size, kind, shape in objects[: self.top]
+        ]
+
+    def results(self):
+        return {
+            "peak_rss": None if self.peak is None else self.peak["rss"],
+            "peak": self.peak,
+            "traced_peak": self.traced_peak,
+            "stages": self.stages,
+            "at_peak": self.at_peak,
+            "samples": self.samples,
+        }
+
+
+def is_script_file(filename):
+    """Whether a file is a figure script or helper, other than the profiler's."""
+    path = os.path.abspath(filename)
+    return path.startswith(SCRIPTS_DIRECTORY) and path not in PROFILER_FILES
+
+
+def describe_line(filename, lineno):
+    path = os.path.relpath(os.path.abspath(filename), SCRIPTS_DIRECTORY)
+    return f"{path}:{lineno} {linecache.getline(filename, lineno).strip()}"
@@ -0,0 +1,82 @@
+"""
+Columnar, memory-mapped copy of the pickled full mission DataFrame.
+
+Unpickling `messenger_mag` needs the whole mission in memory at once, while
+the spatial figures only use the time and position columns. The first call to
+`load_mission` converts the pickle into a column store next to it
+(`messenger_mag` -> `messenger_mag_columns/`). Later calls memory-map only the
+requested columns.
+"""
+
+from . import column_store
+
+POSITION_COLUMNS = ["X MSM' (radii)", "Y MSM' (radii)", "Z MSM' (radii)"]
+TRAJECTORY_COLUMNS = ["date"] + POSITION_COLUMNS
+
+DEFAULT_MISSION_PATH = "./resources/messenger_mag"
+
+
+def store_path_for(pickle_path):
+    return str(pickle_path).rstrip("/") + "_columns"
+
+
+def convert_mission(pickle_path=DEFAULT_MISSION_PATH, store_path=None):
+    """
+    One-time conversion of the pickled mission DataFrame to a column store.
+
+    This is the only step which needs the full mission in memory.
+    """
+    from hermpy import mag
+
+    if store_path is None:
+        store_path = store_path_for(pickle_path)
+
+    data = mag.Load_Mission(pickle_path)
+
+    column_store.write_columns(
+        data,
+        store_path,
+        metadata={"source": column_store.describe_source(pickle_path)},
+    )
+
+    return store_path
+
+
+def ensure_store(pickle_path=DEFAULT_MISSION_PATH):
+    """Returns the path of an up to date store, converting the pickle if needed."""
+    store_path = store_path_for(pickle_path)
+
+    if not column_store.is_current(store_path, pickle_path):
+        convert_mission(pickle_path, store_path)
+
+    return store_path
+
+
+def data_hash(pickle_path=DEFAULT_MISSION_PATH):
+    """
+    Hash of the mission data, for use in cache keys. This is the hash of the
+    pickle recorded at conversion, so is cheap to look up.
+    """
+    manifest = column_store.read_manifest(ensure_store(pickle_path))
+    return manifest["metadata"]["source"]["hash"]
+
+
+def load_mission(pickle_path=DEFAULT_MISSION_PATH, columns=TRAJECTORY_COLUMNS):
+    """
+    Load columns of the full mission dataset.
+
+    Parameters
+    ----------
+    pickle_path : str, optional
+        Path to the pickled mission DataFrame. The column store is kept
+        alongside it, and is (re)built if missing or out of date.
+    columns : list[str] | None, optional
+        Columns to load. Defaults to the time and MSM' position columns. None
+        loads every column.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame backed by read-only memory-mapped arrays.
+    """
+    return column_store.read_columns(ensure_store(pickle_path), columns)
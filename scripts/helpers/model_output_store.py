@@ -0,0 +1,138 @@
+"""
+Binary cache of the random forest output, `model_raw_output.csv`.
+
+Parsing the mission-length CSV, and its ISO 8601 timestamps, takes minutes.
+On first load the CSV is converted into a column store alongside it
+(`model_raw_output.csv` -> `model_raw_output_columns/`), with times as
+datetime64[ns] (int64 nanoseconds) and float probability columns. Every
+other column must be numeric, otherwise the conversion fails rather than
+leaving it out. Later loads check the CSV hash recorded in the store, and
+memory-map the columns.
+
+The store is sorted by time, so the "Time" column doubles as an index: a
+window is found with a binary search, and only the rows within it are read
+from disk.
+"""
+
+import numpy as np
+import pandas as pd
+
+from . import column_store
+
+DEFAULT_MODEL_OUTPUT_PATH = "./resources/model_raw_output.csv"
+
+# Rows parsed at once during conversion
+CONVERSION_CHUNK_SIZE = 2_000_000
+
+
+def store_path_for(csv_path):
+    return str(csv_path).removesuffix(".csv") + "_columns"
+
+
+def convert_model_output(csv_path=DEFAULT_MODEL_OUTPUT_PATH, store_path=None):
+    """
+    One-time conversion of the model output CSV to a column store. The CSV is
+    parsed in chunks so the full text table is never held in memory.
+    """
+    if store_path is None:
+        store_path = store_path_for(csv_path)
+
+    writer = column_store.ColumnWriter(store_path)
+
+    for chunk in pd.read_csv(csv_path, chunksize=CONVERSION_CHUNK_SIZE):
+        chunk["Time"] = pd.to_datetime(chunk["Time"], format="ISO8601").astype(
+            "datetime64[ns]"
+        )
+
+        # Only numeric columns can be memory-mapped, and none may be dropped
+        # without the figures noticing
+        non_numeric = chunk.drop(columns="Time").select_dtypes(exclude="number")
+        if len(non_numeric.columns) > 0:
+            raise ValueError(
+                f"{csv_path} has non-numeric columns which can't be stored: "
+                f"{', '.join(map(repr, non_numeric.columns))}"
+            )
+        writer.append(chunk)
+
+    metadata = {"source": column_store.describe_source(csv_path)}
+    writer.close(metadata=metadata)
+
+    # Window reads rely on the times being sorted. The model output is written
+    # in time order, but if not, sort it here once.
+    times = column_store.read_column(store_path, "Time")
+    if np.any(times[1:] < times[:-1]):
+        data = column_store.read_columns(store_path, mmap=False)
+        column_store.write_columns(
+            data.sort_values("Time", kind="stable", ignore_index=True),
+            store_path,
+            metadata=metadata,
+        )
+
+    return store_path
+
+
+def ensure_store(csv_path=DEFAULT_MODEL_OUTPUT_PATH):
+    """Returns the path of an up to date store, converting the CSV if needed."""
+    store_path = store_path_for(csv_path)
+
+    if not column_store.is_current(store_path, csv_path):
+        convert_model_output(csv_path, store_path)
+
+    return store_path
+
+
+def load_model_output(csv_path=DEFAULT_MODEL_OUTPUT_PATH, columns=None):
+    """
+    Load the model output, with a parsed "Time" column.
+
+    Parameters
+    ----------
+    csv_path : str, optional
+        Path to `model_raw_output.csv`. The binary cache is kept alongside it,
+        and is (re)built if missing or if the CSV has changed.
+    columns : list[str] | None, optional
+        Columns to load, all by default.
+
+    Returns
+    -------
+    pandas.DataFrame
+        DataFrame backed by read-only memory-mapped arrays.
+    """
+    return column_store.read_columns(ensure_store(csv_path), columns)
+
+
+def load_model_output_between(
+    start, end, csv_path=DEFAULT_MODEL_OUTPUT_PATH, columns=None
+):
+    """
+    Load the rows of the model output with start <= Time <= end.
+
+    Equivalent to `model_output.loc[model_output["Time"].between(start, end)]`
+    without loading or scanning the whole table. The binary search touches
+    O(log n) pages of the time column, and then only the rows within the
+    window are read. Rows keep their position in the full table as their
+    index.
+    """
+    store_path = ensure_store(csv_path)
+    manifest = column_store.read_manifest(store_path)
+
+    if columns is None:
+        columns = [c["name"] for c in manifest["columns"]]
+
+    times = column_store.read_column(store_path, "Time")
+    rows = slice(
+        np.searchsorted(
+            times, np.datetime64(pd.Timestamp(start)).astype(times.dtype), "left"
+        ),
+        np.searchsorted(
+            times, np.datetime64(pd.Timestamp(end)).astype(times.dtype), "right"
+        ),
+    )
+
+    return pd.DataFrame(
+        {
+            column: np.array(column_store.read_column(store_path, column)[rows])
+            for column in columns
+        },
+        index=pd.RangeIndex(rows.start, rows.stop),
+    )
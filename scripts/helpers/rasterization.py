@@ -0,0 +1,79 @@
+"""
+Saving figures with their heavy artists rasterized.
+
+Residence maps (pcolormesh) and dense lines (e.g. 20 Hz MAG data, model
+probabilities) make up most of a figure's PDF when written as vector paths,
+and are slow for PDF viewers to draw. When saved with `savefig`, these are
+instead embedded as images at RASTER_DPI, while text, axes, ticks, and
+annotations stay as vectors.
+
+The size and save time of each figure, with and without rasterization, can
+be compared with ./scripts/compare_rasterization.py.
+"""
+
+import contextlib
+
+import matplotlib.collections
+import matplotlib.lines
+import matplotlib.pyplot as plt
+
+# Resolution at which heavy artists are rasterized
+RASTER_DPI = 300
+
+# Lines with more points than this are rasterized
+MINIMUM_LINE_POINTS = 1000
+
+
+def is_heavy(artist):
+    """Whether an artist is rasterized by `savefig`."""
+    if isinstance(artist, matplotlib.collections.QuadMesh):
+        return True
+
+    if isinstance(artist, matplotlib.lines.Line2D):
+        return len(artist.get_xdata()) > MINIMUM_LINE_POINTS
+
+    return False
+
+
+@contextlib.contextmanager
+def heavy_artists_rasterized(fig):
+    """Rasterize the heavy artists of a figure within this context."""
+    artists = [
+        artist
+        for ax in fig.axes
+        for artist in ax.get_children()
+        if is_heavy(artist) and not artist.get_rasterized()
+    ]
+
+    for artist in artists:
+        artist.set_rasterized(True)
+
+    try:
+        yield artists
+
+    finally:
+        for artist in artists:
+            artist.set_rasterized(False)
+
+
+def savefig(fname, fig=None, dpi=RASTER_DPI, **kwargs):
+    """
+    As `plt.savefig`, with the heavy artists of the figure rasterized at
+    `dpi`.
+
+    Parameters
+    ----------
+    fname : str or file-like
+        Where to save the figure.
+    fig : matplotlib.figure.Figure, optional
+        The figure to save, by default the current figure.
+    dpi : float, optional
+        Resolution of the rasterized artists.
+    **kwargs
+        Passed to `Figure.savefig`.
+    """
+    if fig is None:
+        fig = plt.gcf()
+
+    with heavy_artists_rasterized(fig):
+        fig.savefig(fname, dpi=dpi, **kwargs)
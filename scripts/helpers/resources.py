@@ -0,0 +1,62 @@
+"""
+Cached loaders for the resources shared between figure scripts.
+
+When each script runs in its own interpreter these are simply the usual
+loaders. When several scripts are run in the same process (see
+./scripts/render_all.py), each resource is loaded once and shared.
+
+Loaders of tables which scripts modify (e.g. by adding columns) return a copy
+of the cached table, so one script can't affect another.
+"""
+
+import functools
+
+from . import intervals, mission
+
+
+@functools.cache
+def _full_mission(path, columns):
+    return mission.load_mission(path, list(columns))
+
+
+def full_mission(path=mission.DEFAULT_MISSION_PATH, columns=mission.TRAJECTORY_COLUMNS):
+    """
+    The full mission dataset (see `mission.load_mission`). The arrays are
+    read-only, so the cached DataFrame is returned directly.
+    """
+    return _full_mission(path, tuple(columns))
+
+
+@functools.cache
+def _crossing_intervals(name, kwargs):
+    from hermpy import boundaries, utils
+
+    return boundaries.Load_Crossings(utils.User.CROSSING_LISTS[name], **dict(kwargs))
+
+
+def crossing_intervals(name="Philpott", **kwargs):
+    """
+    A copy of a crossing interval list, loaded with
+    `boundaries.Load_Crossings(utils.User.CROSSING_LISTS[name], **kwargs)`
+    """
+    return _crossing_intervals(name, tuple(sorted(kwargs.items()))).copy()
+
+
+@functools.cache
+def _crossing_interval_index(name, kwargs):
+    return intervals.IntervalIndex(_crossing_intervals(name, kwargs))
+
+
+def crossing_interval_index(name="Philpott", **kwargs):
+    """
+    An `intervals.IntervalIndex` over a crossing interval list, as loaded by
+    `crossing_intervals`. Query results are copies, which scripts may modify.
+    """
+    return _crossing_interval_index(name, tuple(sorted(kwargs.items())))
+
+
+def clear():
+    """Drop all cached resources."""
+    _full_mission.cache_clear()
+    _crossing_intervals.cache_clear()
+    _crossing_interval_index.cache_clear()
@@ -0,0 +1,38 @@
+"""
+Run figure scripts within the current python process.
+
+Modules imported by one script (matplotlib, hermpy, ...) and resources cached
+in `helpers.resources` are then reused by the next, rather than being
+imported and loaded again in a fresh interpreter.
+"""
+
+import runpy
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from . import synthetic, timing
+
+
+def run_figure(script_path):
+    """
+    Run a figure script as if it were `python script_path`.
+
+    Changes a script makes to matplotlib's rcParams are undone afterwards,
+    and any figures it leaves open are closed.
+
+    With FIGURE_TIMING set, the time spent in each stage of the script is
+    recorded (see timing.py).
+
+    If the current directory holds synthetic resources (see
+    generate_synthetic_resources.py), hermpy is pointed at them first.
+    """
+    if synthetic.is_synthetic():
+        synthetic.use_synthetic_resources()
+
+    with matplotlib.rc_context(), timing.timed(script_path):
+        try:
+            runpy.run_path(str(script_path), run_name="__main__")
+
+        finally:
+            plt.close("all")
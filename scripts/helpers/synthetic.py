@@ -0,0 +1,1009 @@
+"""
+Synthetic versions of the resource files, for building and benchmarking the
+figures offline (see ./scripts/generate_synthetic_resources.py).
+
+The synthetic mission follows MESSENGER's orbit geometry: a near-polar
+(82.5 deg), highly eccentric orbit with periapsis at high northern latitudes,
+a 12 hour period until April 2012 and 8 hours after, whose plane sweeps
+through all local times once per Mercury year. Positions are in MSM'
+coordinates, with the dipole offset 0.196 radii north.
+
+The spacecraft's region (solar wind, magnetosheath, or magnetosphere) is
+found from the Winslow et al. (2013) bow shock and magnetopause models,
+scaled in time to mimic changing solar wind pressure. Each boundary pass is
+then a crossing interval (as in the Philpott list), containing one or more
+individual crossings (as in the Hollman list), and the magnetic field follows
+the region: a draped IMF in the solar wind, a compressed and turbulent field
+in the magnetosheath, and the offset dipole in the magnetosphere.
+
+Scales are relative to the length of the orbital phase of the mission
+(`mag_store.MISSION_START` to `mag_store.MISSION_END`), starting from the same
+date. Beyond 1x, the mission extends past the real one, and so past the
+precomputed heliocentric distance table.
+
+Resources are written with the same file names and columns as the real ones,
+except for hermpy's own data:
+- The crossing lists are written already parsed, as CSVs of the intervals
+  (./resources/synthetic/crossing_lists/), and loaded in place of
+  `boundaries.Load_Crossings` by `use_synthetic_resources`.
+- The 20 Hz MAG data is written directly as the chunked store (see
+  mag_store.py), only around the windows shown in the figures, and a number
+  of other crossing groups, rather than as raw MAG files.
+- The full mission is written directly as the column store (see mission.py)
+  unless a pickle is requested, as a pickle needs the whole mission in memory.
+"""
+
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from . import column_store, heliocentric, mag_store, mission, model_output_store
+
+SYNTHETIC_PATH = "./resources/synthetic"
+MANIFEST_NAME = "manifest.json"
+CROSSING_LIST_NAMES = ["Philpott", "Sun"]
+
+# Bump if the generated resources change
+GENERATOR_VERSION = 1
+
+# Region codes
+SOLAR_WIND, MAGNETOSHEATH, MAGNETOSPHERE = 0, 1, 2
+REGION_NAMES = ["Solar Wind", "Magnetosheath", "Magnetosphere"]
+
+# Crossing interval types of each (region before, region after)
+TRANSITION_TYPES = {
+    (SOLAR_WIND, MAGNETOSHEATH): "BS_IN",
+    (MAGNETOSHEATH, SOLAR_WIND): "BS_OUT",
+    (MAGNETOSHEATH, MAGNETOSPHERE): "MP_IN",
+    (MAGNETOSPHERE, MAGNETOSHEATH): "MP_OUT",
+}
+REVERSED_TYPES = {
+    "BS_IN": "BS_OUT",
+    "BS_OUT": "BS_IN",
+    "MP_IN": "MP_OUT",
+    "MP_OUT": "MP_IN",
+}
+
+# Orbit
+MERCURY_RADIUS = 2440.0  # km
+MERCURY_GM = 22032.0  # km^3 / s^2
+MERCURY_YEAR = 87.969 * 86400  # s
+ORBIT_PERIOD_CHANGE = np.datetime64("2012-04-20", "ns")
+ORBIT_PERIODS = (12 * 3600, 8 * 3600)  # s, before and after the change
+INCLINATION = np.radians(82.5)
+PERIAPSIS_ARGUMENT = np.radians(66)  # Periapsis at ~60 deg N
+DIPOLE_OFFSET = 0.196  # radii
+
+# Mercury's heliocentric orbit, for the heliocentric distance table
+MERCURY_SEMI_MAJOR_AXIS = 57.909e6  # km
+MERCURY_ECCENTRICITY = 0.2056
+PERIHELION_TIME = np.datetime64("2011-03-09", "ns")
+
+# Boundary models (Winslow et al., 2013), in radii
+MAGNETOPAUSE_STANDOFF = 1.45
+MAGNETOPAUSE_FLARING = 0.5
+BOW_SHOCK_FOCUS = 0.5
+BOW_SHOCK_SEMI_LATUS_RECTUM = 2.75
+BOW_SHOCK_ECCENTRICITY = 1.04
+
+# Median half-width of the crossing intervals either side of each crossing
+INTERVAL_HALF_WIDTHS = {"BS": 100.0, "MP": 45.0}  # s
+
+# One data gap of 1 to 12 hours every DATA_GAP_SPACING days, on average
+DATA_GAP_SPACING = 30
+DATA_GAP_DURATIONS = (3600, 12 * 3600)  # s
+
+# Cadence at which regions are found to locate crossings
+REGION_CADENCE = np.timedelta64(10, "s")
+
+# The model output is only around the crossing intervals
+MODEL_OUTPUT_CADENCE = np.timedelta64(1, "s")
+MODEL_OUTPUT_BUFFER = np.timedelta64(30, "m")
+
+# 20 Hz MAG data is written around the crossings in these windows
+MAG_CADENCE = np.timedelta64(50, "ms")
+MAG_WINDOW_BUFFER = np.timedelta64(30, "m")
+
+# Windows of 20 Hz MAG data shown by the figure scripts: fixed windows
+# (fig02), rows of the Philpott list (fig03, fig05), and crossing groups and
+# rows of the Philpott list with data gaps (fig08, fig09, fig10). Those beyond
+# the synthetic lists are skipped.
+FIGURE_MAG_WINDOWS = [
+    (np.datetime64("2012-07-02T17:25"), np.datetime64("2012-07-02T17:40")),
+    (np.datetime64("2013-04-28T16:50"), np.datetime64("2013-04-28T17:06")),
+]
+FIGURE_PHILPOTT_ROWS = [10461, 7875]
+FIGURE_BOW_SHOCK_ROWS = [1000]
+FIGURE_GROUPS = [43, 54]
+FIGURE_GROUP_ROWS = [15916]
+
+MODEL_OUTPUT_ROWS_PER_WRITE = 2_000_000
+
+# Random forest features
+NUMBER_OF_MODELS = 10
+EPHEMERIS_FEATURES = [
+    "Heliocentric Distance (AU)",
+    "Local Time (hrs)",
+    "Latitude (deg.)",
+    "Magnetic Latitude (deg.)",
+    "X MSM' (radii)",
+    "Y MSM' (radii)",
+    "Z MSM' (radii)",
+]
+FIELD_FEATURES = [
+    f"{statistic} {component}"
+    for component in ["|B|", "Bx", "By", "Bz"]
+    for statistic in ["Mean", "Median", "Standard Deviation", "Skew", "Kurtosis"]
+]
+
+
+def mission_span(scale):
+    """Start and end of a synthetic mission `scale` times the real length."""
+    start = np.datetime64(mag_store.MISSION_START, "ns")
+    length = np.datetime64(mag_store.MISSION_END, "ns") - start
+
+    return start, start + (length * scale).astype("timedelta64[s]")
+
+
+def positions_at(seconds):
+    """
+    MESSENGER's synthetic MSM' position (radii) at each time, given as seconds
+    since the start of the mission.
+    """
+    switch = float(
+        (ORBIT_PERIOD_CHANGE - np.datetime64(mag_store.MISSION_START, "ns"))
+        / np.timedelta64(1, "s")
+    )
+    before_switch = seconds < switch
+
+    orbits = np.where(
+        before_switch,
+        seconds / ORBIT_PERIODS[0],
+        switch / ORBIT_PERIODS[0] + (seconds - switch) / ORBIT_PERIODS[1],
+    )
+    period = np.where(before_switch, *ORBIT_PERIODS)
+
+    semi_major_axis = (MERCURY_GM * (period / (2 * np.pi)) ** 2) ** (1 / 3)
+    semi_major_axis /= MERCURY_RADIUS
+
+    periapsis = 1.12 + 0.06 * np.sin(2 * np.pi * seconds / MERCURY_YEAR)
+    eccentricity = 1 - periapsis / semi_major_axis
+
+    # Solve Kepler's equation for the eccentric anomaly
+    mean_anomaly = 2 * np.pi * (orbits % 1)
+    eccentric_anomaly = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+    for _ in range(10):
+        eccentric_anomaly -= (
+            eccentric_anomaly - eccentricity * np.sin(eccentric_anomaly) - mean_anomaly
+        ) / (1 - eccentricity * np.cos(eccentric_anomaly))
+
+    radius = semi_major_axis * (1 - eccentricity * np.cos(eccentric_anomaly))
+    true_anomaly = 2 * np.arctan2(
+        np.sqrt(1 + eccentricity) * np.sin(eccentric_anomaly / 2),
+        np.sqrt(1 - eccentricity) * np.cos(eccentric_anomaly / 2),
+    )
+    argument_of_latitude = true_anomaly + PERIAPSIS_ARGUMENT
+
+    # The orbit plane is fixed in inertial space, so turns once per Mercury
+    # year in the Sun-fixed frame
+    plane_angle = -2 * np.pi * seconds / MERCURY_YEAR
+
+    in_plane_x = radius * np.cos(argument_of_latitude)
+    in_plane_y = radius * np.sin(argument_of_latitude)
+
+    x = in_plane_x * np.cos(plane_angle) - in_plane_y * np.cos(INCLINATION) * np.sin(
+        plane_angle
+    )
+    y = in_plane_x * np.sin(plane_angle) + in_plane_y * np.cos(INCLINATION) * np.cos(
+        plane_angle
+    )
+    z = in_plane_y * np.sin(INCLINATION) - DIPOLE_OFFSET
+
+    return x, y, z
+
+
+def boundary_scale(seconds, phases):
+    """The size of the magnetosphere relative to the average, over time."""
+    return (
+        1
+        + 0.05 * np.sin(2 * np.pi * seconds / (3.1 * 3600) + phases[0])
+        + 0.04 * np.sin(2 * np.pi * seconds / (19 * 3600) + phases[1])
+        + 0.03 * np.sin(2 * np.pi * seconds / (4.3 * 86400) + phases[2])
+    )
+
+
+def regions_at(x, y, z, scale):
+    """The region of each MSM' position, given the boundary scale."""
+    rho = np.sqrt(y**2 + z**2)
+
+    radius = np.sqrt(x**2 + rho**2)
+    magnetopause = (
+        scale
+        * MAGNETOPAUSE_STANDOFF
+        * (2 / (1 + x / np.maximum(radius, 1e-9))) ** MAGNETOPAUSE_FLARING
+    )
+
+    shock_x = x - BOW_SHOCK_FOCUS
+    shock_radius = np.sqrt(shock_x**2 + rho**2)
+    denominator = 1 + BOW_SHOCK_ECCENTRICITY * shock_x / np.maximum(shock_radius, 1e-9)
+    inside_bow_shock = (denominator <= 0) | (
+        shock_radius * denominator
+        < scale * BOW_SHOCK_SEMI_LATUS_RECTUM * BOW_SHOCK_ECCENTRICITY
+    )
+
+    regions = np.full(len(x), SOLAR_WIND, dtype=np.int8)
+    regions[inside_bow_shock] = MAGNETOSHEATH
+    regions[radius < magnetopause] = MAGNETOSPHERE
+
+    return regions
+
+
+def magnetic_field(seconds, x, y, z, regions, rng):
+    """The synthetic magnetic field (nT) in each region, with noise."""
+    # A slowly rotating Parker spiral IMF
+    strength = 20 + 5 * np.sin(2 * np.pi * seconds / (2.1 * 86400))
+    angle = 3 * np.pi / 4 + 0.5 * np.sin(2 * np.pi * seconds / (29 * 3600))
+    imf = np.stack(
+        [
+            strength * np.cos(angle),
+            strength * np.sin(angle),
+            5 * np.sin(2 * np.pi * seconds / (7.3 * 3600)),
+        ]
+    )
+
+    # Offset dipole, with Mercury's equatorial surface field of ~190 nT
+    radius = np.sqrt(x**2 + y**2 + z**2)
+    unit_z = z / radius
+    dipole = (
+        190
+        / radius**3
+        * np.stack(
+            [3 * unit_z * x / radius, 3 * unit_z * y / radius, 3 * unit_z**2 - 1]
+        )
+    )
+
+    noise = {SOLAR_WIND: 1.0, MAGNETOSHEATH: 12.0, MAGNETOSPHERE: 2.0}
+    field = np.select(
+        [regions == SOLAR_WIND, regions == MAGNETOSHEATH],
+        [imf, 3 * imf],
+        dipole,
+    )
+    field += rng.normal(size=field.shape) * np.select(
+        [regions == region for region in noise], list(noise.values())
+    )
+
+    return field
+
+
+def day_starts(start, end):
+    return np.arange(start.astype("datetime64[D]"), end, np.timedelta64(1, "D")).astype(
+        "datetime64[ns]"
+    )
+
+
+def seconds_since_start(times):
+    return (times - np.datetime64(mag_store.MISSION_START, "ns")) / np.timedelta64(
+        1, "s"
+    )
+
+
+def data_gaps(start, end, rng):
+    """Start and end times of data gaps, sorted and not overlapping."""
+    days = (end - start) / np.timedelta64(1, "D")
+    number_of_gaps = rng.poisson(days / DATA_GAP_SPACING)
+
+    seconds = (end - start) / np.timedelta64(1, "s")
+    gap_starts = np.sort(
+        start + (rng.uniform(0, seconds, number_of_gaps)).astype("timedelta64[s]")
+    )
+    gap_ends = gap_starts + rng.uniform(*DATA_GAP_DURATIONS, number_of_gaps).astype(
+        "timedelta64[s]"
+    )
+
+    # Drop gaps starting within the previous one
+    keep = np.ones(number_of_gaps, dtype=bool)
+    keep[1:] = gap_starts[1:] > np.maximum.accumulate(gap_ends)[:-1]
+
+    return gap_starts[keep], np.minimum(gap_ends[keep], end)
+
+
+def outside_gaps(times, gaps):
+    gap_starts, gap_ends = gaps
+    if len(gap_starts) == 0:
+        return np.ones(len(times), dtype=bool)
+
+    gap = np.searchsorted(gap_starts, times, side="right") - 1
+
+    return (gap < 0) | (times >= gap_ends[np.maximum(gap, 0)])
+
+
+def overlaps_gap(start, end, gaps):
+    gap_starts, gap_ends = gaps
+    gap = np.searchsorted(gap_starts, end) - 1
+
+    return gap >= 0 and gap_ends[gap] > start
+
+
+def find_transitions(start, end, phases):
+    """
+    Times of each change in region, sampled every REGION_CADENCE, with the
+    regions before and after, and the region at the start.
+    """
+    times, before, after = [], [], []
+    previous_region = None
+
+    for day in day_starts(start, end):
+        sample_times = np.arange(
+            max(day, start), min(day + np.timedelta64(1, "D"), end), REGION_CADENCE
+        )
+        seconds = seconds_since_start(sample_times)
+        regions = regions_at(*positions_at(seconds), boundary_scale(seconds, phases))
+
+        if previous_region is None:
+            previous_region = first_region = regions[0]
+
+        regions = np.concatenate(([previous_region], regions))
+        changes = np.flatnonzero(regions[1:] != regions[:-1])
+
+        times.append(sample_times[changes])
+        before.append(regions[changes])
+        after.append(regions[changes + 1])
+
+        previous_region = regions[-1]
+
+    return (
+        np.concatenate(times),
+        np.concatenate(before),
+        np.concatenate(after),
+        first_region,
+    )
+
+
+def crossing_lists(transitions, gaps, rng):
+    """
+    Build the crossing intervals, the individual crossings within them, and
+    the timeline of regions they imply.
+
+    Returns
+    -------
+    intervals : pandas.DataFrame
+        "Start Time", "End Time", and "Type" of each interval, and of each
+        data gap ("DATA_GAP").
+    crossings : pandas.DataFrame
+        "Times" and "Label" of each individual crossing.
+    timeline : tuple[numpy.ndarray, numpy.ndarray]
+        Times at which the region changes, and the region after each.
+    """
+    times, before, after, first_region = transitions
+
+    # Limit each interval to less than half the time to the next crossing on
+    # either side, so intervals don't overlap
+    spacing = np.diff(times).astype(np.float64) / 1e9
+    room_before = np.concatenate(([np.inf], spacing)) * 0.45
+    room_after = np.concatenate((spacing, [np.inf])) * 0.45
+
+    interval_rows = []
+    crossing_times, crossing_labels = [], []
+    timeline_times, timeline_regions = [], []
+
+    for time, region_before, region_after, limit_before, limit_after in zip(
+        times, before, after, room_before, room_after
+    ):
+        interval_type = TRANSITION_TYPES.get((region_before, region_after))
+
+        if interval_type is None:
+            # Straight from the solar wind into the magnetosphere, or back.
+            # Not a crossing of either boundary alone, so only kept in the
+            # timeline.
+            timeline_times.append(time)
+            timeline_regions.append(region_after)
+            continue
+
+        half_width = INTERVAL_HALF_WIDTHS[interval_type[:2]]
+        widths = np.minimum(
+            rng.lognormal(np.log(half_width), 0.6, 2), [limit_before, limit_after]
+        )
+        # Interval edges are to the second, as in the lists
+        interval_start = time - np.timedelta64(int(widths[0]), "s")
+        interval_end = time + np.timedelta64(int(widths[1]) + 1, "s")
+
+        # An odd number of crossings within the interval, alternating
+        # direction
+        number_of_crossings = rng.choice([1, 3, 5], p=[0.6, 0.3, 0.1])
+        offsets = np.sort(rng.uniform(0, 1, number_of_crossings))
+        individual_times = interval_start + (
+            offsets * ((interval_end - interval_start) / np.timedelta64(1, "ms"))
+        ).astype("timedelta64[ms]")
+
+        for i, individual_time in enumerate(individual_times):
+            timeline_times.append(individual_time)
+            timeline_regions.append(region_after if i % 2 == 0 else region_before)
+
+        # Crossings are only identified where there is data
+        if not overlaps_gap(interval_start, interval_end, gaps):
+            interval_rows.append((interval_start, interval_end, interval_type))
+
+            for i, individual_time in enumerate(individual_times):
+                crossing_times.append(individual_time)
+                crossing_labels.append(
+                    interval_type if i % 2 == 0 else REVERSED_TYPES[interval_type]
+                )
+
+    gap_starts, gap_ends = gaps
+    intervals = pd.DataFrame(
+        interval_rows + [(s, e, "DATA_GAP") for s, e in zip(gap_starts, gap_ends)],
+        columns=["Start Time", "End Time", "Type"],
+    )
+    intervals = intervals.sort_values("Start Time", ignore_index=True)
+
+    crossings = pd.DataFrame({"Times": crossing_times, "Label": crossing_labels})
+
+    timeline = (
+        np.concatenate(([np.datetime64(0, "ns")], timeline_times)).astype(
+            "datetime64[ns]"
+        ),
+        np.concatenate(([first_region], timeline_regions)).astype(np.int8),
+    )
+
+    return intervals, crossings, timeline
+
+
+def regions_from_timeline(times, timeline):
+    timeline_times, timeline_regions = timeline
+    return timeline_regions[np.searchsorted(timeline_times, times, side="right") - 1]
+
+
+def field_table(times, timeline, rng):
+    """A MAG DataFrame, with the columns of the full mission, at `times`."""
+    seconds = seconds_since_start(times)
+    x, y, z = positions_at(seconds)
+    bx, by, bz = magnetic_field(
+        seconds, x, y, z, regions_from_timeline(times, timeline), rng
+    )
+
+    return pd.DataFrame(
+        {
+            "date": times,
+            "|B|": np.sqrt(bx**2 + by**2 + bz**2),
+            "Bx": bx,
+            "By": by,
+            "Bz": bz,
+            mission.POSITION_COLUMNS[0]: x,
+            mission.POSITION_COLUMNS[1]: y,
+            mission.POSITION_COLUMNS[2]: z,
+        }
+    )
+
+
+def merge_windows(starts, ends):
+    """Sort windows, and merge any which overlap."""
+    order = np.argsort(starts)
+    starts, ends = starts[order], ends[order]
+
+    merged = []
+    for start, end in zip(starts, ends):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    return merged
+
+
+def write_mission(root, span, gaps, timeline, seed, write_pickle=False):
+    """Write the 1 second full mission, as a column store or pickle."""
+    pickle_path = os.path.join(root, mission.DEFAULT_MISSION_PATH)
+    store_path = mission.store_path_for(pickle_path)
+
+    days = []
+    writer = None if write_pickle else column_store.ColumnWriter(store_path)
+
+    for day_number, day in enumerate(day_starts(*span)):
+        times = np.arange(
+            max(day, span[0]),
+            min(day + np.timedelta64(1, "D"), span[1]),
+            np.timedelta64(1, "s"),
+        )
+        times = times[outside_gaps(times, gaps)]
+
+        if len(times) == 0:
+            continue
+
+        day_data = field_table(
+            times, timeline, np.random.default_rng([seed, day_number, 1])
+        )
+
+        if write_pickle:
+            days.append(day_data)
+        else:
+            writer.append(day_data)
+
+    if write_pickle:
+        pd.concat(days, ignore_index=True).to_pickle(pickle_path)
+        return
+
+    # There is no pickle for the store to be converted from, so describe the
+    # generated data instead
+    writer.close(
+        metadata={
+            "source": {
+                "path": pickle_path,
+                "hash": f"synthetic-{GENERATOR_VERSION}-{seed}-{span[1]}",
+                "size": 0,
+                "mtime_ns": 0,
+            }
+        }
+    )
+
+
+def write_mag_store(root, span, gaps, timeline, windows, seed):
+    """Write the chunked 20 Hz MAG store, covering only `windows`."""
+    store_path = os.path.join(root, mag_store.DEFAULT_STORE_PATH)
+    writer = column_store.ColumnWriter(store_path)
+
+    for window_number, (start, end) in enumerate(windows):
+        times = np.arange(start, end, MAG_CADENCE)
+        times = times[outside_gaps(times, gaps)]
+
+        if len(times) > 0:
+            writer.append(
+                field_table(
+                    times, timeline, np.random.default_rng([seed, window_number, 2])
+                )
+            )
+
+    writer.close(
+        metadata={
+            "build_kwargs": mag_store.BUILD_KWARGS,
+            "start": pd.Timestamp(span[0]).isoformat(),
+            "end": pd.Timestamp(span[1]).isoformat(),
+        }
+    )
+    mag_store.write_chunk_index(store_path)
+
+
+def figure_mag_windows(intervals):
+    """The windows of 20 Hz MAG data shown by the figure scripts."""
+    from . import grouping
+
+    windows = list(FIGURE_MAG_WINDOWS)
+
+    without_gaps = intervals.loc[intervals["Type"] != "DATA_GAP"].reset_index(drop=True)
+    bow_shocks = without_gaps.loc[without_gaps["Type"].str.contains("BS")]
+
+    rows = [
+        without_gaps.iloc[row]
+        for row in FIGURE_PHILPOTT_ROWS
+        if row < len(without_gaps)
+    ]
+    rows += [
+        bow_shocks.iloc[row] for row in FIGURE_BOW_SHOCK_ROWS if row < len(bow_shocks)
+    ]
+
+    groups = grouping.crossing_groups(intervals)
+    group_numbers = [group for group in FIGURE_GROUPS if group < len(groups)]
+    group_numbers += [
+        np.flatnonzero((groups == row).any(axis=1))[0]
+        for row in FIGURE_GROUP_ROWS
+        if row in groups
+    ]
+    for group in group_numbers:
+        rows += [intervals.iloc[row] for row in groups[group] if row >= 0]
+
+    windows += [(row["Start Time"], row["End Time"]) for row in rows]
+
+    return windows, groups
+
+
+def write_model_output(root, intervals, gaps, timeline, seed):
+    """
+    Write the model's region probabilities, every second around each crossing
+    interval.
+    """
+    path = os.path.join(root, model_output_store.DEFAULT_MODEL_OUTPUT_PATH)
+    crossing_intervals = intervals.loc[intervals["Type"] != "DATA_GAP"]
+
+    windows = merge_windows(
+        crossing_intervals["Start Time"].to_numpy() - MODEL_OUTPUT_BUFFER,
+        crossing_intervals["End Time"].to_numpy() + MODEL_OUTPUT_BUFFER,
+    )
+
+    pending, pending_rows = [], 0
+    header = True
+
+    for window_number, (start, end) in enumerate(windows):
+        rng = np.random.default_rng([seed, window_number, 3])
+
+        times = np.arange(start, end, MODEL_OUTPUT_CADENCE).astype("datetime64[ns]")
+        times = times[outside_gaps(times, gaps)]
+        regions = regions_from_timeline(times, timeline)
+
+        # Noisy logits favouring the true region, smoothed over ~10 seconds
+        logits = 3.0 * (regions[:, np.newaxis] == np.arange(3))
+        noise = rng.normal(scale=1.5, size=logits.shape)
+        kernel = np.ones(10) / 10
+        logits += np.column_stack(
+            [np.convolve(noise[:, i], kernel, mode="same") for i in range(3)]
+        )
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        pending.append(
+            pd.DataFrame(
+                {
+                    "Time": times,
+                    "P(SW)": probabilities[:, SOLAR_WIND],
+                    "P(MSh)": probabilities[:, MAGNETOSHEATH],
+                    "P(MSp)": probabilities[:, MAGNETOSPHERE],
+                }
+            )
+        )
+        pending_rows += len(times)
+
+        if (
+            pending_rows >= MODEL_OUTPUT_ROWS_PER_WRITE
+            or window_number == len(windows) - 1
+        ):
+            pd.concat(pending).to_csv(
+                path, mode="w" if header else "a", header=header, index=False
+            )
+            pending, pending_rows, header = [], 0, False
+
+    if header:
+        # No windows, write an empty table
+        pd.DataFrame(columns=["Time", "P(SW)", "P(MSh)", "P(MSp)"]).to_csv(
+            path, index=False
+        )
+
+
+def new_crossing_list(crossings, rng):
+    """
+    The crossings found from the model output: the individual crossings with
+    some error in time, and some spurious crossings into an unknown region.
+    """
+    times = crossings["Times"].to_numpy() + rng.normal(
+        scale=10e3, size=len(crossings)
+    ).astype("timedelta64[ms]")
+    transitions = crossings["Label"].to_numpy()
+
+    # Crossings into and out of an unknown region, after 2% of crossings
+    spurious = np.flatnonzero(rng.uniform(size=len(crossings)) < 0.02)
+    region_after = {"BS_IN": "MSh", "BS_OUT": "SW", "MP_IN": "MSp", "MP_OUT": "MSh"}
+
+    spurious_times, spurious_transitions = [], []
+    for row in spurious:
+        region = region_after[transitions[row]]
+        time = times[row] + np.timedelta64(int(rng.uniform(30, 120)), "s")
+
+        spurious_times += [time, time + np.timedelta64(int(rng.uniform(10, 60)), "s")]
+        spurious_transitions += [f"UKN ({region} -> UKN)", f"UKN (UKN -> {region})"]
+
+    new_crossings = pd.DataFrame(
+        {
+            "Time": np.concatenate(
+                (times, np.array(spurious_times, dtype=times.dtype))
+            ),
+            "Transition": np.concatenate((transitions, spurious_transitions)),
+        }
+    )
+
+    return new_crossings.sort_values("Time", ignore_index=True)
+
+
+def new_region_list(new_crossings, rng):
+    """The regions between each new crossing, with the model's confidence."""
+    names = {
+        "SW": "Solar Wind",
+        "MSh": "Magnetosheath",
+        "MSp": "Magnetosphere",
+        "UKN": "Unknown",
+    }
+    region_after = {"BS_IN": "MSh", "BS_OUT": "SW", "MP_IN": "MSp", "MP_OUT": "MSh"}
+
+    transitions = new_crossings["Transition"].to_numpy()[:-1]
+    labels = [
+        names[
+            region_after.get(transition, transition.split("-> ")[-1].removesuffix(")"))
+        ]
+        for transition in transitions
+    ]
+
+    starts = new_crossings["Time"].to_numpy()[:-1]
+    ends = new_crossings["Time"].to_numpy()[1:]
+    durations = (ends - starts) / np.timedelta64(1, "s")
+
+    # Confidence rises with region duration
+    confidence = np.clip(
+        1
+        - 0.5 * np.exp(-np.maximum(durations, 0) / 120)
+        + rng.normal(scale=0.03, size=len(durations)),
+        0,
+        1,
+    )
+    confidence[np.array(labels) == "Unknown"] = np.nan
+
+    return pd.DataFrame(
+        {
+            "Start Time": starts,
+            "End Time": ends,
+            "Duration (seconds)": durations,
+            "Label": labels,
+            "Confidence": confidence,
+        }
+    )
+
+
+def write_models(root, rng):
+    """
+    Write the pickled random forest models, and their testing accuracies and
+    confusion matrices, with and without the ephemeris features.
+    """
+    for suffix, features in [
+        ("", FIELD_FEATURES + EPHEMERIS_FEATURES),
+        ("_without_ephemeris", FIELD_FEATURES),
+    ]:
+        models = [fit_model(features, rng) for _ in range(NUMBER_OF_MODELS)]
+
+        # Confusion matrices of ~1000 testing samples of each region, ordered
+        # as the labels of fig07
+        confusion_matrices = []
+        for _ in range(NUMBER_OF_MODELS):
+            matrix = np.zeros((3, 3), dtype=np.int64)
+            for true_label in range(3):
+                errors = rng.dirichlet([1, 1]) * rng.uniform(0.02, 0.08)
+                probabilities = np.insert(errors, true_label, 1 - errors.sum())
+                matrix[true_label] = rng.multinomial(1000, probabilities)
+            confusion_matrices.append(matrix)
+
+        accuracies = [np.trace(m) / m.sum() for m in confusion_matrices]
+
+        for name, value in [
+            ("models", models),
+            ("testing_accuracies", accuracies),
+            ("testing_confusion_matrices", confusion_matrices),
+        ]:
+            with open(os.path.join(root, "resources", name + suffix), "wb") as file:
+                pickle.dump(value, file)
+
+
+class SyntheticModel:
+    """
+    Stands in for a fitted random forest when scikit-learn isn't installed,
+    with the attributes the figures use.
+    """
+
+    def __init__(self, feature_names, feature_importances):
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.feature_importances_ = feature_importances
+
+
+def fit_model(features, rng):
+    """A small random forest fit to synthetic features of each region."""
+    importances = rng.dirichlet(np.ones(len(features)))
+
+    try:
+        from sklearn.ensemble import RandomForestClassifier
+
+    except ImportError:
+        return SyntheticModel(features, importances)
+
+    labels = rng.integers(0, 3, 600)
+    samples = pd.DataFrame(
+        rng.normal(size=(len(labels), len(features)))
+        + labels[:, np.newaxis] * importances * len(features),
+        columns=features,
+    )
+
+    return RandomForestClassifier(
+        n_estimators=10, max_depth=4, random_state=int(rng.integers(2**31))
+    ).fit(samples, np.array(REGION_NAMES)[labels])
+
+
+def write_heliocentric_table(root):
+    """
+    Write the heliocentric distance table (see heliocentric.py) from a
+    Keplerian orbit of Mercury, rather than SPICE.
+    """
+    times = pd.date_range(
+        heliocentric.TABLE_START,
+        heliocentric.TABLE_END,
+        freq=heliocentric.TABLE_CADENCE,
+    ).as_unit("ns")
+
+    def distance(times):
+        mean_anomaly = (
+            2
+            * np.pi
+            * ((times.to_numpy() - PERIHELION_TIME) / np.timedelta64(1, "s"))
+            / MERCURY_YEAR
+        )
+        eccentric_anomaly = mean_anomaly.copy()
+        for _ in range(10):
+            eccentric_anomaly -= (
+                eccentric_anomaly
+                - MERCURY_ECCENTRICITY * np.sin(eccentric_anomaly)
+                - mean_anomaly
+            ) / (1 - MERCURY_ECCENTRICITY * np.cos(eccentric_anomaly))
+
+        return MERCURY_SEMI_MAJOR_AXIS * (
+            1 - MERCURY_ECCENTRICITY * np.cos(eccentric_anomaly)
+        )
+
+    distances = distance(times)
+    midpoint_distances = distance(
+        times[:-1] + pd.Timedelta(heliocentric.TABLE_CADENCE) / 2
+    )
+    maximum_error = np.max(
+        np.abs((distances[:-1] + distances[1:]) / 2 - midpoint_distances)
+    )
+
+    column_store.write_columns(
+        pd.DataFrame({"date": times, "distance": distances}),
+        os.path.join(root, heliocentric.TABLE_PATH),
+        metadata={
+            **heliocentric.table_metadata(),
+            "maximum_error_km": float(maximum_error),
+        },
+    )
+
+
+def crossing_list_path(name, root="."):
+    return os.path.join(root, SYNTHETIC_PATH, "crossing_lists", f"{name}.csv")
+
+
+def generate_resources(
+    root, scale=1.0, seed=0, mag_windows=100, write_pickle=False, verbose=False
+):
+    """
+    Generate a full set of synthetic resources in `root`/resources/.
+
+    Parameters
+    ----------
+    root : str
+        Directory to create ./resources/ and ./figures/ in.
+    scale : float, optional
+        Length of the mission, relative to the real one.
+    seed : int, optional
+        Seed of the random numbers, so the resources are reproducible.
+    mag_windows : int, optional
+        Number of crossing groups, as well as those shown in the figures, to
+        write 20 Hz MAG data around.
+    write_pickle : bool, optional
+        Write the full mission as a pickle (`messenger_mag`), rather than
+        directly as the column store. This holds the whole mission in memory.
+    verbose : bool, optional
+        Print each step.
+    """
+
+    def log(message):
+        if verbose:
+            print(message)
+
+    os.makedirs(os.path.join(root, SYNTHETIC_PATH, "crossing_lists"), exist_ok=True)
+    os.makedirs(os.path.join(root, "figures"), exist_ok=True)
+
+    rng = np.random.default_rng([seed, 0])
+    span = mission_span(scale)
+    phases = rng.uniform(0, 2 * np.pi, 3)
+
+    log(
+        f"Finding crossings between {pd.Timestamp(span[0]):%Y-%m-%d} "
+        f"and {pd.Timestamp(span[1]):%Y-%m-%d}"
+    )
+    gaps = data_gaps(*span, rng)
+    intervals, crossings, timeline = crossing_lists(
+        find_transitions(*span, phases), gaps, rng
+    )
+
+    log("Writing crossing lists")
+    intervals.to_csv(crossing_list_path("Philpott", root), index=False)
+
+    # The Sun list disagrees with the Philpott list on each interval's extent
+    sun_intervals = intervals.copy()
+    is_crossing = sun_intervals["Type"] != "DATA_GAP"
+    for column in ["Start Time", "End Time"]:
+        sun_intervals.loc[is_crossing, column] += pd.to_timedelta(
+            rng.normal(scale=30, size=is_crossing.sum()).round(), unit="s"
+        )
+    sun_intervals["End Time"] = sun_intervals[["Start Time", "End Time"]].max(axis=1)
+    sun_intervals.to_csv(crossing_list_path("Sun", root), index=False)
+
+    crossings.to_csv(
+        os.path.join(root, "resources", "hollman_2025_crossing_list.csv"), index=False
+    )
+
+    new_crossings = new_crossing_list(crossings, rng)
+    new_crossings.to_csv(
+        os.path.join(root, "resources", "new_crossings.csv"), index=False
+    )
+    new_region_list(new_crossings, rng).to_csv(
+        os.path.join(root, "resources", "new_regions.csv"), index=False
+    )
+
+    log("Writing full mission")
+    write_mission(root, span, gaps, timeline, seed, write_pickle)
+
+    log("Writing 20 Hz MAG store")
+    windows, groups = figure_mag_windows(intervals)
+    for group in rng.choice(len(groups), min(mag_windows, len(groups)), replace=False):
+        windows += [
+            (intervals.iloc[row]["Start Time"], intervals.iloc[row]["End Time"])
+            for row in groups[group]
+            if row >= 0
+        ]
+    windows = merge_windows(
+        np.array([w[0] for w in windows], dtype="datetime64[ns]") - MAG_WINDOW_BUFFER,
+        np.array([w[1] for w in windows], dtype="datetime64[ns]") + MAG_WINDOW_BUFFER,
+    )
+
+    # Only the mission's span is covered by the store
+    windows = [(start, min(end, span[1])) for start, end in windows if start < span[1]]
+    write_mag_store(root, span, gaps, timeline, windows, seed)
+
+    log("Writing model output")
+    write_model_output(root, intervals, gaps, timeline, seed)
+
+    log("Writing models")
+    write_models(root, rng)
+
+    log("Writing heliocentric distance table")
+    write_heliocentric_table(root)
+
+    with open(os.path.join(root, SYNTHETIC_PATH, MANIFEST_NAME), "w") as file:
+        json.dump(
+            {
+                "scale": scale,
+                "seed": seed,
+                "version": GENERATOR_VERSION,
+                "start": str(span[0]),
+                "end": str(span[1]),
+                "crossing_intervals": int(is_crossing.sum()),
+                "mag_windows": len(windows),
+            },
+            file,
+            indent=4,
+        )
+
+
+def is_synthetic(root="."):
+    """Whether `root` holds synthetic resources."""
+    return os.path.exists(os.path.join(root, SYNTHETIC_PATH, MANIFEST_NAME))
+
+
+def load_crossing_list(path, include_data_gaps=False, **kwargs):
+    """
+    Load a synthetic crossing list, as `boundaries.Load_Crossings`. Other
+    arguments (e.g. backend) are accepted and ignored.
+    """
+    intervals = pd.read_csv(path, parse_dates=["Start Time", "End Time"])
+
+    if not include_data_gaps:
+        intervals = intervals.loc[intervals["Type"] != "DATA_GAP"]
+
+    return intervals.reset_index(drop=True)
+
+
+def use_synthetic_resources(root="."):
+    """
+    Point hermpy at the synthetic resources in `root`: the full mission and
+    crossing lists paths in `utils.User`, and `boundaries.Load_Crossings`.
+    """
+    from hermpy import boundaries, utils
+
+    utils.User.DATA_DIRECTORIES["FULL MISSION"] = os.path.abspath(
+        os.path.join(root, mission.DEFAULT_MISSION_PATH)
+    )
+    # All 20 Hz data is read from the store
+    utils.User.DATA_DIRECTORIES["MAG"] = os.path.abspath(
+        os.path.join(root, SYNTHETIC_PATH, "mag")
+    )
+
+    for name in CROSSING_LIST_NAMES:
+        utils.User.CROSSING_LISTS[name] = os.path.abspath(
+            crossing_list_path(name, root)
+        )
+
+    boundaries.Load_Crossings = load_crossing_list
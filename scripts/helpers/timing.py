@@ -0,0 +1,186 @@
+"""
+Opt-in timing of the stages of each figure script: unpickling, CSV parsing,
+reading the converted stores, SPICE calls, histogramming, merging positions
+onto crossings, artist creation, and saving (see instrumentation.py).
+
+Timing is switched on by setting FIGURE_TIMING=1 (or with --timing to
+render_all.py and schedule_figures.py). Each script run with
+`runner.run_figure` then has the functions of each stage wrapped, recording
+every call as an event. Calls made within another wrapped call (e.g.
+`pickle.load` within `pd.read_pickle`) count only towards the outermost, so
+stages never overlap, and the rest of a script's time is counted as "other".
+
+Events are written as a JSON timeline of the run in ./resources/timings/, and
+summarised in a table of where each figure spends its time.
+"""
+
+import contextlib
+import datetime as dt
+import json
+import os
+import pathlib
+import shutil
+import time
+
+from .instrumentation import STAGES, instrument
+
+ENVIRONMENT_VARIABLE = "FIGURE_TIMING"
+TIMINGS_DIRECTORY = "./resources/timings"
+
+# The events of the script currently being timed, if any
+_recorder = None
+_installed = False
+
+
+class Recorder:
+    """The events of one script, with times relative to its start."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.events = []
+
+
+def enabled():
+    return os.environ.get(ENVIRONMENT_VARIABLE, "") not in ["", "0"]
+
+
+def install():
+    """Wrap the functions of every stage, skipping modules which aren't installed."""
+    global _installed
+
+    if _installed:
+        return
+
+    instrument(record)
+    _installed = True
+
+
+def record(stage, name, call):
+    """Time a call to a stage's function, if a script is being timed."""
+    recorder = _recorder
+
+    if recorder is None:
+        return call()
+
+    start_time = time.perf_counter()
+    try:
+        return call()
+
+    finally:
+        recorder.events.append(
+            {
+                "stage": stage,
+                "function": name,
+                "start": start_time - recorder.start,
+                "seconds": time.perf_counter() - start_time,
+            }
+        )
+
+
+def start_run():
+    """
+    Start a timed run, whose scripts (in this process or its children) are
+    collected into one timeline. Returns the run's name, or None if a run was
+    already started by a parent process.
+    """
+    if os.environ.get(ENVIRONMENT_VARIABLE, "") not in ["", "0", "1"]:
+        return None
+
+    run = f"{dt.datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}"
+    os.environ[ENVIRONMENT_VARIABLE] = run
+
+    return run
+
+
+def finish_run(run):
+    """
+    Combine the timings of each script in a run into its timeline,
+    ./resources/timings/RUN.json, returning the timings of each script.
+    """
+    directory = pathlib.Path(TIMINGS_DIRECTORY) / run
+    directory.mkdir(parents=True, exist_ok=True)
+
+    figures = []
+    for path in sorted(directory.glob("*.json")):
+        with open(path, "r") as file:
+            figures.append(json.load(file))
+
+    with open(pathlib.Path(TIMINGS_DIRECTORY) / f"{run}.json", "w") as file:
+        json.dump({"run": run, "figures": figures}, file, indent=4)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.environ[ENVIRONMENT_VARIABLE] = "1"
+
+    return figures
+
+
+@contextlib.contextmanager
+def timed(script):
+    """
+    Time the stages of a script run within this context, if timing is
+    enabled. Outside of a run, the script is timed as a run of its own and
+    its summary printed.
+    """
+    global _recorder
+
+    if not enabled():
+        yield
+        return
+
+    install()
+
+    own_run = start_run()
+    run = os.environ[ENVIRONMENT_VARIABLE]
+
+    name = os.path.basename(script)
+    started = dt.datetime.now()
+    _recorder = Recorder()
+
+    try:
+        yield
+
+    finally:
+        recorder, _recorder = _recorder, None
+        total = time.perf_counter() - recorder.start
+
+        stages = {stage: 0.0 for stage in STAGES}
+        for event in recorder.events:
+            stages[event["stage"]] += event["seconds"]
+        stages["other"] = total - sum(stages.values())
+
+        directory = pathlib.Path(TIMINGS_DIRECTORY) / run
+        directory.mkdir(parents=True, exist_ok=True)
+
+        with open(directory / f"{name}.{os.getpid()}.json", "w") as file:
+            json.dump(
+                {
+                    "script": name,
+                    "pid": os.getpid(),
+                    "start": started.isoformat(),
+                    "total_seconds": total,
+                    "stages": stages,
+                    "events": recorder.events,
+                },
+                file,
+            )
+
+        if own_run is not None:
+            print(summary_table(finish_run(own_run)))
+
+
+def summary_table(figures):
+    """A table of the seconds each figure spent in each stage."""
+    columns = ["total", *STAGES, "other"]
+    width = max([len("figure")] + [len(f["script"]) for f in figures])
+
+    lines = [f"{'figure':<{width}}" + "".join(f"{column:>11}" for column in columns)]
+    for figure in sorted(figures, key=lambda f: f["script"]):
+        values = [figure["total_seconds"]] + [
+            figure["stages"][stage] for stage in columns[1:]
+        ]
+        lines.append(
+            f"{figure['script']:<{width}}"
+            + "".join(f"{value:>11.2f}" for value in values)
+        )
+
+    return "\n".join(lines)
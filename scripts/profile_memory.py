@@ -0,0 +1,168 @@
+"""
+Script to find which steps of each figure script are responsible for its peak
+memory (see helpers/memory_profile.py).
+
+Each script is run in its own python process with its memory profiled. A
+report is printed of:
+- the peak RSS, and the line and stage running when it was reached,
+- the memory each stage (unpickling, CSV parsing, merging, ...) allocated,
+- the lines which allocated the memory held at the peak,
+- the largest DataFrames and arrays alive as the stage reaching the peak
+  returned.
+
+The full profile, including the sampled RSS over time, is written to
+./resources/memory_profiles/SCRIPT.json.
+
+$ python ./scripts/profile_memory.py [SCRIPTS ...] [--interval SECONDS]
+
+Tracing every allocation slows scripts down several times over, and adds to
+their memory, so profiled timings and peaks are only comparable with each
+other.
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+
+PROFILES_DIRECTORY = "./resources/memory_profiles"
+
+GIB = 1024**3
+MIB = 1024**2
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Profile the memory of the figure scripts"
+    )
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        default=sorted(glob.glob("./scripts/fig*.py")),
+        help="Scripts to profile (default: all figure scripts)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.05,
+        help="Seconds between RSS samples (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=25,
+        help="Traceback frames stored for each allocation (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of allocating lines and objects to report (default: %(default)s)",
+    )
+    # Used internally, to profile one script in a child process
+    parser.add_argument("--worker", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(*args.worker, args.interval, args.frames, args.top)
+        return
+
+    os.makedirs(PROFILES_DIRECTORY, exist_ok=True)
+
+    for script in args.scripts:
+        name = os.path.basename(script)
+        output_path = os.path.join(PROFILES_DIRECTORY, f"{name}.json")
+
+        process = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--worker",
+                script,
+                output_path,
+                "--interval",
+                str(args.interval),
+                "--frames",
+                str(args.frames),
+                "--top",
+                str(args.top),
+            ]
+        )
+
+        if process.returncode != 0 or not os.path.exists(output_path):
+            print(f"[failed] {name}")
+            continue
+
+        with open(output_path, "r") as file:
+            print(format_report(name, json.load(file)))
+
+
+def run_worker(script, output_path, interval, frames, top):
+    """Profile a script in this process, writing the profile to output_path."""
+    from helpers import memory_profile, runner
+
+    profiler = memory_profile.MemoryProfiler(interval, frames, top)
+
+    profiler.start()
+    try:
+        runner.run_figure(script)
+
+    finally:
+        profiler.stop()
+
+        with open(output_path, "w") as file:
+            json.dump(profiler.results(), file)
+
+
+def format_report(name, profile):
+    lines = [f"{name}:"]
+
+    peak = profile["peak"]
+    if peak is not None:
+        lines.append(
+            f"  peak RSS {peak['rss'] / GIB:.2f} GiB at {peak['time']:.1f} s, "
+            f"in {peak['stage'] or 'no stage'}, at {peak['line']}"
+        )
+    lines.append(f"  peak traced {profile['traced_peak'] / GIB:.2f} GiB")
+
+    if profile["stages"]:
+        lines.append(
+            f"  {'stage':<12}{'calls':>7}{'RSS +':>12}{'peak':>12}{'retained':>12}"
+        )
+        for stage, totals in sorted(
+            profile["stages"].items(),
+            key=lambda item: item[1]["traced_peak"],
+            reverse=True,
+        ):
+            lines.append(
+                f"  {stage:<12}{totals['calls']:>7}"
+                f"{totals['rss_increase'] / GIB:>8.2f} GiB"
+                f"{totals['traced_peak'] / GIB:>8.2f} GiB"
+                f"{totals['traced_retained'] / GIB:>8.2f} GiB"
+            )
+
+    at_peak = profile["at_peak"]
+    if at_peak is not None:
+        lines.append(f"  held at {at_peak['rss'] / GIB:.2f} GiB RSS, allocated by:")
+        for allocation in at_peak["allocations"]:
+            lines.append(
+                f"    {allocation['size'] / MIB:10.1f} MiB  {allocation['line']}"
+            )
+
+        if at_peak["objects"]:
+            lines.append(f"  largest objects, as {at_peak['stage']} returned:")
+            for obj in at_peak["objects"]:
+                lines.append(
+                    f"    {obj['size'] / MIB:10.1f} MiB  {obj['type']} {tuple(obj['shape'])}"
+                )
+        elif at_peak["stage"] is None:
+            lines.append("  largest objects: not recorded, peak outside a stage")
+
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Script to plot a quick look of the MAG data over any window, from hours to
+days, using the multi-resolution aggregates (see helpers/mag_pyramid.py).
+
+Each panel is drawn from the coarsest level which still resolves it at the
+output resolution, so long windows load only the aggregates rather than the
+full 20 Hz data. Summary statistics of the window are printed.
+
+$ python ./scripts/quicklook_mag.py "2012-07-02 00:00" "2012-07-03 00:00"
+"""
+
+import argparse
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from helpers import mag_pyramid
+
+COLUMNS = ["|B|", "Bx", "By", "Bz"]
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Plot a quick look of MAG data")
+    parser.add_argument("start", type=pd.Timestamp, help="Start of the window")
+    parser.add_argument("end", type=pd.Timestamp, help="End of the window")
+    parser.add_argument(
+        "--output",
+        default="./figures/quicklook.png",
+        help="Where to save the plot (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dpi",
+        type=float,
+        default=200,
+        help="Output resolution (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    fig, axes = plt.subplots(len(COLUMNS), 1, sharex=True, figsize=(10, 8))
+
+    start_time = time.perf_counter()
+
+    for ax, column in zip(axes, COLUMNS):
+        pixels = int(ax.get_position().width * fig.get_figwidth() * args.dpi)
+        level = mag_pyramid.choose_level(args.start, args.end, pixels)
+
+        mag_pyramid.plot(ax, args.start, args.end, column, pixels=pixels, lw=0.5)
+        ax.set_ylabel(f"{column} [nT]")
+
+    axes[0].set_title(f"Level: {level or '20Hz'}")
+    axes[-1].set_xlim(args.start, args.end)
+
+    fig.savefig(args.output, dpi=args.dpi)
+    print(f"Saved {args.output} in {time.perf_counter() - start_time:.1f} s")
+
+    if mag_pyramid.is_current():
+        print(mag_pyramid.statistics_between(args.start, args.end, COLUMNS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Script to create every figure within a single python process.
+
+Rather than each figure script loading the full mission and crossing lists
+for itself, they are loaded once (see helpers/resources.py) and shared
+between all scripts. A full rebuild then pays for each large load once.
+
+$ python ./scripts/render_all.py [SCRIPTS ...]
+
+With --processes, scripts are instead run in parallel by a pool of worker
+processes. The full mission is converted to its column store (if needed) once
+by this process, and each worker memory-maps the store, so the workers share
+the same pages of the page cache rather than each holding a copy.
+
+$ python ./scripts/render_all.py --processes 4 ./scripts/fig01*.py ./scripts/fig04*.py
+"""
+
+import argparse
+import concurrent.futures
+import glob
+import os
+import sys
+import time
+import traceback
+
+from helpers import column_store, mission, runner, timing
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Create every figure within a single process"
+    )
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        default=sorted(glob.glob("./scripts/fig*.py")),
+        help="Scripts to run (default: all figure scripts)",
+    )
+    parser.add_argument(
+        "-j",
+        "--processes",
+        type=int,
+        default=1,
+        help="Number of worker processes, sharing the memory-mapped mission",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Record the time spent in each stage of each script (see "
+        "helpers/timing.py)",
+    )
+    args = parser.parse_args()
+
+    if args.timing:
+        os.environ[timing.ENVIRONMENT_VARIABLE] = "1"
+
+    run = timing.start_run() if timing.enabled() else None
+
+    if args.processes > 1:
+        results = run_in_parallel(args.scripts, args.processes)
+    else:
+        results = map(run_script, args.scripts)
+
+    failures = []
+    for name, elapsed, error in results:
+        if error is None:
+            print(f"[done] {name} ({elapsed:.1f} s)")
+
+        else:
+            print(error)
+            print(f"[failed] {name}")
+            failures.append(name)
+
+    if run is not None:
+        print(timing.summary_table(timing.finish_run(run)))
+
+    if failures:
+        print(f"Failed: {', '.join(failures)}")
+        sys.exit(1)
+
+
+def run_script(script):
+    """Returns the script name, time taken, and traceback if it failed."""
+    name = os.path.basename(script)
+    start_time = time.perf_counter()
+
+    try:
+        runner.run_figure(script)
+
+    except Exception:
+        return name, time.perf_counter() - start_time, traceback.format_exc()
+
+    return name, time.perf_counter() - start_time, None
+
+
+def run_in_parallel(scripts, processes):
+
+    # Convert the mission here, once, rather than in several workers at once
+    store_path = mission.store_path_for(mission.DEFAULT_MISSION_PATH)
+    if (
+        os.path.exists(mission.DEFAULT_MISSION_PATH)
+        or column_store.read_manifest(store_path) is not None
+    ):
+        mission.ensure_store(mission.DEFAULT_MISSION_PATH)
+
+    with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+        futures = [pool.submit(run_script, script) for script in scripts]
+
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Script to render the application example figure (as in fig08) for many
+crossing groups, writing one page per group, to review the model's behaviour
+at scale.
+
+$ python ./scripts/render_application_examples.py [GROUPS ...] [--processes N]
+
+Groups are numbered as in `grouping.group_index`, and can be given
+individually or as ranges (e.g. 40:60). With --rows, they are instead chosen
+by the Philpott rows they contain. Groups are rendered by a pool of worker
+processes. Each worker loads the crossing lists and group index once, and
+reads the model output and MAG data from the memory-mapped stores, so these
+are shared between workers through the page cache rather than copied.
+"""
+
+import argparse
+import concurrent.futures
+import os
+import sys
+import time
+import traceback
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from helpers import application_example, grouping, rasterization, resources
+
+# Loaded once by each worker, see `load_worker_resources`
+_crossing_intervals = None
+_crossing_groups = None
+_new_crossings = None
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Render the application example figure for many crossing groups"
+    )
+    parser.add_argument(
+        "groups",
+        nargs="*",
+        help="Group numbers, or ranges of group numbers as START:STOP "
+        "(default: every group)",
+    )
+    parser.add_argument(
+        "--rows",
+        action="store_true",
+        help="Interpret the arguments as Philpott rows, rendering the groups "
+        "containing them",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="./figures/application_examples",
+        help="Directory to write each group's figure to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--processes",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--format",
+        default="pdf",
+        help="File format of the figures (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    crossing_groups = grouping.group_index("Philpott", include_data_gaps=True)
+    try:
+        group_numbers = parse_groups(args.groups, crossing_groups, args.rows)
+    except ValueError as error:
+        parser.error(str(error))
+
+    os.makedirs(args.output, exist_ok=True)
+
+    print(f"Rendering {len(group_numbers)} crossing groups")
+
+    start_time = time.perf_counter()
+    failures = []
+
+    with concurrent.futures.ProcessPoolExecutor(
+        args.processes, initializer=load_worker_resources
+    ) as pool:
+        futures = [
+            pool.submit(render_group, group_number, args.output, args.format)
+            for group_number in group_numbers
+        ]
+
+        for completed, future in enumerate(
+            concurrent.futures.as_completed(futures), start=1
+        ):
+            group_number, error = future.result()
+
+            if error is not None:
+                print(error)
+                print(f"[failed] group {group_number}")
+                failures.append(group_number)
+
+            if completed % 10 == 0 or completed == len(futures):
+                elapsed = time.perf_counter() - start_time
+                print(
+                    f"[{completed}/{len(futures)}] "
+                    f"{completed / elapsed * 60:.1f} groups / minute"
+                )
+
+    elapsed = time.perf_counter() - start_time
+    print(
+        f"Rendered {len(group_numbers) - len(failures)} groups in {elapsed:.1f} s "
+        f"({len(group_numbers) / elapsed * 60:.1f} groups / minute)"
+    )
+
+    if failures:
+        print(f"Failed groups: {', '.join(map(str, failures))}")
+        sys.exit(1)
+
+
+def parse_groups(arguments, crossing_groups, rows=False):
+    """
+    Group numbers from command line arguments of numbers and ranges. Raises a
+    ValueError for arguments which aren't numbers or ranges, or are beyond the
+    groups (or with `rows`, the rows of the crossing list).
+    """
+    if len(arguments) == 0:
+        return list(range(len(crossing_groups)))
+
+    values = []
+    for argument in arguments:
+        try:
+            if ":" in argument:
+                start, stop = argument.split(":")
+                values.extend(range(int(start), int(stop)))
+
+            else:
+                values.append(int(argument))
+
+        except ValueError:
+            raise ValueError(
+                f"'{argument}' is not a number or a START:STOP range"
+            ) from None
+
+    if rows:
+        length, name = len(crossing_groups.group_of_row), "Philpott rows"
+    else:
+        length, name = len(crossing_groups), "Groups"
+
+    outside = [value for value in values if not 0 <= value < length]
+    if outside:
+        raise ValueError(
+            f"{name} out of range (0 to {length - 1}): "
+            f"{', '.join(map(str, outside))}"
+        )
+
+    if rows:
+        values = [crossing_groups.group_number(row) for row in values]
+
+    # Keep the order given, without rendering any group twice
+    return list(dict.fromkeys(value for value in values if value >= 0))
+
+
+def load_worker_resources():
+    global _crossing_intervals, _crossing_groups, _new_crossings
+
+    matplotlib.use("Agg")
+    matplotlib.rcParams["hatch.linewidth"] = 2
+
+    _crossing_intervals = resources.crossing_intervals(
+        "Philpott", include_data_gaps=True
+    )
+    _crossing_groups = grouping.group_index("Philpott", include_data_gaps=True)
+    _new_crossings = application_example.load_new_crossings()
+
+
+def render_group(group_number, output_directory, file_format):
+    """Returns the group number, and the traceback if rendering failed."""
+    try:
+        crossing_group = grouping.group_rows(
+            _crossing_intervals, _crossing_groups[group_number]
+        )
+
+        fig = application_example.plot_crossing_group(crossing_group, _new_crossings)
+        rasterization.savefig(
+            os.path.join(output_directory, f"group_{group_number:05d}.{file_format}"),
+            fig=fig,
+            format=file_format,
+        )
+
+    except Exception:
+        return group_number, traceback.format_exc()
+
+    finally:
+        plt.close("all")
+
+    return group_number, None
+
+
+if __name__ == "__main__":
+    main()
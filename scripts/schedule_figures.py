@@ -0,0 +1,283 @@
+"""
+Script to run the figure scripts concurrently within a memory budget.
+
+The peak memory (RSS) of each script is measured when it runs and stored in
+./resources/figure_peak_memory.json. Scripts are then started, largest first,
+whenever their recorded peak fits within the memory left in the budget, so
+the light scripts run alongside the heavy ones rather than waiting behind
+them. Scripts which have not yet been measured are run on their own.
+
+Scripts whose inputs (the resources they read, their source and helpers, and
+the hermpy version) are unchanged since they last succeeded, and whose
+figures exist, are skipped (see helpers/dependencies.py). Use --force to run
+them anyway.
+
+$ python ./scripts/schedule_figures.py --memory 32 --processes 4
+"""
+
+import argparse
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from helpers import dependencies, timing
+
+PEAK_MEMORY_PATH = "./resources/figure_peak_memory.json"
+
+# Leave some headroom for variation between runs
+SAFETY_FACTOR = 1.1
+
+GIB = 1024**3
+
+
+def main():
+
+    parser = argparse.ArgumentParser(
+        description="Run the figure scripts within a memory budget"
+    )
+    parser.add_argument(
+        "scripts",
+        nargs="*",
+        default=sorted(glob.glob("./scripts/fig*.py")),
+        help="Scripts to run (default: all figure scripts)",
+    )
+    parser.add_argument(
+        "-m",
+        "--memory",
+        type=float,
+        default=None,
+        help="Memory budget in GiB (default: 90%% of physical memory)",
+    )
+    parser.add_argument(
+        "-j",
+        "--processes",
+        type=int,
+        default=os.cpu_count(),
+        help="Maximum number of scripts to run at once",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="Record the time spent in each stage of each script (see "
+        "helpers/timing.py)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every script, even if its inputs are unchanged",
+    )
+    # Used internally, to run one script in a child process
+    parser.add_argument("--worker", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        run_worker(*args.worker)
+        return
+
+    if args.timing:
+        os.environ[timing.ENVIRONMENT_VARIABLE] = "1"
+
+    run = timing.start_run() if timing.enabled() else None
+
+    budget = args.memory * GIB if args.memory else 0.9 * physical_memory()
+
+    tracker = DependencyTracker()
+
+    if not args.force:
+        scripts = []
+        for script in args.scripts:
+            if tracker.is_up_to_date(script):
+                print(f"[skipped] {os.path.basename(script)} (unchanged)")
+            else:
+                scripts.append(script)
+
+        tracker.save_refreshed()
+    else:
+        scripts = args.scripts
+
+    failures = run_scripts(scripts, budget, args.processes, tracker)
+
+    if run is not None:
+        print(timing.summary_table(timing.finish_run(run)))
+
+    if failures:
+        print(f"Failed: {', '.join(failures)}")
+        sys.exit(1)
+
+
+def physical_memory():
+    if not hasattr(os, "sysconf"):
+        return float("inf")
+
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def load_peak_memory():
+    if not os.path.exists(PEAK_MEMORY_PATH):
+        return {}
+
+    with open(PEAK_MEMORY_PATH, "r") as file:
+        return json.load(file)
+
+
+def save_peak_memory(peak_memory):
+    os.makedirs(os.path.dirname(PEAK_MEMORY_PATH), exist_ok=True)
+
+    with open(PEAK_MEMORY_PATH, "w") as file:
+        json.dump(peak_memory, file, indent=4, sort_keys=True)
+
+
+class DependencyTracker:
+    """
+    The recorded inputs of each script. Each script is run by a worker which
+    reports the files it opened, recorded here once it succeeds.
+    """
+
+    def __init__(self):
+        self.dependencies = dependencies.load_dependencies()
+        self.hasher = dependencies.Hasher(self.dependencies)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def is_up_to_date(self, script):
+        entry = self.dependencies.get(os.path.basename(script))
+        return dependencies.is_up_to_date(entry, self.hasher)
+
+    def save_refreshed(self):
+        """
+        Save the new fingerprints of inputs which were only touched, found
+        while checking scripts, so they aren't hashed again next time.
+        """
+        if self.hasher.refreshed:
+            dependencies.save_dependencies(self.dependencies)
+
+    def opened_files_path(self, script):
+        return os.path.join(self.directory.name, f"{os.path.basename(script)}.json")
+
+    def command(self, script):
+        return [
+            sys.executable,
+            os.path.abspath(__file__),
+            "--worker",
+            script,
+            self.opened_files_path(script),
+        ]
+
+    def record(self, script):
+        with open(self.opened_files_path(script), "r") as file:
+            files = json.load(file)
+
+        self.dependencies[os.path.basename(script)] = dependencies.record(
+            files, self.hasher
+        )
+        dependencies.save_dependencies(self.dependencies)
+
+
+def run_worker(script, output_path):
+    """
+    Run a script in this process, writing the files it opened to
+    output_path.
+    """
+    dependencies.track_opens()
+
+    from helpers import runner
+
+    runner.run_figure(script)
+
+    files = dependencies.opened_files(script)
+    with open(output_path, "w") as file:
+        json.dump(files, file)
+
+
+def run_scripts(scripts, budget, max_processes, tracker):
+    """
+    Run each script in its own python process, packing concurrent processes
+    under `budget` bytes. Returns the names of any scripts which failed.
+    """
+    if not hasattr(os, "wait4"):
+        # Peak memory of child processes can't be measured on this platform
+        return run_scripts_serially(scripts, tracker)
+
+    peak_memory = load_peak_memory()
+
+    def estimate(script):
+        name = os.path.basename(script)
+        if name not in peak_memory:
+            return budget
+        return peak_memory[name] * SAFETY_FACTOR
+
+    # Largest first, so the small scripts fill the gaps around the large ones
+    pending = sorted(scripts, key=estimate, reverse=True)
+    running = {}  # pid -> (process, script, estimate, start time)
+    failures = []
+
+    while pending or running:
+
+        in_use = sum(r[2] for r in running.values())
+
+        for script in list(pending):
+            if len(running) >= max_processes:
+                break
+
+            required = estimate(script)
+
+            # A script larger than the whole budget can still run on its own
+            if in_use + required <= budget or not running:
+                process = subprocess.Popen(tracker.command(script))
+                running[process.pid] = (
+                    process,
+                    script,
+                    required,
+                    time.perf_counter(),
+                )
+                pending.remove(script)
+                in_use += required
+
+                print(
+                    f"[started] {os.path.basename(script)} "
+                    f"({in_use / GIB:.1f} / {budget / GIB:.1f} GiB in use)"
+                )
+
+        # Unlike Popen.wait, wait4 also gives the resource usage of the child
+        pid, status, usage = os.wait4(-1, 0)
+        process, script, _, start_time = running.pop(pid)
+        name = os.path.basename(script)
+
+        exit_code = os.waitstatus_to_exitcode(status)
+        process.returncode = exit_code
+
+        # ru_maxrss is in kilobytes on Linux, but bytes on macOS
+        peak = usage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+        if exit_code == 0:
+            peak_memory[name] = peak
+            save_peak_memory(peak_memory)
+            tracker.record(script)
+        else:
+            failures.append(name)
+
+        print(
+            f"[{'done' if exit_code == 0 else 'failed'}] {name} "
+            f"({time.perf_counter() - start_time:.1f} s, peak {peak / GIB:.2f} GiB)"
+        )
+
+    return failures
+
+
+def run_scripts_serially(scripts, tracker):
+    failures = []
+
+    for script in scripts:
+        if subprocess.run(tracker.command(script)).returncode != 0:
+            failures.append(os.path.basename(script))
+        else:
+            tracker.record(script)
+
+    return failures
+
+
+if __name__ == "__main__":
+    main()